@@ -0,0 +1,19 @@
+import hmac
+from typing import Optional
+
+from fastapi import Header, HTTPException, status
+
+from config import settings
+
+
+def require_admin_token(
+    x_profile_token: Optional[str] = Header(None),
+) -> None:
+    # Profiles and dead letters expose internals, so they are only served with the admin token
+    if settings.PROFILING_ADMIN_TOKEN is None or not hmac.compare_digest(
+        x_profile_token or "", settings.PROFILING_ADMIN_TOKEN
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="A valid X-Profile-Token header is required",
+        )
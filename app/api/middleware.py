@@ -0,0 +1,257 @@
+import gzip
+import hmac
+import random
+import time
+import uuid
+from typing import Callable, Optional
+
+import brotli
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics import http_request_duration
+from app.services.profiles import ProfileStore, StoredProfile
+from app.utils import profile_request
+
+PROFILE_TOKEN_HEADER = b"x-profile-token"
+ACCEPT_ENCODING_HEADER = b"accept-encoding"
+# In order of preference when the client accepts both equally
+COMPRESSION_ENCODINGS = ("br", "gzip")
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "text/")
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initializes an ASGI middleware recording the latency of every HTTP request in the http_request_duration_seconds metric.
+
+        Latency is measured until the response starts, so long-lived streams are measured by their time to first byte. Requests are labelled with the route template, such as /api/v1/spreads/{market_id}, to keep one series per route.
+
+        Args:
+            app (ASGIApp): The application to wrap.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        is_observed = False
+
+        def observe(status_code: int) -> None:
+            nonlocal is_observed
+            is_observed = True
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - started_at,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status_code),
+            )
+
+        async def send_and_observe(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                observe(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_observe)
+        finally:
+            if not is_observed:
+                observe(500)
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        profile_store: ProfileStore,
+        sample_rate: float = 0.0,
+        admin_token: Optional[str] = None,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        """
+        Initializes an ASGI middleware profiling the requests that carry the admin token in the X-Profile-Token header, plus a random sample of every request.
+
+        A profile records the time spent in each phase of the request (upstream, validation, spread_math and formatting) and is kept in the profile store. Profiled responses carry its id in the X-Profile-Id header. The middleware is only installed when profiling is configured, so it costs nothing otherwise.
+
+        Args:
+            app (ASGIApp): The application to wrap.
+            profile_store (ProfileStore): The store profiles are added to.
+            sample_rate (float): The fraction of requests profiled, between 0 and 1.
+            admin_token (Optional[str]): The token that profiles a request when sent in the X-Profile-Token header, or None to profile sampled requests only.
+            rng (Callable[[], float]): A function returning a random number in [0, 1).
+        """
+        self.app = app
+        self.profile_store = profile_store
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token
+        self.rng = rng
+
+    def should_profile(self, scope: Scope) -> bool:
+        if self.admin_token is not None:
+            token = dict(scope["headers"]).get(PROFILE_TOKEN_HEADER)
+            if token is not None and hmac.compare_digest(
+                token, self.admin_token.encode()
+            ):
+                return True
+        return self.sample_rate > 0 and self.rng() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        started_at = time.time()
+        started_at_counter = time.perf_counter()
+        status_code = 500
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with profile_request() as profile:
+            try:
+                await self.app(scope, receive, send_with_profile_id)
+            finally:
+                self.profile_store.add(
+                    StoredProfile(
+                        id=profile_id,
+                        method=scope["method"],
+                        path=scope["path"],
+                        status=status_code,
+                        started_at=started_at,
+                        duration=time.perf_counter() - started_at_counter,
+                        phases=profile.phases,
+                    )
+                )
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        """
+        Initializes an ASGI middleware compressing JSON and text responses with brotli or gzip, as negotiated with the Accept-Encoding header of the request.
+
+        Only responses sent in a single body message of at least minimum_size bytes are compressed, since smaller ones cost more CPU than they save in transfer. Streamed responses, such as Server-Sent Events, are passed through untouched so their events are not held back. The ETag of a compressed response is made weak, as its bytes differ from the uncompressed ones, and so is the ETag of a 304 sent to a client accepting compression.
+
+        Args:
+            app (ASGIApp): The application to wrap.
+            minimum_size (int): The smallest body, in bytes, that is compressed.
+            gzip_level (int): The gzip compression level, from 1 to 9.
+            brotli_quality (int): The brotli compression quality, from 0 to 11.
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = dict(scope["headers"]).get(ACCEPT_ENCODING_HEADER, b"")
+        encoding = negotiate_encoding(accept_encoding.decode("latin-1"))
+        start_message: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if message["status"] == 304:
+                    # A 304 has no Content-Type, but stands for the response the cache holds
+                    headers.add_vary_header("Accept-Encoding")
+                    if encoding is not None:
+                        _weaken_etag(headers)
+                    await send(message)
+                    return
+                if not _is_compressible(headers):
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                # Hold the headers until the body shows whether it is compressed
+                start_message = message
+                return
+
+            if start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if (
+                encoding is not None
+                and not message.get("more_body", False)
+                and len(body) >= self.minimum_size
+            ):
+                body = self.compress(body, encoding)
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                _weaken_etag(headers)
+                message = {**message, "body": body}
+            await send(start_message)
+            start_message = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Returns the preferred content encoding accepted by the client, "br" or "gzip", or None if neither is accepted.
+
+    Args:
+        accept_encoding (str): The Accept-Encoding header of the request, such as "gzip, br;q=0.8".
+    """
+    qvalues = {}
+    for coding in accept_encoding.split(","):
+        name, _, parameters = coding.partition(";")
+        quality = 1.0
+        parameters = parameters.strip()
+        if parameters.startswith("q="):
+            try:
+                quality = float(parameters[2:])
+            except ValueError:
+                quality = 0.0
+        qvalues[name.strip().lower()] = quality
+
+    wildcard = qvalues.get("*", 0.0)
+    # Ties keep the order of COMPRESSION_ENCODINGS, preferring brotli
+    encoding = max(
+        COMPRESSION_ENCODINGS, key=lambda encoding: qvalues.get(encoding, wildcard)
+    )
+    return encoding if qvalues.get(encoding, wildcard) > 0 else None
+
+
+def _is_compressible(headers: MutableHeaders) -> bool:
+    content_type = headers.get("Content-Type", "")
+    return (
+        "Content-Encoding" not in headers
+        and content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+        and not content_type.startswith("text/event-stream")
+    )
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("ETag")
+    if etag is not None and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
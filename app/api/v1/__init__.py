@@ -1,6 +1,7 @@
 from fastapi import APIRouter
-from app.api.v1 import spreads, alerts
+from app.api.v1 import spreads, alerts, profiles
 
 api_router = APIRouter()
 api_router.include_router(spreads.router, prefix="/spreads", tags=["spreads"])
 api_router.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
+api_router.include_router(profiles.router, prefix="/profiles", tags=["profiles"])
@@ -1,28 +1,69 @@
+import asyncio
+import math
 import traceback
-from typing import Dict
+from typing import Any, Dict, List, Optional
 import json
 
-from fastapi import APIRouter, HTTPException, status, Path, Body
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    Path,
+    Body,
+    Query,
+    Response,
+    Header,
+)
+from fastapi.responses import ORJSONResponse
 from pydantic import ValidationError
 from requests.exceptions import HTTPError
 
 from app import schemas
-from app.services import buda_api
-from app.utils import calculate_spread, compare_spread_with_alert_value
+from app.api.dependencies import require_admin_token
+from app.services import (
+    alert_event_log,
+    alert_index,
+    alert_store,
+    buda_api,
+    spread_feed,
+    webhook_dispatcher,
+)
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.metrics import validation_failures
+from app.services.rate_limiter import RateLimitExceeded
+from app.services.webhooks import WebhookURLNotAllowed, check_webhook_url
+from app.utils import (
+    build_cache_headers,
+    build_etag,
+    build_ticker_age_headers,
+    calculate_spread,
+    calculate_spreads,
+    compare_spread_with_alert_value,
+    etag_matches,
+    profile_phase,
+)
+from config import settings
 
-router = APIRouter()
-spread_alert = {"value": None}
+# orjson renders the large all-markets responses several times faster
+router = APIRouter(default_response_class=ORJSONResponse)
+# Kept in sync with the alert store, which persists it
+spread_alert = alert_store.spread_alert
 
 
 @router.get(
     "",
     response_model=Dict[str, schemas.AlertResponse],
     responses={
+        304: {"description": "Not Modified"},
         404: {"model": schemas.ErrorResponse, "description": "Not Found"},
+        503: {"model": schemas.ErrorResponse, "description": "Service Unavailable"},
         500: {"model": schemas.ErrorResponse, "description": "Internal Server Error"},
     },
 )
-def compare_alert_with_all_markets() -> Dict[str, schemas.AlertResponse]:
+async def compare_alert_with_all_markets(
+    if_none_match: Optional[str] = Header(None),
+) -> Any:
     """
     Compare the spread alert for all markets from the Buda API.
 
@@ -30,6 +71,10 @@ def compare_alert_with_all_markets() -> Dict[str, schemas.AlertResponse]:
 
         market_id (str): The unique identifier of the market for which the spread data is requested.
 
+    **Request Headers:**
+
+        If-None-Match (Optional[str]): The ETag of a previous response. A 304 Not Modified response without a body is returned if neither the spreads nor the alert value have changed since.
+
     **Returns:**
 
         alerts (Dict[str, AlertResponse]): A dictionary containing the status of the spread alert for all markets. The dictionary includes the market ID as the key and an AlertResponse object as the value. The AlertResponse object includes the following fields:
@@ -45,11 +90,17 @@ def compare_alert_with_all_markets() -> Dict[str, schemas.AlertResponse]:
                 - "Spread is LESS than the alert value."
                 - "Spread is EQUAL to the alert value."
 
+    **Headers:**
+
+        - ETag: A strong validator that changes whenever the prices behind the spreads or the alert value change.
+        - Cache-Control: Lets clients and shared caches reuse the response for SPREAD_RESPONSES_MAX_AGE seconds.
+
     **Raises:**
 
         HTTPException:
 
             - 404 (Not Found): If the market is not found.
+            - 503 (Service Unavailable): If the BUDA API is failing or its request budget is exhausted, and no cached data can be served.
             - 500 (Internal Server Error): For any other unexpected error.
     """
 
@@ -59,29 +110,51 @@ def compare_alert_with_all_markets() -> Dict[str, schemas.AlertResponse]:
         )
 
     try:
-        markets = buda_api.markets.get_all()
+        if buda_api.ticker_book.is_ready:
+            tickers = buda_api.ticker_book.get_all()
+        else:
+            markets = await buda_api.markets.aget_all()
+            market_ids = [market["id"] for market in markets["markets"]]
+            tickers = (await buda_api.tickers.aget_all(market_ids=market_ids))[
+                "tickers"
+            ]
+        cache_headers = build_cache_headers(
+            build_etag(tickers, spread_alert["value"]),
+            settings.SPREAD_RESPONSES_MAX_AGE,
+        )
+        if etag_matches(if_none_match, cache_headers["ETag"]):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers
+            )
         alerts = {}
-        for market in markets["markets"]:
-            ticker = schemas.TickerResponse(
-                **buda_api.tickers.get_one_by_market_id(market_id=market["id"])[
-                    "ticker"
-                ]
-            ).model_dump()
-            current_spread = calculate_spread(ticker)
+        with profile_phase("validation"):
+            tickers = schemas.decode_ticker_quotes(tickers)
+        current_spreads = calculate_spreads(tickers).to_spreads()
+        for current_spread in current_spreads:
             alert = compare_spread_with_alert_value(
                 spread_value=current_spread["value"],
                 alert_value=spread_alert["value"],
-                market_id=market["id"],
+                market_id=current_spread["market_id"],
             )
-            alerts[market["id"]] = alert
-        return alerts
+            alerts[current_spread["market_id"]] = alert
+        spread_feed.publish(current_spreads)
+        # The alerts were built from validated tickers, so they skip response_model
+        return ORJSONResponse(alerts, headers=cache_headers)
 
     except ValidationError as e:
+        validation_failures.inc(e.title)
         error_details = json.loads(e.json())
         raise HTTPException(status_code=422, detail={"detail": error_details})
 
     except Exception as err:
 
+        if isinstance(err, (CircuitOpenError, RateLimitExceeded)):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="The BUDA API is unavailable, try again later",
+                headers={"Retry-After": str(math.ceil(err.retry_after))},
+            )
+
         if isinstance(err, HTTPError) and err.response.status_code == 404:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -97,15 +170,101 @@ def compare_alert_with_all_markets() -> Dict[str, schemas.AlertResponse]:
         )
 
 
+@router.get(
+    "/events",
+    response_model=schemas.AlertEventsResponse,
+)
+async def get_alert_events(
+    after: int = Query(
+        0,
+        ge=0,
+        description="The id of the last event already read. 0 to read from the oldest kept event.",
+    ),
+    limit: int = Query(
+        100, ge=1, le=1000, description="The maximum number of events returned."
+    ),
+) -> schemas.AlertEventsResponse:
+    """
+    Retrieves the alert rule crossing events logged after a cursor.
+
+    An event is logged every time the spread of a market crosses the threshold of one of its alert rules, in either direction. Spreads are evaluated whenever a spread or alert endpoint is requested and on every refresh of the market-data poller. Only the latest ALERT_EVENT_LOG_SIZE events are kept.
+
+    **Query Parameters:**
+
+        after (int): The id of the last event already read. 0 to read from the oldest kept event.
+        limit (int): The maximum number of events returned.
+
+    **Returns:**
+
+        events (AlertEventsResponse): An AlertEventsResponse object in JSON format. The object includes the following fields:
+
+            - events (List[AlertEventResponse]): The events, oldest first. Each event includes the market_id, name, direction and threshold of the crossed rule, the previous_spread_value and spread_value of the market, is_triggered (true if the rule became triggered, false if it stopped being triggered) and created_at (a Unix timestamp).
+            - last_id (int): The cursor to send as "after" in the next request.
+            - missed_events (bool): True if events after the cursor were dropped from the log before being read.
+
+    **Raises:**
+
+        HTTPException:
+
+            - 422 (Unprocessable Entity): If the query parameters are invalid.
+    """
+    events = alert_event_log.get_after(after=after, limit=limit)
+    return schemas.AlertEventsResponse(
+        events=[schemas.AlertEventResponse(**event._asdict()) for event in events],
+        last_id=events[-1].id if events else alert_event_log.last_id,
+        missed_events=(
+            after < alert_event_log.first_id() - 1 or after > alert_event_log.last_id
+        ),
+    )
+
+
+@router.get(
+    "/webhooks/dead-letters",
+    response_model=List[schemas.WebhookDeadLetterResponse],
+    dependencies=[Depends(require_admin_token)],
+    responses={
+        403: {"model": schemas.ErrorResponse, "description": "Forbidden"},
+    },
+)
+async def get_webhook_dead_letters() -> List[schemas.WebhookDeadLetterResponse]:
+    """
+    Retrieves the spread alert notifications that could not be delivered to their webhook.
+
+    Notifications are dead-lettered when the delivery queue is full, when the webhook is no longer allowed, when it answers with a 4xx status other than 429, or after WEBHOOK_MAX_ATTEMPTS failed attempts. Only the latest WEBHOOK_MAX_DEAD_LETTERS are kept.
+
+    **Headers:**
+
+        - X-Profile-Token: The admin token.
+
+    **Returns:**
+
+        dead_letters (List[WebhookDeadLetterResponse]): A list of WebhookDeadLetterResponse objects in JSON format, oldest first. Each object includes the url, the undelivered payloads, the last error, the number of attempts and failed_at (a Unix timestamp).
+
+    **Raises:**
+
+        HTTPException:
+
+            - 403 (Forbidden): If the admin token is missing, wrong or not configured.
+    """
+    return [
+        schemas.WebhookDeadLetterResponse(**dead_letter._asdict())
+        for dead_letter in list(webhook_dispatcher.dead_letters)
+    ]
+
+
 @router.get(
     "/{market_id}",
     response_model=schemas.AlertResponse,
     responses={
+        304: {"description": "Not Modified"},
         404: {"model": schemas.ErrorResponse, "description": "Not Found"},
+        503: {"model": schemas.ErrorResponse, "description": "Service Unavailable"},
         500: {"model": schemas.ErrorResponse, "description": "Internal Server Error"},
     },
 )
-def compare_alert_with_one_market(market_id: str) -> schemas.AlertResponse:
+async def compare_alert_with_one_market(
+    market_id: str, if_none_match: Optional[str] = Header(None)
+) -> Any:
     """
     Compare the spread alert for a given market from the Buda API.
 
@@ -113,6 +272,10 @@ def compare_alert_with_one_market(market_id: str) -> schemas.AlertResponse:
 
         market_id (str): The unique identifier of the market for which the spread data is requested.
 
+    **Request Headers:**
+
+        If-None-Match (Optional[str]): The ETag of a previous response. A 304 Not Modified response without a body is returned if neither the spread nor the alert value have changed since.
+
     **Returns:**
 
         alert (AlertResponse): An AlertResponse object in JSON format indicating the status of the spread alert for the given market. The object includes the following fields:
@@ -128,12 +291,20 @@ def compare_alert_with_one_market(market_id: str) -> schemas.AlertResponse:
                 - "Spread is LESS than the alert value."
                 - "Spread is EQUAL to the alert value."
 
+    **Headers:**
+
+        - X-Data-Age: The number of seconds since the underlying ticker was fetched from the Buda API.
+        - X-Ticker-Stale: "true" if the ticker was served from cache while a newer one is being fetched.
+        - ETag: A strong validator that changes whenever the prices behind the spread or the alert value change.
+        - Cache-Control: Lets clients and shared caches reuse the response for SPREAD_RESPONSES_MAX_AGE seconds.
+
     **Raises:**
 
         HTTPException:
 
             - 404 (Not Found): If the market is not found.
             - 422 (Unprocessable Entity): If the request data is invalid or cannot be processed.
+            - 503 (Service Unavailable): If the BUDA API is failing or its request budget is exhausted, and no cached data can be served.
             - 500 (Internal Server Error): For any other unexpected error.
     """
 
@@ -143,24 +314,38 @@ def compare_alert_with_one_market(market_id: str) -> schemas.AlertResponse:
         )
 
     try:
-        ticker = schemas.TickerResponse(
-                **buda_api.tickers.get_one_by_market_id(market_id=market_id)[
-                    "ticker"
-                ]
-            ).model_dump()
-        current_spread = calculate_spread(ticker)
+        ticker_lookup = await buda_api.aget_ticker_with_age(market_id)
+        ticker_data = ticker_lookup.value
+        headers = build_ticker_age_headers(ticker_lookup.age, ticker_lookup.is_stale)
+        headers.update(
+            build_cache_headers(
+                build_etag([ticker_data], spread_alert["value"]),
+                settings.SPREAD_RESPONSES_MAX_AGE,
+            )
+        )
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        current_spread = _get_current_spread(ticker_data)
         alert = compare_spread_with_alert_value(
             spread_value=current_spread["value"],
             alert_value=spread_alert["value"],
             market_id=market_id,
         )
-        return alert
+        return ORJSONResponse(alert, headers=headers)
 
     except ValidationError as e:
+        validation_failures.inc(e.title)
         error_details = json.loads(e.json())
         raise HTTPException(status_code=422, detail={"detail": error_details})
 
     except Exception as err:
+        if isinstance(err, (CircuitOpenError, RateLimitExceeded)):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="The BUDA API is unavailable, try again later",
+                headers={"Retry-After": str(math.ceil(err.retry_after))},
+            )
+
         if isinstance(err, HTTPError) and err.response.status_code == 404:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -180,7 +365,7 @@ def compare_alert_with_one_market(market_id: str) -> schemas.AlertResponse:
     "",
     response_model=schemas.Message,
 )
-def set_spread_alert(alert: schemas.SpreadAlert) -> schemas.Message:
+async def set_spread_alert(alert: schemas.SpreadAlert) -> schemas.Message:
     """
     Sets an spread alert for a given market from the Buda API.
 
@@ -189,6 +374,7 @@ def set_spread_alert(alert: schemas.SpreadAlert) -> schemas.Message:
         alert (SpreadAlert): A SpreadAlert object in JSON format. The object requires the following fields:
 
             - alert_value (float): The value of the spread alert.
+            - webhook_url (str, optional): A URL notified with a POST every time the spread of a market crosses the alert value. It must use https and resolve to public addresses, unless its host is in WEBHOOK_ALLOWED_HOSTS.
 
     **Returns:**
 
@@ -200,13 +386,235 @@ def set_spread_alert(alert: schemas.SpreadAlert) -> schemas.Message:
 
         HTTPException:
 
-            - 422 (Unprocessable Entity): If the request data is invalid or cannot be processed.
+            - 422 (Unprocessable Entity): If the request data is invalid or cannot be processed, or the webhook URL is not allowed.
     """
-
-
-    spread_alert["value"] = alert.value
+    webhook_url = None if alert.webhook_url is None else str(alert.webhook_url)
+    if webhook_url is not None:
+        try:
+            await asyncio.to_thread(check_webhook_url, webhook_url)
+        except WebhookURLNotAllowed as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+            )
+    # The store writes to SQLite, which must not block the event loop
+    await asyncio.to_thread(
+        alert_store.set_spread_alert, alert.value, webhook_url=webhook_url
+    )
     alert_value_formatted = "{:,.2f}".format(alert.value)
     message = {
         "message": f"Alert set successfully. Alert value: {alert_value_formatted}"
     }
     return message
+
+
+@router.get(
+    "/{market_id}/rules",
+    response_model=List[schemas.AlertRuleResponse],
+)
+async def get_alert_rules(market_id: str) -> List[schemas.AlertRuleResponse]:
+    """
+    Retrieves the named alert rules of a given market.
+
+    **Path Parameters:**
+
+        market_id (str): The unique identifier of the market.
+
+    **Returns:**
+
+        rules (List[AlertRuleResponse]): A list of AlertRuleResponse objects in JSON format, sorted by direction and threshold. Each object includes the following fields:
+
+            - market_id (str): The unique identifier of the market.
+            - name (str): The name of the rule.
+            - direction (str): "above" if the rule triggers when the spread is greater than the threshold, "below" if it triggers when the spread is less.
+            - threshold (float): The spread value the rule compares against.
+    """
+    return [
+        schemas.AlertRuleResponse(**rule._asdict())
+        for rule in alert_index.get_by_market_id(market_id)
+    ]
+
+
+@router.get(
+    "/{market_id}/rules/triggered",
+    response_model=schemas.TriggeredAlertRulesResponse,
+    responses={
+        304: {"description": "Not Modified"},
+        404: {"model": schemas.ErrorResponse, "description": "Not Found"},
+        503: {"model": schemas.ErrorResponse, "description": "Service Unavailable"},
+        500: {"model": schemas.ErrorResponse, "description": "Internal Server Error"},
+    },
+)
+async def get_triggered_alert_rules(
+    market_id: str, response: Response, if_none_match: Optional[str] = Header(None)
+) -> Any:
+    """
+    Retrieves the named alert rules of a given market that are triggered by its current spread.
+
+    **Path Parameters:**
+
+        market_id (str): The unique identifier of the market.
+
+    **Request Headers:**
+
+        If-None-Match (Optional[str]): The ETag of a previous response. A 304 Not Modified response without a body is returned if neither the spread nor the rules of the market have changed since.
+
+    **Returns:**
+
+        triggered_rules (TriggeredAlertRulesResponse): A TriggeredAlertRulesResponse object in JSON format. The object includes the following fields:
+
+            - market_id (str): The unique identifier of the market.
+            - spread_value (str): The calculated spread value for the market.
+            - triggered (List[AlertRuleResponse]): The triggered rules, sorted by direction and threshold.
+
+    **Headers:**
+
+        - X-Data-Age: The number of seconds since the underlying ticker was fetched from the Buda API.
+        - X-Ticker-Stale: "true" if the ticker was served from cache while a newer one is being fetched.
+        - ETag: A strong validator that changes whenever the prices behind the spread or the rules of the market change.
+        - Cache-Control: Lets clients and shared caches reuse the response for SPREAD_RESPONSES_MAX_AGE seconds.
+
+    **Raises:**
+
+        HTTPException:
+
+            - 404 (Not Found): If the market is not found.
+            - 422 (Unprocessable Entity): If the request data is invalid or cannot be processed.
+            - 503 (Service Unavailable): If the BUDA API is failing or its request budget is exhausted, and no cached data can be served.
+            - 500 (Internal Server Error): For any other unexpected error.
+    """
+    try:
+        ticker_lookup = await buda_api.aget_ticker_with_age(market_id)
+        ticker_data = ticker_lookup.value
+        headers = build_ticker_age_headers(ticker_lookup.age, ticker_lookup.is_stale)
+        headers.update(
+            build_cache_headers(
+                build_etag([ticker_data], alert_index.get_by_market_id(market_id)),
+                settings.SPREAD_RESPONSES_MAX_AGE,
+            )
+        )
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        current_spread = _get_current_spread(ticker_data)
+        triggered_rules = alert_index.find_triggered(market_id, current_spread["value"])
+        return schemas.TriggeredAlertRulesResponse(
+            market_id=market_id,
+            spread_value="{:,.2f}".format(current_spread["value"]),
+            triggered=[
+                schemas.AlertRuleResponse(**rule._asdict()) for rule in triggered_rules
+            ],
+        )
+
+    except ValidationError as e:
+        validation_failures.inc(e.title)
+        error_details = json.loads(e.json())
+        raise HTTPException(status_code=422, detail={"detail": error_details})
+
+    except Exception as err:
+        if isinstance(err, (CircuitOpenError, RateLimitExceeded)):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="The BUDA API is unavailable, try again later",
+                headers={"Retry-After": str(math.ceil(err.retry_after))},
+            )
+
+        if isinstance(err, HTTPError) and err.response.status_code == 404:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(f"Market with id '{market_id}' not found"),
+            )
+
+        error_message = str(err)
+        error_name = err.__class__.__name__
+        print(traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An unexpected error occurred: {error_name}: {error_message}",
+        )
+
+
+@router.put(
+    "/{market_id}/rules/{name}",
+    response_model=schemas.AlertRuleResponse,
+)
+async def set_alert_rule(
+    market_id: str, name: str, rule: schemas.AlertRuleRequest
+) -> schemas.AlertRuleResponse:
+    """
+    Creates or replaces a named alert rule for a given market.
+
+    **Path Parameters:**
+
+        market_id (str): The unique identifier of the market.
+        name (str): The name of the rule, unique per market.
+
+    **Request Body:**
+
+        rule (AlertRuleRequest): An AlertRuleRequest object in JSON format. The object requires the following fields:
+
+            - direction (str): "above" to trigger when the spread is greater than the threshold, "below" to trigger when it is less.
+            - threshold (float): The spread value the rule compares against.
+
+    **Returns:**
+
+        rule (AlertRuleResponse): The stored AlertRuleResponse object in JSON format.
+
+    **Raises:**
+
+        HTTPException:
+
+            - 422 (Unprocessable Entity): If the request data is invalid or cannot be processed.
+    """
+    stored_rule = await asyncio.to_thread(
+        alert_store.add_rule,
+        market_id=market_id,
+        name=name,
+        direction=rule.direction.value,
+        threshold=rule.threshold,
+    )
+    return schemas.AlertRuleResponse(**stored_rule._asdict())
+
+
+@router.delete(
+    "/{market_id}/rules/{name}",
+    response_model=schemas.Message,
+    responses={
+        404: {"model": schemas.ErrorResponse, "description": "Not Found"},
+    },
+)
+async def delete_alert_rule(market_id: str, name: str) -> schemas.Message:
+    """
+    Deletes a named alert rule of a given market.
+
+    **Path Parameters:**
+
+        market_id (str): The unique identifier of the market.
+        name (str): The name of the rule.
+
+    **Returns:**
+
+        message (Message): A message object in JSON format indicating the rule was deleted.
+
+    **Raises:**
+
+        HTTPException:
+
+            - 404 (Not Found): If the market has no rule with the given name.
+    """
+    is_deleted = await asyncio.to_thread(
+        alert_store.remove_rule, market_id=market_id, name=name
+    )
+    if not is_deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Alert rule '{name}' not found for market '{market_id}'",
+        )
+    return {"message": f"Alert rule '{name}' deleted successfully."}
+
+
+def _get_current_spread(ticker_data: Dict[str, Any]) -> Dict[str, Any]:
+    with profile_phase("validation"):
+        ticker = schemas.decode_ticker_quote(ticker_data)
+    current_spread = calculate_spread(ticker)
+    spread_feed.publish([current_spread])
+    return current_spread
@@ -0,0 +1,95 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+from app import schemas
+from app.api.dependencies import require_admin_token
+from app.services import profile_store
+
+router = APIRouter()
+
+
+@router.get(
+    "",
+    response_model=List[schemas.ProfileResponse],
+    dependencies=[Depends(require_admin_token)],
+    responses={
+        403: {"model": schemas.ErrorResponse, "description": "Forbidden"},
+    },
+)
+async def get_profiles() -> List[schemas.ProfileResponse]:
+    """
+    Retrieves the latest request profiles.
+
+    Requests are profiled when they carry the PROFILING_ADMIN_TOKEN in the X-Profile-Token header, and at random with a probability of PROFILING_SAMPLE_RATE. Only the latest PROFILING_MAX_PROFILES profiles are kept.
+
+    **Headers:**
+
+        - X-Profile-Token: The admin token.
+
+    **Returns:**
+
+        profiles (List[ProfileResponse]): A list of ProfileResponse objects in JSON format, oldest first. Each object includes the following fields:
+
+            - id (str): The id of the profile, also sent in the X-Profile-Id header of the profiled response.
+            - method (str): The HTTP method of the request.
+            - path (str): The path of the request.
+            - status (int): The status code of the response.
+            - started_at (float): The Unix timestamp of the request.
+            - duration (float): The number of seconds until the response was sent.
+            - phases (Dict[str, ProfilePhaseResponse]): The seconds spent and number of calls in each phase: upstream, validation, spread_math and formatting. Concurrent upstream calls add up, so a phase may exceed the duration.
+
+    **Raises:**
+
+        HTTPException:
+
+            - 403 (Forbidden): If the admin token is missing, wrong or not configured.
+    """
+    return [
+        schemas.ProfileResponse(**profile._asdict())
+        for profile in profile_store.get_all()
+    ]
+
+
+@router.get(
+    "/{profile_id}",
+    response_model=schemas.ProfileResponse,
+    dependencies=[Depends(require_admin_token)],
+    responses={
+        403: {"model": schemas.ErrorResponse, "description": "Forbidden"},
+        404: {"model": schemas.ErrorResponse, "description": "Not Found"},
+    },
+)
+async def get_profile(profile_id: str, response: Response) -> schemas.ProfileResponse:
+    """
+    Downloads one request profile.
+
+    **Path Parameters:**
+
+        profile_id (str): The id of the profile, from the X-Profile-Id header of the profiled response.
+
+    **Headers:**
+
+        - X-Profile-Token: The admin token.
+
+    **Returns:**
+
+        profile (ProfileResponse): A ProfileResponse object in JSON format, sent as an attachment.
+
+    **Raises:**
+
+        HTTPException:
+
+            - 403 (Forbidden): If the admin token is missing, wrong or not configured.
+            - 404 (Not Found): If the profile is unknown or was dropped.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile '{profile_id}' not found",
+        )
+    response.headers[
+        "Content-Disposition"
+    ] = f'attachment; filename="profile-{profile_id}.json"'
+    return schemas.ProfileResponse(**profile._asdict())
@@ -1,30 +1,65 @@
+import asyncio
+import math
 import traceback
-from typing import Any, List
+from typing import Any, AsyncIterator, List, Optional
 import json
 
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import Response, JSONResponse
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.responses import (
+    Response,
+    JSONResponse,
+    ORJSONResponse,
+    StreamingResponse,
+)
 from pydantic import ValidationError
 from requests.exceptions import HTTPError
 
 from app import schemas
-from app.services import buda_api
-from app.utils import calculate_spread, format_current_spread
+from app.services import (
+    buda_api,
+    spread_broadcaster,
+    spread_candles,
+    spread_feed,
+    spread_history,
+)
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.metrics import validation_failures
+from app.services.rate_limiter import RateLimitExceeded
+from app.services.spread_stream import SpreadSubscription
+from app.utils import (
+    build_cache_headers,
+    build_etag,
+    build_ticker_age_headers,
+    calculate_spread,
+    calculate_spreads,
+    etag_matches,
+    format_current_spread,
+    format_server_sent_event,
+    profile_phase,
+)
+from config import settings
 
-router = APIRouter()
+# orjson renders the large all-markets responses several times faster
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 @router.get(
     "",
     response_model=List[schemas.SpreadResponse],
     responses={
+        304: {"description": "Not Modified"},
+        503: {"model": schemas.ErrorResponse, "description": "Service Unavailable"},
         500: {"model": schemas.ErrorResponse, "description": "Internal Server Error"},
     },
 )
-def get_all_spreads() -> List[schemas.SpreadResponse]:
+async def get_all_spreads(if_none_match: Optional[str] = Header(None)) -> Any:
     """
     Retrieves all spreads from the Buda API.
 
+    **Request Headers:**
+
+        If-None-Match (Optional[str]): The ETag of a previous response. A 304 Not Modified response without a body is returned if the spreads have not changed since.
+
     **Returns:**
 
         all_spreads (List[SpreadResponse]): A list of SpreadResponse objects in JSON format for all markets. Each object in the list includes the following fields:
@@ -34,34 +69,62 @@ def get_all_spreads() -> List[schemas.SpreadResponse]:
             - max_bid (str): The maximum bid price for the market.
             - min_ask (str): The minimum ask price for the market.
 
+    **Headers:**
+
+        - ETag: A strong validator that changes whenever the prices behind the spreads change.
+        - Cache-Control: Lets clients and shared caches reuse the response for SPREAD_RESPONSES_MAX_AGE seconds.
+
     **Raises:**
 
         HTTPException:
 
             - 422 (Unprocessable Entity): If the request data is invalid or cannot be processed.
+            - 503 (Service Unavailable): If the BUDA API is failing or its request budget is exhausted, and no cached data can be served.
             - 500 (Internal Server Error): For any other unexpected error.
     """
     try:
-        all_spreads = []
-        markets = buda_api.markets.get_all()
-        for market in markets["markets"]:
-            market = schemas.MarketResponse(**market).model_dump()
-            ticker = schemas.TickerResponse(
-                **buda_api.tickers.get_one_by_market_id(market_id=market["id"])[
-                    "ticker"
-                ]
-            ).model_dump()
-            current_spread = calculate_spread(ticker=ticker)
-            current_spread_formatted = format_current_spread(current_spread)
-            all_spreads.append(schemas.SpreadResponse(**current_spread_formatted))
-        return all_spreads
+        if buda_api.ticker_book.is_ready:
+            tickers = buda_api.ticker_book.get_all()
+        else:
+            markets_data = (await buda_api.markets.aget_all())["markets"]
+            with profile_phase("validation"):
+                markets = schemas.decode_market_records(markets_data)
+            tickers = (
+                await buda_api.tickers.aget_all(
+                    market_ids=[market["id"] for market in markets]
+                )
+            )["tickers"]
+        cache_headers = build_cache_headers(
+            build_etag(tickers), settings.SPREAD_RESPONSES_MAX_AGE
+        )
+        if etag_matches(if_none_match, cache_headers["ETag"]):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers
+            )
+        with profile_phase("validation"):
+            tickers = schemas.decode_ticker_quotes(tickers)
+        current_spreads = calculate_spreads(tickers).to_spreads()
+        all_spreads = [
+            format_current_spread(current_spread) for current_spread in current_spreads
+        ]
+        spread_feed.publish(current_spreads)
+        # The spreads were built from validated tickers, so they skip response_model
+        return ORJSONResponse(all_spreads, headers=cache_headers)
 
     except ValidationError as e:
+        validation_failures.inc(e.title)
         error_details = json.loads(e.json())
         raise HTTPException(status_code=422, detail={"detail": error_details})
 
     except Exception as err:
 
+        if isinstance(err, (CircuitOpenError, RateLimitExceeded)):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="The BUDA API is unavailable, try again later",
+                headers={"Retry-After": str(math.ceil(err.retry_after))},
+            )
+
         if isinstance(err, HTTPError) and err.response.status_code == 404:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -77,15 +140,115 @@ def get_all_spreads() -> List[schemas.SpreadResponse]:
         )
 
 
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": "A stream of spread events",
+        },
+        503: {"model": schemas.ErrorResponse, "description": "Service Unavailable"},
+    },
+)
+async def stream_spreads(
+    markets: Optional[str] = Query(
+        None,
+        description="Comma separated market IDs to subscribe to, e.g. BTC-CLP,ETH-CLP. All markets if omitted.",
+    )
+) -> StreamingResponse:
+    """
+    Streams spread changes as they are calculated using Server-Sent Events.
+
+    On subscription the latest known spread of every requested market is sent, followed by one event for each spread that changes afterwards. The market-data poller runs while any stream is open, so spreads are refreshed every MARKET_DATA_POLL_INTERVAL seconds even if no other client requests them. Slow consumers only receive the latest spread of each market.
+
+    **Query Parameters:**
+
+        markets (Optional[str]): Comma separated market IDs to subscribe to. All markets if omitted.
+
+    **Returns:**
+
+        events (StreamingResponse): A text/event-stream response where each "spread" event carries a SpreadResponse object in JSON format with the following fields:
+
+            - market_id (str): The unique identifier of the market.
+            - value (str): The calculated spread value for the market.
+            - max_bid (str): The maximum bid price for the market.
+            - min_ask (str): The minimum ask price for the market.
+
+    **Raises:**
+
+        HTTPException:
+
+            - 503 (Service Unavailable): If the maximum number of stream subscribers is reached.
+    """
+    market_ids = None
+    if markets:
+        market_ids = {
+            market_id.strip().upper()
+            for market_id in markets.split(",")
+            if market_id.strip()
+        }
+
+    try:
+        subscription = spread_broadcaster.subscribe(market_ids=market_ids)
+    except OverflowError as err:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{str(err)}. Please try again later.",
+        )
+    buda_api.poller.retain()
+
+    return StreamingResponse(
+        _stream_spread_events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _stream_spread_events(
+    subscription: SpreadSubscription,
+) -> AsyncIterator[str]:
+    try:
+        while True:
+            try:
+                changes = await asyncio.wait_for(
+                    subscription.next_changes(),
+                    timeout=settings.SPREAD_STREAM_KEEPALIVE_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                # Keep idle connections open through proxies
+                yield ": keepalive\n\n"
+                continue
+            if changes is None:
+                return
+            for spread in changes:
+                try:
+                    event = format_server_sent_event(
+                        "spread", format_current_spread(spread)
+                    )
+                except Exception:
+                    # A malformed spread is reported without ending the stream
+                    print(traceback.format_exc())
+                    continue
+                yield event
+    finally:
+        spread_broadcaster.unsubscribe(subscription)
+        await buda_api.poller.release()
+
+
 @router.get(
     "/{market_id}",
     response_model=schemas.SpreadResponse,
     responses={
+        304: {"description": "Not Modified"},
         404: {"model": schemas.ErrorResponse, "description": "Not Found"},
+        503: {"model": schemas.ErrorResponse, "description": "Service Unavailable"},
         500: {"model": schemas.ErrorResponse, "description": "Internal Server Error"},
     },
 )
-def get_spread_by_market_id(market_id: str) -> Any:
+async def get_spread_by_market_id(
+    market_id: str, if_none_match: Optional[str] = Header(None)
+) -> Any:
     """
     Retrieves the market spread data for a given market ID from the Buda API.
 
@@ -93,6 +256,10 @@ def get_spread_by_market_id(market_id: str) -> Any:
 
         market_id (str): The unique identifier of the market for which the spread data is requested.
 
+    **Request Headers:**
+
+        If-None-Match (Optional[str]): The ETag of a previous response. A 304 Not Modified response without a body is returned if the spread has not changed since.
+
     **Returns:**
 
         spread_obj (SpreadResponse): A SpreadResponse object in JSON format for the given market. The object includes the following fields:
@@ -102,29 +269,54 @@ def get_spread_by_market_id(market_id: str) -> Any:
             - max_bid (str): The maximum bid price for the market.
             - min_ask (str): The minimum ask price for the market.
 
+    **Headers:**
+
+        - X-Data-Age: The number of seconds since the underlying ticker was fetched from the Buda API.
+        - X-Ticker-Stale: "true" if the ticker was served from cache while a newer one is being fetched.
+        - ETag: A strong validator that changes whenever the prices behind the spread change.
+        - Cache-Control: Lets clients and shared caches reuse the response for SPREAD_RESPONSES_MAX_AGE seconds.
+
     **Raises:**
 
         HTTPException:
 
             - 404 (Not Found): If the market is not found.
             - 422 (Unprocessable Entity): If the request data is invalid or cannot be processed.
+            - 503 (Service Unavailable): If the BUDA API is failing or its request budget is exhausted, and no cached data can be served.
             - 500 (Internal Server Error): For any other unexpected error.
 
     """
 
     try:
-        ticker = schemas.TickerResponse(
-            **buda_api.tickers.get_one_by_market_id(market_id=market_id)["ticker"]
-        ).model_dump()
+        ticker_lookup = await buda_api.aget_ticker_with_age(market_id)
+        ticker_data = ticker_lookup.value
+        headers = build_ticker_age_headers(ticker_lookup.age, ticker_lookup.is_stale)
+        headers.update(
+            build_cache_headers(
+                build_etag([ticker_data]), settings.SPREAD_RESPONSES_MAX_AGE
+            )
+        )
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        with profile_phase("validation"):
+            ticker = schemas.decode_ticker_quote(ticker_data)
         current_spread = calculate_spread(ticker=ticker)
-        current_spread_formatted = format_current_spread(current_spread)
-        return schemas.SpreadResponse(**current_spread_formatted)
+        spread_feed.publish([current_spread])
+        return ORJSONResponse(format_current_spread(current_spread), headers=headers)
 
     except ValidationError as e:
+        validation_failures.inc(e.title)
         error_details = json.loads(e.json())
         raise HTTPException(status_code=422, detail={"detail": error_details})
 
     except Exception as err:
+        if isinstance(err, (CircuitOpenError, RateLimitExceeded)):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="The BUDA API is unavailable, try again later",
+                headers={"Retry-After": str(math.ceil(err.retry_after))},
+            )
+
         if isinstance(err, HTTPError) and err.response.status_code == 404:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -138,3 +330,115 @@ def get_spread_by_market_id(market_id: str) -> Any:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {error_name}: {error_message}",
         )
+
+
+@router.get(
+    "/{market_id}/history",
+    response_model=schemas.SpreadHistoryResponse,
+)
+async def get_spread_history_by_market_id(
+    market_id: str,
+    start: Optional[float] = Query(
+        None,
+        alias="from",
+        description="The earliest Unix timestamp included. Defaults to the oldest sample.",
+    ),
+    end: Optional[float] = Query(
+        None,
+        alias="to",
+        description="The latest Unix timestamp included. Defaults to the newest sample.",
+    ),
+) -> schemas.SpreadHistoryResponse:
+    """
+    Retrieves the spreads recorded for a given market between two timestamps.
+
+    A sample is recorded when the spread of the market changes, whether a spread or alert endpoint or the market-data poller calculated it, and at most once every SPREAD_SAMPLE_MIN_INTERVAL seconds. Only the latest SPREAD_HISTORY_SIZE samples of every market are kept, in memory.
+
+    **Path Parameters:**
+
+        market_id (str): The unique identifier of the market.
+
+    **Query Parameters:**
+
+        from (float, optional): The earliest Unix timestamp included.
+        to (float, optional): The latest Unix timestamp included.
+
+    **Returns:**
+
+        history (SpreadHistoryResponse): A SpreadHistoryResponse object in JSON format, with one list per field and one item per sample, oldest first:
+
+            - market_id (str): The unique identifier of the market.
+            - timestamp (List[float]): The Unix timestamp of each sample.
+            - min_ask (List[float]): The minimum ask price of each sample.
+            - max_bid (List[float]): The maximum bid price of each sample.
+            - value (List[float]): The spread value of each sample.
+
+        The lists are empty if no spread of the market was recorded in the range.
+
+    **Raises:**
+
+        HTTPException:
+
+            - 422 (Unprocessable Entity): If the query parameters are invalid.
+    """
+    samples = spread_history.get_range(market_id, start=start, end=end)
+    if samples is None:
+        return schemas.SpreadHistoryResponse(
+            market_id=market_id, timestamp=[], min_ask=[], max_bid=[], value=[]
+        )
+    return schemas.SpreadHistoryResponse(
+        market_id=market_id,
+        timestamp=samples.timestamp.tolist(),
+        min_ask=samples.min_ask.tolist(),
+        max_bid=samples.max_bid.tolist(),
+        value=samples.value.tolist(),
+    )
+
+
+@router.get(
+    "/{market_id}/candles",
+    response_model=schemas.SpreadCandlesResponse,
+)
+async def get_spread_candles_by_market_id(
+    market_id: str,
+    interval: schemas.CandleInterval = Query(
+        schemas.CandleInterval.ONE_MINUTE, description="The length of each candle."
+    ),
+    limit: Optional[int] = Query(
+        None, ge=1, description="The maximum number of candles returned."
+    ),
+) -> schemas.SpreadCandlesResponse:
+    """
+    Retrieves the spread candles of a given market for an interval.
+
+    Candles are aggregated on the server from the changes of the spread of the market, sampled like the spread history, so their count and mean are weighted by market updates rather than by request traffic. Only the latest SPREAD_CANDLES_MAX_COUNT closed candles of every market and interval are kept, in memory.
+
+    **Path Parameters:**
+
+        market_id (str): The unique identifier of the market.
+
+    **Query Parameters:**
+
+        interval (str): The length of each candle: "1m", "5m" or "1h". Defaults to "1m".
+        limit (int, optional): The maximum number of candles returned, the latest ones.
+
+    **Returns:**
+
+        candles (SpreadCandlesResponse): A SpreadCandlesResponse object in JSON format. The object includes the following fields:
+
+            - market_id (str): The unique identifier of the market.
+            - interval (str): The length of each candle.
+            - candles (List[CandleResponse]): The candles, oldest first. Each one includes its start (a Unix timestamp) and the open, high, low, close and mean spread and count of spreads of its period. The last candle is still open.
+
+    **Raises:**
+
+        HTTPException:
+
+            - 422 (Unprocessable Entity): If the query parameters are invalid.
+    """
+    candles = spread_candles.get_candles(market_id, interval.value, limit=limit)
+    return schemas.SpreadCandlesResponse(
+        market_id=market_id,
+        interval=interval,
+        candles=[schemas.CandleResponse(**candle._asdict()) for candle in candles],
+    )
@@ -1,10 +1,49 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
 
+from app.api import metrics
+from app.api.middleware import (
+    CompressionMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+)
 from app.api.v1 import api_router
+from app.services import (
+    alert_store,
+    buda_api,
+    profile_store,
+    spread_broadcaster,
+    webhook_dispatcher,
+)
 from config import settings
 
+# ******************************************************************************
+# FASTAPI APP LIFESPAN
+# ******************************************************************************
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the stored alerts and follow the changes made by other workers
+    alert_store.load()
+    alert_store.start_sync(settings.ALERT_STORE_SYNC_INTERVAL)
+    webhook_dispatcher.start()
+    if settings.MARKET_DATA_POLLER_ENABLED:
+        buda_api.poller.start()
+    yield
+    # End open spread streams so the server can shut down
+    spread_broadcaster.close_all()
+    await buda_api.poller.stop()
+    await alert_store.stop_sync()
+    await webhook_dispatcher.stop()
+    alert_store.repository.close()
+    # Release the pooled upstream connections on shutdown
+    await buda_api.aclose()
+
+
 # ******************************************************************************
 # FASTAPI APP SETTINGS
 # ******************************************************************************
@@ -14,7 +53,8 @@ app = FastAPI(
     description="This API is designed for Buda.com to calculate and manage the spread across various markets. Key features include:\n\n"
     "- Retrieving the spread of all markets in a single API call.\n"
     "- Managing a 'spread alert' system, enabling users to set and check spread thresholds.\n\n"
-    "The system supports polling to determine if the current spread is above or below these thresholds.\n\n",
+    "The system supports polling to determine if the current spread is above or below these thresholds.\n\n"
+    "Spread changes can also be streamed with Server-Sent Events from `/api/v1/spreads/stream`.\n\n",
     version="1.0.0",
     contact={
         "name": "Samuel Valdes Gutierrez",
@@ -28,6 +68,7 @@ app = FastAPI(
     },
     docs_url="/api/docs",  # This is the default URL for the Swagger UI
     redoc_url="/api/redoc",  # This is the default URL for the ReDoc UI
+    lifespan=lifespan,
 )
 
 
@@ -36,3 +77,21 @@ app = FastAPI(
 # ******************************************************************************
 
 app.include_router(api_router, prefix=f"/{settings.API_URL_PREFIX}")
+app.include_router(metrics.router)
+
+# ******************************************************************************
+# MIDDLEWARE SETTINGS
+# ******************************************************************************
+
+# Added first so the measured latency includes the compression
+app.add_middleware(
+    CompressionMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MINIMUM_SIZE
+)
+app.add_middleware(MetricsMiddleware)
+if settings.PROFILING_SAMPLE_RATE > 0 or settings.PROFILING_ADMIN_TOKEN:
+    app.add_middleware(
+        ProfilingMiddleware,
+        profile_store=profile_store,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        admin_token=settings.PROFILING_ADMIN_TOKEN,
+    )
@@ -1,6 +1,28 @@
-from app.schemas.spread import SpreadResponse, SpreadAlert
+from app.schemas.spread import (
+    CandleInterval,
+    CandleResponse,
+    SpreadAlert,
+    SpreadCandlesResponse,
+    SpreadHistoryResponse,
+    SpreadResponse,
+)
 from app.schemas.error import ErrorResponse
 from app.schemas.message import Message
-from app.schemas.market import MarketResponse
-from app.schemas.ticker import TickerResponse
-from app.schemas.alert import AlertResponse
+from app.schemas.market import MarketRecord, MarketResponse, decode_market_records
+from app.schemas.ticker import (
+    TickerQuote,
+    TickerResponse,
+    decode_ticker_quote,
+    decode_ticker_quotes,
+)
+from app.schemas.alert import (
+    AlertEventResponse,
+    AlertEventsResponse,
+    AlertResponse,
+    AlertRuleDirection,
+    AlertRuleRequest,
+    AlertRuleResponse,
+    TriggeredAlertRulesResponse,
+    WebhookDeadLetterResponse,
+)
+from app.schemas.profile import ProfilePhaseResponse, ProfileResponse
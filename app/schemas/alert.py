@@ -1,3 +1,6 @@
+from enum import Enum
+from typing import Any, Dict, List
+
 from pydantic import BaseModel
 
 
@@ -8,3 +11,52 @@ class AlertResponse(BaseModel):
     is_greater: bool
     is_less: bool
     message: str
+
+
+class AlertRuleDirection(str, Enum):
+    ABOVE = "above"
+    BELOW = "below"
+
+
+class AlertRuleRequest(BaseModel):
+    direction: AlertRuleDirection
+    threshold: float
+
+
+class AlertRuleResponse(BaseModel):
+    market_id: str
+    name: str
+    direction: AlertRuleDirection
+    threshold: float
+
+
+class TriggeredAlertRulesResponse(BaseModel):
+    market_id: str
+    spread_value: str
+    triggered: List[AlertRuleResponse]
+
+
+class AlertEventResponse(BaseModel):
+    id: int
+    market_id: str
+    name: str
+    direction: AlertRuleDirection
+    threshold: float
+    previous_spread_value: float
+    spread_value: float
+    is_triggered: bool
+    created_at: float
+
+
+class AlertEventsResponse(BaseModel):
+    events: List[AlertEventResponse]
+    last_id: int
+    missed_events: bool
+
+
+class WebhookDeadLetterResponse(BaseModel):
+    url: str
+    payloads: List[Dict[str, Any]]
+    error: str
+    attempts: int
+    failed_at: float
@@ -0,0 +1,27 @@
+from typing import Any, Callable
+
+from pydantic import TypeAdapter, ValidationError
+
+
+def compile_decoder(type_: Any, title: str) -> Callable[[Any], Any]:
+    """
+    Compiles a validator for a type once, returning a function that validates data against it.
+
+    Validation errors are raised with the given title, so the validation_failures metric names the record that failed rather than a generic "list[typed-dict]".
+
+    Args:
+        type_ (Any): The type to validate against, such as List[TickerQuote].
+        title (str): The name given to validation errors.
+
+    Returns:
+        Callable[[Any], Any]: A function returning the validated data, or raising ValidationError.
+    """
+    adapter = TypeAdapter(type_)
+
+    def decode(data: Any) -> Any:
+        try:
+            return adapter.validate_python(data)
+        except ValidationError as e:
+            raise ValidationError.from_exception_data(title, e.errors()) from None
+
+    return decode
@@ -1,5 +1,8 @@
 from pydantic import BaseModel
 from typing import Optional, List
+from typing_extensions import TypedDict
+
+from app.schemas.decoding import compile_decoder
 
 
 class MarketResponse(BaseModel):
@@ -16,3 +19,11 @@ class MarketResponse(BaseModel):
     max_orders_per_minute: Optional[int] = None
     maker_discount_percentage: Optional[str] = None
     taker_discount_percentage: Optional[str] = None
+
+
+# The fields of a market the spreads need, other fields are dropped
+class MarketRecord(TypedDict):
+    id: str
+
+
+decode_market_records = compile_decoder(List[MarketRecord], "MarketRecord")
@@ -0,0 +1,18 @@
+from typing import Dict
+
+from pydantic import BaseModel
+
+
+class ProfilePhaseResponse(BaseModel):
+    seconds: float
+    calls: int
+
+
+class ProfileResponse(BaseModel):
+    id: str
+    method: str
+    path: str
+    status: int
+    started_at: float
+    duration: float
+    phases: Dict[str, ProfilePhaseResponse]
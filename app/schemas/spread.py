@@ -1,4 +1,7 @@
-from pydantic import BaseModel
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel, HttpUrl
 
 
 class SpreadResponse(BaseModel):
@@ -8,5 +11,36 @@ class SpreadResponse(BaseModel):
     min_ask: str
 
 
+class SpreadHistoryResponse(BaseModel):
+    market_id: str
+    timestamp: List[float]
+    min_ask: List[float]
+    max_bid: List[float]
+    value: List[float]
+
+
+class CandleInterval(str, Enum):
+    ONE_MINUTE = "1m"
+    FIVE_MINUTES = "5m"
+    ONE_HOUR = "1h"
+
+
+class CandleResponse(BaseModel):
+    start: float
+    open: float
+    high: float
+    low: float
+    close: float
+    mean: float
+    count: int
+
+
+class SpreadCandlesResponse(BaseModel):
+    market_id: str
+    interval: CandleInterval
+    candles: List[CandleResponse]
+
+
 class SpreadAlert(BaseModel):
     value: float
+    webhook_url: Optional[HttpUrl] = None
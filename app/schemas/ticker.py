@@ -1,5 +1,16 @@
-from pydantic import BaseModel, field_validator
+from pydantic import AfterValidator, BaseModel, field_validator
 from typing import List, Optional
+from typing_extensions import Annotated, TypedDict
+
+from app.schemas.decoding import compile_decoder
+
+
+def _check_price(v):
+    if not isinstance(v, list) or len(v) != 2:
+        raise ValueError("must be a list of 2 elements")
+    if not v[0].replace(".", "").isnumeric():
+        raise ValueError("The first element must be able to cast to a float")
+    return v
 
 
 class TickerResponse(BaseModel):
@@ -13,8 +24,15 @@ class TickerResponse(BaseModel):
 
     @field_validator("min_ask", "max_bid")
     def check_list_structure(cls, v):
-        if not isinstance(v, list) or len(v) != 2:
-            raise ValueError("must be a list of 2 elements")
-        if not v[0].replace(".", "").isnumeric():
-            raise ValueError("The first element must be able to cast to a float")
-        return v
+        return _check_price(v)
+
+
+# The fields of a ticker the spreads are calculated from, other fields are dropped
+class TickerQuote(TypedDict):
+    market_id: str
+    min_ask: Annotated[List[str], AfterValidator(_check_price)]
+    max_bid: Annotated[List[str], AfterValidator(_check_price)]
+
+
+decode_ticker_quote = compile_decoder(TickerQuote, "TickerQuote")
+decode_ticker_quotes = compile_decoder(List[TickerQuote], "TickerQuote")
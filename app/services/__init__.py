@@ -1,12 +1,171 @@
+from app.services.alert_events import AlertCrossingDetector, AlertEventLog
+from app.services.alert_index import AlertIndex
+from app.services.alert_store import AlertRepository, AlertStore
+from app.services.base_api_client import (
+    create_circuit_breaker,
+    create_rate_limiter,
+    create_session,
+)
+from app.services.cache import CacheLookup
+from app.services.circuit_breaker import CircuitBreaker
 from app.services.markets import MarketService
+from app.services.metrics import CallbackCounter, CallbackGauge, registry
 from app.services.tickers import TickerService
+from app.services.ticker_book import TickerBook
+from app.services.poller import MarketDataPoller
+from app.services.profiles import ProfileStore
+from app.services.spread_feed import SpreadFeed, SpreadSampler
+from app.services.spread_candles import SpreadCandles
+from app.services.spread_history import SpreadHistory
+from app.services.spread_stream import SpreadBroadcaster
+from app.services.webhooks import SpreadAlertNotifier, WebhookDispatcher
+from config import settings
 
 
 class BudaAPI:
-    def __init__(self):
-        self.markets = MarketService()
-        self.tickers = TickerService()
+    def __init__(self, spread_feed: SpreadFeed):
+        # Both services share one keep-alive connection pool to the BUDA API,
+        # one circuit breaker tracking its health and one request budget
+        self.session = create_session()
+        self.circuit_breaker = create_circuit_breaker()
+        self.rate_limiter = create_rate_limiter()
+        self.markets = MarketService(
+            session=self.session,
+            circuit_breaker=self.circuit_breaker,
+            rate_limiter=self.rate_limiter,
+        )
+        self.tickers = TickerService(
+            session=self.session,
+            circuit_breaker=self.circuit_breaker,
+            rate_limiter=self.rate_limiter,
+        )
+        # Only filled when the background poller is enabled
+        self.ticker_book = TickerBook(max_age=settings.MARKET_DATA_MAX_AGE)
+        self.poller = MarketDataPoller(
+            markets=self.markets,
+            tickers=self.tickers,
+            ticker_book=self.ticker_book,
+            interval=settings.MARKET_DATA_POLL_INTERVAL,
+            spread_feed=spread_feed,
+        )
 
+    async def aget_ticker_with_age(self, market_id: str) -> CacheLookup:
+        """
+        Retrieves the ticker of a market with its age, from the ticker book when it can answer and from the BUDA API otherwise.
+
+        Args:
+            market_id (str): The unique identifier for the market.
+
+        Returns:
+            CacheLookup: The ticker data, the seconds since it was fetched and whether it is stale.
+        """
+        if self.ticker_book.is_ready:
+            ticker_data = self.ticker_book.get(market_id)
+            if ticker_data is not None:
+                ticker_age = self.ticker_book.age()
+                # The book is stale once it missed a refresh of the poller
+                return CacheLookup(
+                    ticker_data, ticker_age, ticker_age >= self.poller.interval
+                )
+        ticker_lookup = await self.tickers.aget_one_with_age_by_market_id(
+            market_id=market_id
+        )
+        return ticker_lookup._replace(value=ticker_lookup.value["ticker"])
+
+    def close(self):
+        self.markets.close()
+        self.tickers.close()
+        if self.rate_limiter is not None:
+            self.rate_limiter.close()
+
+    async def aclose(self):
+        await self.markets.aclose()
+        await self.tickers.aclose()
+        if self.rate_limiter is not None:
+            self.rate_limiter.close()
+
+
+# Every calculated spread is published to the feed and streamed to subscribers
+spread_feed = SpreadFeed()
+spread_broadcaster = SpreadBroadcaster(
+    max_subscribers=settings.SPREAD_STREAM_MAX_SUBSCRIBERS
+)
+spread_feed.subscribe(spread_broadcaster.publish)
+# History and candles record market updates, not every spread served from cache
+spread_samples = SpreadFeed()
+spread_feed.subscribe(
+    SpreadSampler(
+        spread_samples, min_interval=settings.SPREAD_SAMPLE_MIN_INTERVAL
+    ).on_spreads
+)
+spread_history = SpreadHistory(capacity=settings.SPREAD_HISTORY_SIZE)
+spread_samples.subscribe(spread_history.on_spreads)
+spread_candles = SpreadCandles(max_candles=settings.SPREAD_CANDLES_MAX_COUNT)
+spread_samples.subscribe(spread_candles.on_spreads)
 
 # Instantiate the main API class
-buda_api = BudaAPI()
+buda_api = BudaAPI(spread_feed=spread_feed)
+registry.register(
+    CallbackCounter(
+        "buda_api_single_flight_calls_total",
+        "Upstream calls executed or collapsed into a call already in flight, by service.",
+        ("service", "result"),
+        lambda: {
+            (service_name, result): value
+            for service_name, service in [
+                ("markets", buda_api.markets),
+                ("tickers", buda_api.tickers),
+            ]
+            for result, value in service.single_flight_stats().items()
+        },
+    )
+)
+registry.register(
+    CallbackGauge(
+        "buda_api_circuit_breaker_state",
+        "State of the BUDA API circuit breaker, 1 for the current state and 0 for the others.",
+        ("state",),
+        lambda: {
+            (state,): float(state == buda_api.circuit_breaker.state)
+            for state in CircuitBreaker.STATES
+        },
+    )
+)
+registry.register(
+    CallbackCounter(
+        "buda_api_circuit_breaker_rejections_total",
+        "Requests to the BUDA API rejected because the circuit breaker was open.",
+        (),
+        lambda: {(): buda_api.circuit_breaker.stats()["rejected"]},
+    )
+)
+
+# Named spread alert rules of every market, with an event for every crossing
+alert_index = AlertIndex()
+alert_event_log = AlertEventLog(max_events=settings.ALERT_EVENT_LOG_SIZE)
+alert_crossing_detector = AlertCrossingDetector(
+    alert_index=alert_index, event_log=alert_event_log
+)
+spread_feed.subscribe(alert_crossing_detector.on_spreads)
+
+# Alerts are persisted in SQLite and shared by every worker using the same file
+alert_store = AlertStore(
+    repository=AlertRepository(path=settings.ALERT_DB_PATH), index=alert_index
+)
+
+# Crossings of the spread alert are POSTed to its webhook in the background
+webhook_dispatcher = WebhookDispatcher(
+    max_pending=settings.WEBHOOK_MAX_PENDING,
+    workers=settings.WEBHOOK_WORKERS,
+    batch_size=settings.WEBHOOK_BATCH_SIZE,
+    max_attempts=settings.WEBHOOK_MAX_ATTEMPTS,
+    backoff=settings.WEBHOOK_BACKOFF_SECONDS,
+    max_dead_letters=settings.WEBHOOK_MAX_DEAD_LETTERS,
+)
+spread_alert_notifier = SpreadAlertNotifier(
+    spread_alert=alert_store.spread_alert, dispatcher=webhook_dispatcher
+)
+spread_feed.subscribe(spread_alert_notifier.on_spreads)
+
+# Profiles of the requests sampled or flagged by the profiling middleware
+profile_store = ProfileStore(max_profiles=settings.PROFILING_MAX_PROFILES)
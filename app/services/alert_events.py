@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Deque, Dict, List, NamedTuple
+
+from app.services.alert_index import AlertIndex
+
+
+class AlertEvent(NamedTuple):
+    id: int
+    market_id: str
+    name: str
+    direction: str
+    threshold: float
+    previous_spread_value: float
+    spread_value: float
+    is_triggered: bool
+    created_at: float
+
+
+class AlertEventLog:
+    def __init__(self, max_events: int) -> None:
+        """
+        Initializes a bounded in-memory log of alert events, read with a cursor.
+
+        Args:
+            max_events (int): The number of most recent events kept. Older events are dropped.
+        """
+        self.max_events = max_events
+        self.last_id = 0
+        self._events: Deque[AlertEvent] = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+
+    def append(self, **fields: Any) -> AlertEvent:
+        """
+        Adds an event to the log, giving it the next id.
+
+        Args:
+            fields: Every field of AlertEvent except id.
+
+        Returns:
+            AlertEvent: The stored event.
+        """
+        with self._lock:
+            self.last_id += 1
+            event = AlertEvent(id=self.last_id, **fields)
+            self._events.append(event)
+            return event
+
+    def get_after(self, after: int, limit: int) -> List[AlertEvent]:
+        """
+        Returns the events whose id is greater than a cursor, oldest first.
+
+        Args:
+            after (int): The id of the last event already read, or 0 to read from the oldest kept event.
+            limit (int): The maximum number of events returned.
+        """
+        with self._lock:
+            if not self._events or after >= self.last_id:
+                return []
+            # Ids are consecutive, so the position of the cursor is computed directly
+            start = max(0, after - self._events[0].id + 1)
+            return list(islice(self._events, start, start + limit))
+
+    def first_id(self) -> int:
+        """
+        Returns the id of the oldest kept event, or the next id if the log is empty.
+        """
+        with self._lock:
+            return self._events[0].id if self._events else self.last_id + 1
+
+
+class AlertCrossingDetector:
+    def __init__(self, alert_index: AlertIndex, event_log: AlertEventLog) -> None:
+        """
+        Initializes a spread listener that logs an event every time a spread crosses the threshold of an alert rule.
+
+        The previous spread of every market is remembered, so an event is only emitted when a rule changes from not triggered to triggered or back. The first spread seen for a market only sets its initial state.
+
+        Args:
+            alert_index (AlertIndex): The rules to evaluate.
+            event_log (AlertEventLog): The log crossing events are appended to.
+        """
+        self.alert_index = alert_index
+        self.event_log = event_log
+        self._last_spread_values: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def on_spreads(self, spreads: List[Dict[str, Any]]) -> None:
+        """
+        Evaluates a batch of spreads against the alert rules. Meant to be subscribed to a SpreadFeed.
+
+        Args:
+            spreads (List[Dict[str, Any]]): The spreads as returned by calculate_spread.
+        """
+        now = time.time()
+        # Publishers may run concurrently, so each move is evaluated under the lock
+        with self._lock:
+            for spread in spreads:
+                market_id = spread["market_id"].upper()
+                previous_value = self._last_spread_values.get(market_id)
+                self._last_spread_values[market_id] = spread["value"]
+                if previous_value is None or previous_value == spread["value"]:
+                    continue
+                crossed = self.alert_index.find_crossed(
+                    market_id, previous_value, spread["value"]
+                )
+                for rule, is_triggered in crossed:
+                    self.event_log.append(
+                        market_id=rule.market_id,
+                        name=rule.name,
+                        direction=rule.direction,
+                        threshold=rule.threshold,
+                        previous_spread_value=previous_value,
+                        spread_value=spread["value"],
+                        is_triggered=is_triggered,
+                        created_at=now,
+                    )
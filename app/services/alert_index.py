@@ -0,0 +1,219 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+ABOVE = "above"
+BELOW = "below"
+
+
+class AlertRule(NamedTuple):
+    market_id: str
+    name: str
+    direction: str
+    threshold: float
+
+
+class _SortedRules:
+    """Rules of one market and direction, kept sorted by threshold for binary searches."""
+
+    def __init__(self) -> None:
+        self.thresholds: List[float] = []
+        self.rules: List[AlertRule] = []
+
+    def add(self, rule: AlertRule) -> None:
+        index = bisect_right(self.thresholds, rule.threshold)
+        self.thresholds.insert(index, rule.threshold)
+        self.rules.insert(index, rule)
+
+    def remove(self, rule: AlertRule) -> None:
+        index = bisect_left(self.thresholds, rule.threshold)
+        # Several rules may share a threshold
+        while self.rules[index] != rule:
+            index += 1
+        del self.thresholds[index]
+        del self.rules[index]
+
+
+class _MarketRules:
+    def __init__(self) -> None:
+        self.by_name: Dict[str, AlertRule] = {}
+        self.above = _SortedRules()
+        self.below = _SortedRules()
+
+    def sorted_rules(self, direction: str) -> _SortedRules:
+        return self.above if direction == ABOVE else self.below
+
+
+def _make_rule(
+    market_id: str, name: str, direction: str, threshold: float
+) -> AlertRule:
+    if direction not in (ABOVE, BELOW):
+        raise ValueError(f"Invalid alert direction: {direction}")
+    return AlertRule(market_id.upper(), name, direction, float(threshold))
+
+
+def _add_rule(markets: Dict[str, _MarketRules], rule: AlertRule) -> None:
+    market = markets.setdefault(rule.market_id, _MarketRules())
+    previous = market.by_name.pop(rule.name, None)
+    if previous is not None:
+        market.sorted_rules(previous.direction).remove(previous)
+    market.by_name[rule.name] = rule
+    market.sorted_rules(rule.direction).add(rule)
+
+
+class AlertIndex:
+    def __init__(self) -> None:
+        """
+        Initializes an in-memory index of named spread alert rules per market.
+
+        An "above" rule is triggered while the spread is greater than its threshold and a "below" rule while it is less. The rules of each market are kept sorted by threshold, so finding the rules triggered or crossed by a spread is a binary search instead of a scan of every rule.
+        """
+        self._markets: Dict[str, _MarketRules] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(market.by_name) for market in self._markets.values())
+
+    def add(
+        self, market_id: str, name: str, direction: str, threshold: float
+    ) -> AlertRule:
+        """
+        Adds a rule to a market, replacing the rule with the same name if any.
+
+        Args:
+            market_id (str): The unique identifier for the market, in any case.
+            name (str): The name of the rule, unique per market.
+            direction (str): "above" or "below".
+            threshold (float): The spread value the rule compares against.
+
+        Returns:
+            AlertRule: The stored rule.
+
+        Raises:
+            ValueError: If the direction is not "above" or "below".
+        """
+        rule = _make_rule(market_id, name, direction, threshold)
+        with self._lock:
+            _add_rule(self._markets, rule)
+        return rule
+
+    def replace_all(self, rules: List[AlertRule]) -> None:
+        """
+        Replaces every rule of the index at once. Concurrent readers see either the old or the new rules, never a mix.
+
+        Args:
+            rules (List[AlertRule]): The new rules. A rule replaces any earlier one with the same market and name.
+        """
+        markets: Dict[str, _MarketRules] = {}
+        for rule in rules:
+            _add_rule(markets, _make_rule(*rule))
+        with self._lock:
+            self._markets = markets
+
+    def remove(self, market_id: str, name: str) -> Optional[AlertRule]:
+        """
+        Removes a rule from a market.
+
+        Args:
+            market_id (str): The unique identifier for the market, in any case.
+            name (str): The name of the rule.
+
+        Returns:
+            Optional[AlertRule]: The removed rule, or None if the market has no rule with that name.
+        """
+        with self._lock:
+            market = self._markets.get(market_id.upper())
+            if market is None or name not in market.by_name:
+                return None
+            rule = market.by_name.pop(name)
+            market.sorted_rules(rule.direction).remove(rule)
+            if not market.by_name:
+                del self._markets[rule.market_id]
+            return rule
+
+    def get(self, market_id: str, name: str) -> Optional[AlertRule]:
+        """
+        Returns a rule of a market, or None if the market has no rule with that name.
+
+        Args:
+            market_id (str): The unique identifier for the market, in any case.
+            name (str): The name of the rule.
+        """
+        with self._lock:
+            market = self._markets.get(market_id.upper())
+            return None if market is None else market.by_name.get(name)
+
+    def get_by_market_id(self, market_id: str) -> List[AlertRule]:
+        """
+        Returns every rule of a market, sorted by direction and threshold.
+
+        Args:
+            market_id (str): The unique identifier for the market, in any case.
+        """
+        with self._lock:
+            market = self._markets.get(market_id.upper())
+            if market is None:
+                return []
+            return list(market.above.rules) + list(market.below.rules)
+
+    def market_ids(self) -> List[str]:
+        """
+        Returns the upper-cased identifiers of the markets with at least one rule.
+        """
+        with self._lock:
+            return list(self._markets)
+
+    def find_triggered(self, market_id: str, spread_value: float) -> List[AlertRule]:
+        """
+        Returns the rules of a market triggered by a spread value.
+
+        Args:
+            market_id (str): The unique identifier for the market, in any case.
+            spread_value (float): The current spread of the market.
+        """
+        with self._lock:
+            market = self._markets.get(market_id.upper())
+            if market is None:
+                return []
+            above, below = market.above, market.below
+            return (
+                above.rules[: bisect_left(above.thresholds, spread_value)]
+                + below.rules[bisect_right(below.thresholds, spread_value) :]
+            )
+
+    def find_crossed(
+        self, market_id: str, previous_value: float, spread_value: float
+    ) -> List[Tuple[AlertRule, bool]]:
+        """
+        Returns the rules of a market whose state changed when its spread moved from one value to another.
+
+        Args:
+            market_id (str): The unique identifier for the market, in any case.
+            previous_value (float): The previous spread of the market.
+            spread_value (float): The current spread of the market.
+
+        Returns:
+            List[Tuple[AlertRule, bool]]: Each crossed rule, with True if it became triggered or False if it stopped being triggered.
+        """
+        if spread_value == previous_value:
+            return []
+        low, high = sorted((previous_value, spread_value))
+        rising = spread_value > previous_value
+        with self._lock:
+            market = self._markets.get(market_id.upper())
+            if market is None:
+                return []
+            above, below = market.above, market.below
+            # Above rules change for thresholds in [low, high), below rules for (low, high]
+            crossed_above = above.rules[
+                bisect_left(above.thresholds, low) : bisect_left(above.thresholds, high)
+            ]
+            crossed_below = below.rules[
+                bisect_right(below.thresholds, low) : bisect_right(
+                    below.thresholds, high
+                )
+            ]
+        return [(rule, rising) for rule in crossed_above] + [
+            (rule, not rising) for rule in crossed_below
+        ]
@@ -0,0 +1,272 @@
+import asyncio
+import sqlite3
+import threading
+import traceback
+from typing import Any, Dict, List, Optional
+
+from app.services.alert_index import ABOVE, BELOW, AlertIndex, AlertRule
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_rules (
+    market_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    threshold REAL NOT NULL,
+    PRIMARY KEY (market_id, name)
+);
+CREATE TABLE IF NOT EXISTS spread_alert (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    value REAL,
+    webhook_url TEXT
+);
+"""
+
+
+class AlertRepository:
+    def __init__(self, path: str) -> None:
+        """
+        Initializes a SQLite repository for the alert rules and the spread alert. The database is opened on first use, in WAL mode so that the processes sharing it can read while one of them writes.
+
+        Args:
+            path (str): The path of the SQLite database file, created if missing.
+        """
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=5.0, check_same_thread=False, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            columns = [
+                row[1] for row in connection.execute("PRAGMA table_info(spread_alert)")
+            ]
+            # Databases created before webhooks were supported lack the column
+            if "webhook_url" not in columns:
+                connection.execute(
+                    "ALTER TABLE spread_alert ADD COLUMN webhook_url TEXT"
+                )
+            self._connection = connection
+        return self._connection
+
+    def data_version(self) -> int:
+        """
+        Returns a number that changes every time another connection commits to the database. Reading it does not touch the database file.
+        """
+        with self._lock:
+            return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def get_rules(self) -> List[AlertRule]:
+        """
+        Returns every stored alert rule.
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT market_id, name, direction, threshold FROM alert_rules"
+            ).fetchall()
+        return [AlertRule(*row) for row in rows]
+
+    def save_rule(self, rule: AlertRule) -> None:
+        """
+        Stores an alert rule, replacing the rule of the same market and name.
+
+        Args:
+            rule (AlertRule): The rule to store.
+        """
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO alert_rules (market_id, name, direction, threshold) "
+                "VALUES (?, ?, ?, ?)",
+                tuple(rule),
+            )
+
+    def delete_rule(self, market_id: str, name: str) -> bool:
+        """
+        Deletes an alert rule.
+
+        Args:
+            market_id (str): The upper-cased unique identifier for the market.
+            name (str): The name of the rule.
+
+        Returns:
+            bool: Whether a rule was deleted.
+        """
+        with self._lock:
+            cursor = self.connection.execute(
+                "DELETE FROM alert_rules WHERE market_id = ? AND name = ?",
+                (market_id, name),
+            )
+        return cursor.rowcount > 0
+
+    def get_spread_alert(self) -> Dict[str, Any]:
+        """
+        Returns the spread alert as a dictionary with its "value" and "webhook_url", both None if it is not set.
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT value, webhook_url FROM spread_alert WHERE id = 1"
+            ).fetchone()
+        value, webhook_url = (None, None) if row is None else row
+        return {"value": value, "webhook_url": webhook_url}
+
+    def set_spread_alert(self, value: float, webhook_url: Optional[str]) -> None:
+        """
+        Stores the spread alert.
+
+        Args:
+            value (float): The value of the spread alert.
+            webhook_url (Optional[str]): The URL notified when a spread crosses the value, if any.
+        """
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO spread_alert (id, value, webhook_url) "
+                "VALUES (1, ?, ?)",
+                (value, webhook_url),
+            )
+
+    def close(self) -> None:
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class AlertStore:
+    def __init__(self, repository: AlertRepository, index: AlertIndex) -> None:
+        """
+        Initializes a read-through cache of the alerts stored in a repository.
+
+        Reads are served from the in-memory alert index and spread alert, so evaluating alerts never touches the database. Writes go to the repository first. Changes committed by other processes are picked up by sync, which reloads the cache whenever the repository's data version changes.
+
+        Args:
+            repository (AlertRepository): The durable storage shared by every process.
+            index (AlertIndex): The in-memory index of the alert rules.
+        """
+        self.repository = repository
+        self.index = index
+        # Updated in place, so it can be shared as the module-level spread alert
+        self.spread_alert: Dict[str, Any] = {"value": None, "webhook_url": None}
+        self._data_version: Optional[int] = None
+        # Keeps a reload from dropping a write made while it read the repository
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def load(self) -> None:
+        """
+        Replaces the cached alerts with the ones stored in the repository.
+        """
+        with self._lock:
+            data_version = self.repository.data_version()
+            self.index.replace_all(self.repository.get_rules())
+            self.spread_alert.update(self.repository.get_spread_alert())
+            self._data_version = data_version
+
+    def sync(self) -> bool:
+        """
+        Reloads the cached alerts if another process changed the repository since the last load.
+
+        Returns:
+            bool: Whether the cache was reloaded.
+        """
+        if self.repository.data_version() == self._data_version:
+            return False
+        self.load()
+        return True
+
+    def add_rule(
+        self, market_id: str, name: str, direction: str, threshold: float
+    ) -> AlertRule:
+        """
+        Stores an alert rule and adds it to the cache, replacing the rule with the same market and name.
+
+        Args:
+            market_id (str): The unique identifier for the market, in any case.
+            name (str): The name of the rule, unique per market.
+            direction (str): "above" or "below".
+            threshold (float): The spread value the rule compares against.
+
+        Returns:
+            AlertRule: The stored rule.
+
+        Raises:
+            ValueError: If the direction is not "above" or "below".
+        """
+        if direction not in (ABOVE, BELOW):
+            raise ValueError(f"Invalid alert direction: {direction}")
+        rule = AlertRule(market_id.upper(), name, direction, float(threshold))
+        with self._lock:
+            self.repository.save_rule(rule)
+            return self.index.add(*rule)
+
+    def remove_rule(self, market_id: str, name: str) -> bool:
+        """
+        Deletes an alert rule from the repository and the cache.
+
+        Args:
+            market_id (str): The unique identifier for the market, in any case.
+            name (str): The name of the rule.
+
+        Returns:
+            bool: Whether the repository had the rule. The cache may not hold a rule another process stored since the last sync.
+        """
+        with self._lock:
+            is_deleted = self.repository.delete_rule(market_id.upper(), name)
+            self.index.remove(market_id, name)
+        return is_deleted
+
+    def set_spread_alert(self, value: float, webhook_url: Optional[str] = None) -> None:
+        """
+        Stores the spread alert and updates the cache.
+
+        Args:
+            value (float): The value of the spread alert.
+            webhook_url (Optional[str]): The URL notified when a spread crosses the value, if any.
+        """
+        with self._lock:
+            self.repository.set_spread_alert(value, webhook_url)
+            self.spread_alert.update(value=value, webhook_url=webhook_url)
+
+    async def run_sync(self, interval: float) -> None:
+        """
+        Syncs the cache forever at the given interval, off the event loop. Failed syncs are reported and retried on the next tick.
+
+        Args:
+            interval (float): The number of seconds between two syncs.
+        """
+        while True:
+            try:
+                await asyncio.to_thread(self.sync)
+            except Exception:
+                print(traceback.format_exc())
+            await asyncio.sleep(interval)
+
+    def start_sync(self, interval: float) -> None:
+        """
+        Starts syncing in a background task of the running event loop.
+
+        Args:
+            interval (float): The number of seconds between two syncs.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_sync(interval))
+
+    async def stop_sync(self) -> None:
+        """
+        Cancels the background sync task and waits for it to finish.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -1,6 +1,9 @@
 import base64
 import hmac
 import time
+from types import SimpleNamespace
+
+import httpx
 from requests.auth import AuthBase
 
 
@@ -36,3 +39,21 @@ class BudaHMACAuth(AuthBase):
         r.headers["X-SBTC-NONCE"] = nonce
         r.headers["X-SBTC-SIGNATURE"] = signature
         return r
+
+
+class BudaHMACHttpxAuth(httpx.Auth):
+    """Adjunta la autenticación HMAC de Buda a un request de httpx."""
+
+    def __init__(self, api_key: str, secret: str):
+        self.hmac_auth = BudaHMACAuth(api_key=api_key, secret=secret)
+
+    def auth_flow(self, request: httpx.Request):
+        # Adaptar el request de httpx a la interfaz que firma BudaHMACAuth
+        prepared = SimpleNamespace(
+            method=request.method,
+            path_url=request.url.raw_path.decode(),
+            body=request.content or None,
+            headers=request.headers,
+        )
+        self.hmac_auth(prepared)
+        yield request
@@ -1,22 +1,176 @@
+import asyncio
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
 import requests
-from config import settings
-from typing import Any, Dict
+from requests.adapters import HTTPAdapter
+from requests.exceptions import HTTPError, RequestException
 
-from app.services.auth import BudaHMACAuth
+from app.services.auth import BudaHMACAuth, BudaHMACHttpxAuth
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.metrics import (
+    upstream_rate_limit_wait,
+    upstream_request_duration,
+    upstream_requests_in_flight,
+    upstream_retries,
+)
+from app.services.rate_limiter import (
+    HIGH_PRIORITY,
+    LOW_PRIORITY,
+    RateLimiter,
+    SQLiteTokenBucket,
+    TokenBucket,
+)
+from app.services.single_flight import AsyncSingleFlight, SingleFlight
+from app.utils.profiling import record_phase
 from config import settings
 
 
+def create_session() -> requests.Session:
+    """
+    Creates a persistent HTTP session with a keep-alive connection pool for the BUDA API.
+
+    Returns:
+        requests.Session: A session whose adapters are sized from settings and that signs every request with the BUDA HMAC authentication.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=settings.BUDA_API_POOL_CONNECTIONS,
+        pool_maxsize=settings.BUDA_API_POOL_MAXSIZE,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.auth = BudaHMACAuth(
+        api_key=settings.BUDA_API_KEY, secret=settings.BUDA_API_SECRET
+    )
+    return session
+
+
+def create_async_client() -> httpx.AsyncClient:
+    """
+    Creates an asynchronous HTTP client with a keep-alive connection pool for the BUDA API.
+
+    Returns:
+        httpx.AsyncClient: A client whose pool limits and timeouts come from settings and that signs every request with the BUDA HMAC authentication.
+    """
+    return httpx.AsyncClient(
+        auth=BudaHMACHttpxAuth(
+            api_key=settings.BUDA_API_KEY, secret=settings.BUDA_API_SECRET
+        ),
+        timeout=httpx.Timeout(
+            settings.BUDA_API_READ_TIMEOUT, connect=settings.BUDA_API_CONNECT_TIMEOUT
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.BUDA_API_ASYNC_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.BUDA_API_POOL_MAXSIZE,
+        ),
+    )
+
+
+def create_circuit_breaker() -> CircuitBreaker:
+    """
+    Creates a circuit breaker for the BUDA API, with its threshold and reset timeout from settings.
+    """
+    return CircuitBreaker(
+        failure_threshold=settings.BUDA_API_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.BUDA_API_BREAKER_RESET_TIMEOUT,
+    )
+
+
+def create_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Creates the rate limiter of the requests to the BUDA API from settings.
+
+    Returns:
+        Optional[RateLimiter]: A limiter backed by a bucket of this process, or by a SQLite bucket shared with the other workers if BUDA_API_RATE_LIMIT_DB_PATH is set. None if BUDA_API_RATE_LIMIT is 0 or less.
+    """
+    rate = settings.BUDA_API_RATE_LIMIT
+    if rate <= 0:
+        return None
+    burst = settings.BUDA_API_RATE_LIMIT_BURST
+    if settings.BUDA_API_RATE_LIMIT_DB_PATH:
+        bucket = SQLiteTokenBucket(settings.BUDA_API_RATE_LIMIT_DB_PATH, rate, burst)
+    else:
+        bucket = TokenBucket(rate, burst)
+    return RateLimiter(
+        bucket,
+        max_wait=settings.BUDA_API_RATE_LIMIT_MAX_WAIT,
+        low_priority_reserve=settings.BUDA_API_RATE_LIMIT_HIGH_PRIORITY_RESERVE,
+    )
+
+
 class BaseAPIClient:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ) -> None:
         """
-        Initializes the base API client with the base URL from settings.
+        Initializes the base API client with the base URL, timeouts and retry policy from settings.
+
+        The API handlers use the asynchronous methods (_aget and the "a" prefixed service methods). The synchronous methods and their session are kept for callers that run outside an event loop, such as scripts and interactive sessions, and share the same caches.
+
+        Failed requests are retried with jittered exponential backoff when the failure is likely transient: timeouts, connection errors, 429 and 5xx responses. A 429 or 503 response with a Retry-After header is retried after the time it asks for, capped at the maximum backoff. Every attempt goes through the circuit breaker, which fails fast with CircuitOpenError while the BUDA API is unhealthy (429 responses come from a healthy but throttling upstream and do not count towards opening it), then waits for a token of the rate limiter. Bulk requests (all markets or all tickers) have low priority and leave a reserve of tokens for single-market requests.
+
+        Args:
+            session (Optional[requests.Session]): A session to share its connection pool with other clients. A new one is created if not given.
+            circuit_breaker (Optional[CircuitBreaker]): A circuit breaker to share with other clients of the BUDA API. A new one is created if not given.
+            rate_limiter (Optional[RateLimiter]): A rate limiter to share with other clients of the BUDA API. A new one is created from settings if not given.
         """
         self.base_url: str = settings.BUDA_API_URL
+        self.timeout = (
+            settings.BUDA_API_CONNECT_TIMEOUT,
+            settings.BUDA_API_READ_TIMEOUT,
+        )
+        self.path_read_timeouts: Dict[str, float] = settings.BUDA_API_PATH_READ_TIMEOUTS
+        self.max_retries: int = settings.BUDA_API_MAX_RETRIES
+        self.session: requests.Session = session or create_session()
+        self.circuit_breaker = circuit_breaker or create_circuit_breaker()
+        self.rate_limiter = rate_limiter or create_rate_limiter()
+        # Identical concurrent requests share one upstream call
+        self.single_flight = SingleFlight()
+        self.async_single_flight = AsyncSingleFlight()
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """
+        Lazily creates the asynchronous client for the running event loop.
+
+        Raises:
+            RuntimeError: If the client was created by another event loop and not closed with aclose, since its pooled connections can only be used and closed by that loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None:
+            self._async_client = create_async_client()
+            self._async_client_loop = loop
+        elif self._async_client_loop is not loop:
+            raise RuntimeError(
+                "The asynchronous client belongs to another event loop. "
+                "Call aclose() from that loop before using it from a new one."
+            )
+        return self._async_client
+
+    def single_flight_stats(self) -> Dict[str, int]:
+        """
+        Returns how many upstream calls were executed and how many were collapsed into a call already in flight, adding up the synchronous and asynchronous request paths.
+        """
+        sync_stats = self.single_flight.stats()
+        async_stats = self.async_single_flight.stats()
+        return {name: sync_stats[name] + async_stats[name] for name in sync_stats}
 
     def _get(self, path: str) -> Dict[str, Any]:
         """
         Makes a GET request to the specified path and returns the JSON response.
 
+        Concurrent calls for the same path are coalesced into a single request whose result or error is shared by every caller.
+
         Args:
             path (str): The API endpoint path to which the GET request is made.
 
@@ -26,13 +180,239 @@ class BaseAPIClient:
         Raises:
             HTTPError: If the response contains an HTTP error status.
         """
-        response = requests.get(
-            f"{self.base_url}/{path}",
-            auth=BudaHMACAuth(
-                api_key=settings.BUDA_API_KEY, secret=settings.BUDA_API_SECRET
-            ),
-        )
+        return self.single_flight.do(path, lambda: self._request(path))
+
+    def _request(self, path: str) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            try:
+                return self._request_once(path)
+            except RequestException as err:
+                if attempt >= self.max_retries or not _is_retryable(err):
+                    raise
+                upstream_retries.inc(_path_label(path))
+                time.sleep(_retry_delay(err, attempt))
+                attempt += 1
+
+    def _request_once(self, path: str) -> Dict[str, Any]:
+        self._check_circuit_breaker()
+        if self.rate_limiter is not None:
+            priority = _priority(path)
+            self._record_wait(priority, self.rate_limiter.acquire(priority))
+        upstream_requests_in_flight.inc()
+        started_at = time.perf_counter()
+        status = "error"
+        try:
+            response = self.session.get(
+                f"{self.base_url}/{path}", timeout=self._timeout_for(path)
+            )
+            status = str(response.status_code)
+        except requests.exceptions.RequestException as err:
+            status = err.__class__.__name__
+            self._record_outcome(err)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started_at
+            upstream_requests_in_flight.dec()
+            upstream_request_duration.observe(elapsed, _path_label(path), status)
+            record_phase("upstream", elapsed)
+
         if response.ok:
+            self.circuit_breaker.record_success()
             return response.json()
-        else:
+        try:
             response.raise_for_status()
+        except RequestException as err:
+            self._record_outcome(err)
+            raise
+
+    async def _aget(self, path: str) -> Dict[str, Any]:
+        """
+        Makes an asynchronous GET request to the specified path and returns the JSON response.
+
+        Concurrent calls for the same path are coalesced into a single request whose result or error is shared by every caller. Errors are raised as their requests equivalents, so callers handle both clients alike.
+
+        Args:
+            path (str): The API endpoint path to which the GET request is made.
+
+        Returns:
+            Dict[str, Any]: The parsed JSON response from the API.
+
+        Raises:
+            HTTPError: If the response contains an HTTP error status.
+            Timeout: If the request times out.
+            ConnectionError: If the BUDA API cannot be reached.
+        """
+        return await self.async_single_flight.do(path, lambda: self._arequest(path))
+
+    async def _arequest(self, path: str) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            try:
+                return await self._arequest_once(path)
+            except RequestException as err:
+                if attempt >= self.max_retries or not _is_retryable(err):
+                    raise
+                upstream_retries.inc(_path_label(path))
+                await asyncio.sleep(_retry_delay(err, attempt))
+                attempt += 1
+
+    async def _arequest_once(self, path: str) -> Dict[str, Any]:
+        self._check_circuit_breaker()
+        if self.rate_limiter is not None:
+            priority = _priority(path)
+            self._record_wait(priority, await self.rate_limiter.aacquire(priority))
+        url = f"{self.base_url}/{path}"
+        connect_timeout, read_timeout = self._timeout_for(path)
+        upstream_requests_in_flight.inc()
+        started_at = time.perf_counter()
+        status = "error"
+        try:
+            try:
+                response = await self.async_client.get(
+                    url, timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+                )
+                status = str(response.status_code)
+            except httpx.TimeoutException as err:
+                status = "Timeout"
+                raise requests.exceptions.Timeout(str(err)) from err
+            except httpx.TransportError as err:
+                status = "ConnectionError"
+                raise requests.exceptions.ConnectionError(str(err)) from err
+        except RequestException as err:
+            self._record_outcome(err)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started_at
+            upstream_requests_in_flight.dec()
+            upstream_request_duration.observe(elapsed, _path_label(path), status)
+            record_phase("upstream", elapsed)
+
+        if response.is_success:
+            self.circuit_breaker.record_success()
+            return response.json()
+        kind = "Client" if response.status_code < 500 else "Server"
+        err = HTTPError(
+            f"{response.status_code} {kind} Error: {response.reason_phrase} for url: {url}",
+            response=response,
+        )
+        self._record_outcome(err)
+        raise err
+
+    def _check_circuit_breaker(self) -> None:
+        if not self.circuit_breaker.allow_request():
+            retry_after = self.circuit_breaker.retry_after()
+            raise CircuitOpenError(
+                f"The BUDA API circuit breaker is open, retry in {retry_after:.1f} seconds",
+                retry_after=retry_after,
+            )
+
+    def _record_wait(self, priority: str, waited: float) -> None:
+        upstream_rate_limit_wait.observe(waited, priority)
+        if waited > 0:
+            record_phase("rate_limit", waited)
+
+    def _record_outcome(self, err: RequestException) -> None:
+        # Client errors such as 404 or 429 come from a healthy upstream
+        if _is_retryable(err) and not _is_throttled(err):
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+    def _timeout_for(self, path: str) -> Tuple[float, float]:
+        connect_timeout, read_timeout = self.timeout
+        return (
+            connect_timeout,
+            self.path_read_timeouts.get(_path_label(path), read_timeout),
+        )
+
+    def close(self) -> None:
+        """
+        Closes the underlying session and releases its pooled connections.
+        """
+        self.session.close()
+
+    async def aclose(self) -> None:
+        """
+        Closes the session and the asynchronous client, releasing their pooled connections.
+        """
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_client_loop = None
+
+
+_MARKET_PATH = re.compile(r"^markets/[^/]+/")
+
+# Requests for every market refresh caches in bulk and can wait the longest
+_BULK_PATHS = frozenset({"markets", "tickers"})
+
+# Responses worth retrying: rate limited, or a server or gateway failure
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Responses whose Retry-After header tells when to try again
+RETRY_AFTER_STATUS_CODES = frozenset({429, 503})
+
+
+def _path_label(path: str) -> str:
+    # One label per endpoint rather than per market keeps the series count bounded
+    return _MARKET_PATH.sub("markets/{market_id}/", path)
+
+
+def _priority(path: str) -> str:
+    return LOW_PRIORITY if path in _BULK_PATHS else HIGH_PRIORITY
+
+
+def _is_retryable(err: RequestException) -> bool:
+    if isinstance(err, CircuitOpenError):
+        return False
+    if isinstance(
+        err, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+    ):
+        return True
+    response = getattr(err, "response", None)
+    return response is not None and response.status_code in RETRYABLE_STATUS_CODES
+
+
+def _is_throttled(err: RequestException) -> bool:
+    response = getattr(err, "response", None)
+    return response is not None and response.status_code == 429
+
+
+def _retry_delay(err: RequestException, attempt: int) -> float:
+    retry_after = _retry_after(err)
+    if retry_after is None:
+        return _backoff_delay(attempt)
+    # Waiting longer would hold the caller past the backoff cap
+    return min(retry_after, settings.BUDA_API_RETRY_MAX_BACKOFF)
+
+
+def _retry_after(err: RequestException) -> Optional[float]:
+    response = getattr(err, "response", None)
+    if response is None or response.status_code not in RETRY_AFTER_STATUS_CODES:
+        return None
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # Otherwise an HTTP date
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _backoff_delay(attempt: int) -> float:
+    # Full jitter spreads the retries of concurrent callers over the whole window
+    return random.uniform(
+        0,
+        min(
+            settings.BUDA_API_RETRY_MAX_BACKOFF,
+            settings.BUDA_API_RETRY_BACKOFF * 2**attempt,
+        ),
+    )
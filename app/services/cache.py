@@ -0,0 +1,390 @@
+import asyncio
+import threading
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    NamedTuple,
+    Optional,
+    Set,
+)
+
+from app.services.metrics import cache_requests
+from app.services.single_flight import AsyncSingleFlight
+
+
+class _CacheEntry(NamedTuple):
+    value: Any
+    expires_at: float
+
+
+class _KeyLocks:
+    """Hands out one lock per cache key so loads for different keys never block each other."""
+
+    def __init__(self) -> None:
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def __call__(self, key: Hashable) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+
+class TTLCache:
+    def __init__(
+        self,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+        name: str = "cache",
+        stale_if_error: float = 0.0,
+    ) -> None:
+        """
+        Initializes an in-process cache whose entries expire after a fixed time to live.
+
+        Args:
+            ttl (float): The number of seconds an entry stays valid. A value of 0 or less disables caching.
+            clock (Callable[[], float]): A monotonic clock returning the current time in seconds.
+            name (str): The name of the cache in the cache_requests_total metric.
+            stale_if_error (float): The number of seconds after expiring during which an entry is still returned if reloading it fails.
+        """
+        self.ttl = ttl
+        self.stale_if_error = stale_if_error
+        self.name = name
+        self._clock = clock
+        self._entries: Dict[Hashable, _CacheEntry] = {}
+        self._locks = _KeyLocks()
+        self._async_flight = AsyncSingleFlight()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for a key, calling the loader when it is missing or expired.
+
+        Concurrent callers that find the same key expired wait for a single loader call and share its result.
+
+        Args:
+            key (Hashable): The cache key.
+            loader (Callable[[], Any]): A function returning the fresh value for the key.
+
+        Returns:
+            Any: The cached or freshly loaded value.
+
+        Raises:
+            Any exception raised by the loader is propagated and nothing is cached, unless an expired entry can still be returned under stale_if_error.
+        """
+        if self.ttl <= 0:
+            return loader()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > self._clock():
+            cache_requests.inc(self.name, "hit")
+            return entry.value
+
+        with self._locks(key):
+            # Another caller may have refreshed the entry while we waited
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > self._clock():
+                cache_requests.inc(self.name, "hit")
+                return entry.value
+
+            cache_requests.inc(self.name, "miss")
+            try:
+                value = loader()
+            except Exception:
+                return self._stale_if_error(entry)
+            self._entries[key] = _CacheEntry(value, self._clock() + self.ttl)
+            return value
+
+    async def aget_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Asynchronous version of get_or_load, for loaders that are coroutine functions.
+
+        Args:
+            key (Hashable): The cache key.
+            loader (Callable[[], Awaitable[Any]]): A coroutine function returning the fresh value for the key.
+
+        Returns:
+            Any: The cached or freshly loaded value.
+        """
+        if self.ttl <= 0:
+            return await loader()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > self._clock():
+            cache_requests.inc(self.name, "hit")
+            return entry.value
+
+        cache_requests.inc(self.name, "miss")
+
+        async def _load():
+            value = await loader()
+            self._entries[key] = _CacheEntry(value, self._clock() + self.ttl)
+            return value
+
+        try:
+            return await self._async_flight.do(key, _load)
+        except Exception:
+            return self._stale_if_error(entry)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Removes one entry, or every entry when no key is given, from the cache.
+
+        Args:
+            key (Optional[Hashable]): The cache key to remove.
+        """
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _stale_if_error(self, entry: Optional[_CacheEntry]) -> Any:
+        # Called from an except block, so a bare raise re-raises the load error
+        if entry is None or entry.expires_at + self.stale_if_error <= self._clock():
+            raise
+        cache_requests.inc(self.name, "stale_if_error")
+        return entry.value
+
+
+class _StaleEntry(NamedTuple):
+    value: Any
+    fetched_at: float
+
+
+class CacheLookup(NamedTuple):
+    value: Any
+    age: Optional[float]
+    is_stale: bool
+
+
+class StaleWhileRevalidateCache:
+    def __init__(
+        self,
+        fresh_for: float,
+        stale_for: float,
+        clock: Callable[[], float] = time.monotonic,
+        name: str = "cache",
+        stale_if_error: float = 0.0,
+    ) -> None:
+        """
+        Initializes an in-process cache that keeps serving expired entries while a single background refresh runs.
+
+        Args:
+            fresh_for (float): The number of seconds an entry is served without refreshing it. A value of 0 or less disables caching.
+            stale_for (float): The number of seconds after going stale during which an entry is still served while it is refreshed in the background. Older entries are reloaded before returning.
+            clock (Callable[[], float]): A monotonic clock returning the current time in seconds.
+            name (str): The name of the cache in the cache_requests_total metric.
+            stale_if_error (float): The number of seconds after the staleness window during which an entry is still returned, as stale, if reloading it fails.
+        """
+        self.fresh_for = fresh_for
+        self.stale_for = stale_for
+        self.stale_if_error = stale_if_error
+        self.name = name
+        self._clock = clock
+        self._entries: Dict[Hashable, _StaleEntry] = {}
+        self._locks = _KeyLocks()
+        self._refreshing: Set[Hashable] = set()
+        self._refreshing_guard = threading.Lock()
+        self._async_flight = AsyncSingleFlight()
+        self._background_tasks: Set[asyncio.Task] = set()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for a key, refreshing it in the background once it is stale.
+
+        Missing or too old entries are loaded before returning, with concurrent callers sharing a single loader call.
+
+        Args:
+            key (Hashable): The cache key.
+            loader (Callable[[], Any]): A function returning the fresh value for the key.
+
+        Returns:
+            Any: The cached or freshly loaded value.
+
+        Raises:
+            Any exception raised by a blocking loader call is propagated and nothing is cached, unless an older entry can still be returned under stale_if_error. Errors in background refreshes are discarded and the stale entry is kept.
+        """
+        return self.get_or_load_with_age(key, loader).value
+
+    def get_or_load_with_age(
+        self, key: Hashable, loader: Callable[[], Any]
+    ) -> CacheLookup:
+        """
+        Same as get_or_load, but also returns how old the returned value is, read from the same cache entry.
+
+        Args:
+            key (Hashable): The cache key.
+            loader (Callable[[], Any]): A function returning the fresh value for the key.
+
+        Returns:
+            CacheLookup: The value, the number of seconds since it was fetched (None if caching is disabled) and whether it is stale and being refreshed in the background.
+        """
+        if self.fresh_for <= 0:
+            return CacheLookup(loader(), None, False)
+
+        lookup = self._lookup(key)
+        if lookup is not None:
+            self._count_hit(lookup)
+            if lookup.is_stale:
+                self._refresh_in_background(key, loader)
+            return lookup
+
+        with self._locks(key):
+            # Another caller may have refreshed the entry while we waited
+            lookup = self._lookup(key)
+            if lookup is not None and not lookup.is_stale:
+                self._count_hit(lookup)
+                return lookup
+            cache_requests.inc(self.name, "miss")
+            try:
+                return CacheLookup(self._load(key, loader), 0.0, False)
+            except Exception:
+                return self._stale_if_error(key)
+
+    async def aget_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Asynchronous version of get_or_load, for loaders that are coroutine functions. Background refreshes run as tasks of the running event loop.
+
+        Args:
+            key (Hashable): The cache key.
+            loader (Callable[[], Awaitable[Any]]): A coroutine function returning the fresh value for the key.
+
+        Returns:
+            Any: The cached or freshly loaded value.
+        """
+        return (await self.aget_or_load_with_age(key, loader)).value
+
+    async def aget_or_load_with_age(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> CacheLookup:
+        """
+        Asynchronous version of get_or_load_with_age, for loaders that are coroutine functions.
+
+        Args:
+            key (Hashable): The cache key.
+            loader (Callable[[], Awaitable[Any]]): A coroutine function returning the fresh value for the key.
+
+        Returns:
+            CacheLookup: The value, the number of seconds since it was fetched (None if caching is disabled) and whether it is stale and being refreshed in the background.
+        """
+        if self.fresh_for <= 0:
+            return CacheLookup(await loader(), None, False)
+
+        lookup = self._lookup(key)
+        if lookup is not None:
+            self._count_hit(lookup)
+            if lookup.is_stale:
+                self._arefresh_in_background(key, loader)
+            return lookup
+
+        cache_requests.inc(self.name, "miss")
+        try:
+            value = await self._async_flight.do(key, lambda: self._aload(key, loader))
+        except Exception:
+            return self._stale_if_error(key)
+        return CacheLookup(value, 0.0, False)
+
+    def age(self, key: Hashable) -> Optional[float]:
+        """
+        Returns the number of seconds since the entry for a key was fetched, or None if it is not cached.
+
+        Args:
+            key (Hashable): The cache key.
+        """
+        entry = self._entries.get(key)
+        return None if entry is None else self._age(entry)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Removes one entry, or every entry when no key is given, from the cache.
+
+        Args:
+            key (Optional[Hashable]): The cache key to remove.
+        """
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _stale_if_error(self, key: Hashable) -> CacheLookup:
+        # Called from an except block, so a bare raise re-raises the load error
+        entry = self._entries.get(key)
+        if entry is None:
+            raise
+        age = self._age(entry)
+        if age >= self.fresh_for + self.stale_for + self.stale_if_error:
+            raise
+        cache_requests.inc(self.name, "stale_if_error")
+        return CacheLookup(entry.value, age, True)
+
+    def _count_hit(self, lookup: CacheLookup) -> None:
+        cache_requests.inc(self.name, "stale" if lookup.is_stale else "hit")
+
+    def _age(self, entry: _StaleEntry) -> float:
+        return self._clock() - entry.fetched_at
+
+    def _lookup(self, key: Hashable) -> Optional[CacheLookup]:
+        # Entries past the staleness window are treated as missing
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        age = self._age(entry)
+        if age >= self.fresh_for + self.stale_for:
+            return None
+        return CacheLookup(entry.value, age, age >= self.fresh_for)
+
+    def _load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        value = loader()
+        self._entries[key] = _StaleEntry(value, self._clock())
+        return value
+
+    async def _aload(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await loader()
+        self._entries[key] = _StaleEntry(value, self._clock())
+        return value
+
+    def _arefresh_in_background(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> None:
+        with self._refreshing_guard:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def _refresh():
+            try:
+                await self._async_flight.do(key, lambda: self._aload(key, loader))
+            except Exception:
+                pass
+            finally:
+                with self._refreshing_guard:
+                    self._refreshing.discard(key)
+
+        # Keep a reference so the task is not garbage collected while running
+        task = asyncio.ensure_future(_refresh())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _refresh_in_background(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        with self._refreshing_guard:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _refresh():
+            try:
+                with self._locks(key):
+                    self._load(key, loader)
+            except Exception:
+                pass
+            finally:
+                with self._refreshing_guard:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=_refresh, name="cache-refresh", daemon=True).start()
@@ -0,0 +1,110 @@
+import threading
+import time
+from typing import Callable, Dict
+
+from requests.exceptions import RequestException
+
+
+class CircuitOpenError(RequestException):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+    def __init__(self, message: str, retry_after: float = 0.0) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    STATES = (CLOSED, OPEN, HALF_OPEN)
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initializes a circuit breaker that stops calling an unhealthy upstream until it has had time to recover.
+
+        The breaker opens after a number of consecutive failures and rejects every call while open. Once the reset timeout elapses it is half open: a single probe call is let through, closing the breaker if it succeeds and opening it again if it fails. Further calls are rejected until the probe finishes, or until another reset timeout elapses if its outcome is never recorded.
+
+        Args:
+            failure_threshold (int): The number of consecutive failures that opens the breaker.
+            reset_timeout (float): The number of seconds the breaker stays open before letting a probe call through.
+            clock (Callable[[], float]): A monotonic clock returning the current time in seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        """
+        Returns the current state: "closed", "open" or "half_open".
+        """
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Returns whether a call may be made now, counting the rejected ones.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            now = self._clock()
+            if now - self._opened_at >= self.reset_timeout:
+                # Let one probe through and restart the timer for the next one
+                self._state = self.HALF_OPEN
+                self._opened_at = now
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        """
+        Records a call answered by a healthy upstream, closing the breaker.
+        """
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        """
+        Records a failed call, opening the breaker once the failure threshold is reached or when the probe of a half open breaker fails.
+        """
+        with self._lock:
+            self._consecutive_failures += 1
+            if (
+                self._state == self.HALF_OPEN
+                or self._consecutive_failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+    def retry_after(self) -> float:
+        """
+        Returns the number of seconds until the breaker lets a probe call through, 0 if calls are allowed now.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Returns the state, the number of consecutive failures and the number of calls rejected since the breaker was created.
+        """
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "rejected": self._rejected,
+            }
@@ -1,9 +1,20 @@
 from typing import Dict, Any
 
 from app.services.base_api_client import BaseAPIClient
+from app.services.cache import TTLCache
+from config import settings
 
 
 class MarketService(BaseAPIClient):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # The market catalogue rarely changes, so it is served from memory
+        self.cache = TTLCache(
+            ttl=settings.MARKETS_CACHE_TTL,
+            name="markets",
+            stale_if_error=settings.MARKETS_CACHE_STALE_IF_ERROR_SECONDS,
+        )
+
     def get_all(self) -> Dict[str, Any]:
         """
         Retrieves all markets from the BUDA API.
@@ -11,7 +22,7 @@ class MarketService(BaseAPIClient):
         Returns:
             Dict[str, Any]: A dictionary containing the JSON response with all markets.
         """
-        return self._get("markets")
+        return self.cache.get_or_load("markets", lambda: self._get("markets"))
 
     def get_one_by_id(self, market_id: str) -> Dict[str, Any]:
         """
@@ -23,4 +34,33 @@ class MarketService(BaseAPIClient):
         Returns:
             Dict[str, Any]: A dictionary containing the JSON response for the specified market.
         """
-        return self._get(f"markets/{market_id}")
+        path = f"markets/{market_id}"
+        return self.cache.get_or_load(path, lambda: self._get(path))
+
+    async def aget_all(self) -> Dict[str, Any]:
+        """
+        Retrieves all markets from the BUDA API asynchronously.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing the JSON response with all markets.
+        """
+        return await self.cache.aget_or_load("markets", lambda: self._aget("markets"))
+
+    async def aget_one_by_id(self, market_id: str) -> Dict[str, Any]:
+        """
+        Retrieves a specific market by its ID from the BUDA API asynchronously.
+
+        Args:
+            market_id (str): The unique identifier for the market.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing the JSON response for the specified market.
+        """
+        path = f"markets/{market_id}"
+        return await self.cache.aget_or_load(path, lambda: self._aget(path))
+
+    def invalidate_cache(self) -> None:
+        """
+        Discards every cached market so the next calls reach the BUDA API.
+        """
+        self.cache.invalidate()
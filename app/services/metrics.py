@@ -0,0 +1,317 @@
+import itertools
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Latency buckets in seconds, from a cache hit to a slow upstream call
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+_SHARD_COUNT = 16
+# Threads take shards in turn, since thread idents are aligned addresses that
+# would all map to the same shard
+_thread_shard = threading.local()
+_next_shard_index = itertools.count()
+
+
+class _Shard:
+    __slots__ = ("lock", "values")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.values: Dict[LabelValues, object] = {}
+
+
+class _ShardedMetric(ABC):
+    """Spreads updates over striped shards picked by thread, so threads rarely wait for each other."""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._shards = [_Shard() for _ in range(_SHARD_COUNT)]
+
+    def _shard(self) -> _Shard:
+        return self._shards[_shard_index()]
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ] + self._render_samples()
+
+    @abstractmethod
+    def _render_samples(self) -> List[str]:
+        """Returns the exposition lines of every sample of the metric."""
+
+
+def _shard_index() -> int:
+    try:
+        return _thread_shard.index
+    except AttributeError:
+        # itertools.count is atomic, so concurrent threads get distinct indices
+        _thread_shard.index = next(_next_shard_index) % _SHARD_COUNT
+        return _thread_shard.index
+
+
+class Counter(_ShardedMetric):
+    type = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """
+        Adds an amount to the counter of the given label values.
+
+        Args:
+            label_values (str): One value per label name, in order.
+            amount (float): The amount added. Gauges accept negative amounts.
+        """
+        shard = self._shard()
+        with shard.lock:
+            shard.values[label_values] = shard.values.get(label_values, 0.0) + amount
+
+    def values(self) -> Dict[LabelValues, float]:
+        """
+        Returns the current value of every label combination, adding up the shards.
+        """
+        totals: Dict[LabelValues, float] = {}
+        for shard in self._shards:
+            with shard.lock:
+                items = list(shard.values.items())
+            for label_values, value in items:
+                totals[label_values] = totals.get(label_values, 0.0) + value
+        return totals
+
+    def _render_samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}"
+            for label_values, value in sorted(self.values().items())
+        ]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        """
+        Subtracts an amount from the gauge of the given label values.
+        """
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(_ShardedMetric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """
+        Records an observation, such as a latency in seconds, for the given label values.
+
+        Args:
+            value (float): The observed value.
+            label_values (str): One value per label name, in order.
+        """
+        index = bisect_left(self.buckets, value)
+        shard = self._shard()
+        with shard.lock:
+            state = shard.values.get(label_values)
+            if state is None:
+                # One count per bucket and one for +Inf, then the sum
+                state = [0] * (len(self.buckets) + 1) + [0.0]
+                shard.values[label_values] = state
+            state[index] += 1
+            state[-1] += value
+
+    def values(self) -> Dict[LabelValues, List[float]]:
+        """
+        Returns the per-bucket counts followed by the sum of every label combination, adding up the shards.
+        """
+        totals: Dict[LabelValues, List[float]] = {}
+        for shard in self._shards:
+            with shard.lock:
+                items = [(key, list(state)) for key, state in shard.values.items()]
+            for label_values, state in items:
+                total = totals.setdefault(label_values, [0] * len(state))
+                for index, value in enumerate(state):
+                    total[index] += value
+        return totals
+
+    def _render_samples(self) -> List[str]:
+        lines = []
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for label_values, state in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, state):
+                cumulative += count
+                labels = _format_labels(
+                    self.label_names + ("le",), label_values + (bound,)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CallbackCounter:
+    type = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        callback: Callable[[], Dict[LabelValues, float]],
+    ):
+        """
+        Initializes a counter read from existing statistics at collection time, costing nothing on the hot path.
+
+        Args:
+            name (str): The metric name.
+            documentation (str): The help text of the metric.
+            label_names (Sequence[str]): The label names.
+            callback (Callable[[], Dict[LabelValues, float]]): A function returning the value of every label combination.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ] + [
+            f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}"
+            for label_values, value in sorted(self.callback().items())
+        ]
+
+
+class CallbackGauge(CallbackCounter):
+    type = "gauge"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        """
+        Initializes a collection of metrics rendered together in the Prometheus text format.
+        """
+        self._metrics: List = []
+
+    def register(self, metric):
+        """
+        Adds a metric to the registry.
+
+        Returns:
+            The registered metric, so it can be created and registered in one statement.
+        """
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Returns every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(label_names: Sequence[str], label_values: Sequence[str]) -> str:
+    if not label_names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"'
+        for name, value in zip(label_names, label_values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time until the response starts, by route template.",
+        ("method", "route", "status"),
+    )
+)
+upstream_request_duration = registry.register(
+    Histogram(
+        "buda_api_request_duration_seconds",
+        "Latency of the requests made to the BUDA API, by path template and status code or error.",
+        ("path", "status"),
+    )
+)
+upstream_requests_in_flight = registry.register(
+    Gauge(
+        "buda_api_requests_in_flight",
+        "Requests to the BUDA API waiting for a response.",
+        (),
+    )
+)
+upstream_retries = registry.register(
+    Counter(
+        "buda_api_retries_total",
+        "Requests to the BUDA API retried after a transient failure, by path template.",
+        ("path",),
+    )
+)
+upstream_rate_limit_wait = registry.register(
+    Histogram(
+        "buda_api_rate_limit_wait_seconds",
+        "Time spent waiting for the rate limiter before calling the BUDA API, by priority.",
+        ("priority",),
+    )
+)
+cache_requests = registry.register(
+    Counter(
+        "cache_requests_total",
+        "Cache lookups by result: hit, stale (served while refreshing), miss, or stale_if_error (a failed load answered from an expired entry).",
+        ("cache", "result"),
+    )
+)
+validation_failures = registry.register(
+    Counter(
+        "validation_failures_total",
+        "Upstream payloads rejected by schema validation, by schema.",
+        ("schema",),
+    )
+)
@@ -0,0 +1,133 @@
+import asyncio
+import time
+import traceback
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from app import schemas
+from app.services.markets import MarketService
+from app.services.metrics import validation_failures
+from app.services.spread_feed import SpreadFeed
+from app.services.ticker_book import TickerBook
+from app.services.tickers import TickerService
+from app.utils import calculate_spreads
+
+
+class MarketDataPoller:
+    def __init__(
+        self,
+        markets: MarketService,
+        tickers: TickerService,
+        ticker_book: TickerBook,
+        interval: float,
+        spread_feed: Optional[SpreadFeed] = None,
+    ) -> None:
+        """
+        Initializes a background poller that keeps a ticker book up to date with the BUDA API.
+
+        Args:
+            markets (MarketService): The service used to list the markets.
+            tickers (TickerService): The service used to fetch the tickers.
+            ticker_book (TickerBook): The book updated after every poll.
+            interval (float): The number of seconds between the start of two polls.
+            spread_feed (Optional[SpreadFeed]): A feed the spreads of every poll are published to.
+        """
+        self.markets = markets
+        self.tickers = tickers
+        self.ticker_book = ticker_book
+        self.interval = interval
+        self.spread_feed = spread_feed
+        self._task: Optional[asyncio.Task] = None
+        # Polling continues while started explicitly or retained by any caller
+        self._keep_running = False
+        self._retain_count = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def poll_once(self) -> None:
+        """
+        Fetches the ticker of every market from the BUDA API, stores them in the ticker book and publishes their spreads.
+        """
+        markets = await self.markets.aget_all()
+        market_ids = [market["id"] for market in markets["markets"]]
+        tickers = await self.tickers.aget_all(market_ids=market_ids, use_cache=False)
+        self.ticker_book.update(tickers["tickers"])
+        if self.spread_feed is not None:
+            self.spread_feed.publish(_calculate_spreads(tickers["tickers"]))
+
+    async def run(self) -> None:
+        """
+        Polls the BUDA API forever at the configured interval. Failed polls are reported and retried on the next tick.
+        """
+        while True:
+            started_at = time.monotonic()
+            try:
+                await self.poll_once()
+            except Exception:
+                print(traceback.format_exc())
+            elapsed = time.monotonic() - started_at
+            await asyncio.sleep(max(0.0, self.interval - elapsed))
+
+    def start(self) -> None:
+        """
+        Starts polling in a background task of the running event loop until stop is called.
+        """
+        self._keep_running = True
+        self._ensure_running()
+
+    def retain(self) -> None:
+        """
+        Starts polling, if it is not running yet, until every retain call is matched by a release call. Used to keep market data flowing while a consumer such as a spread stream is connected.
+        """
+        self._retain_count += 1
+        self._ensure_running()
+
+    async def release(self) -> None:
+        """
+        Releases one retain call, stopping the poll once no caller retains it unless it was started with start.
+        """
+        self._retain_count = max(0, self._retain_count - 1)
+        if self._retain_count == 0 and not self._keep_running:
+            await self._cancel()
+
+    async def stop(self) -> None:
+        """
+        Cancels the background task and waits for it to finish.
+        """
+        self._keep_running = False
+        await self._cancel()
+
+    def _ensure_running(self) -> None:
+        if not self.is_running:
+            self._task = asyncio.create_task(self.run())
+
+    async def _cancel(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+def _calculate_spreads(tickers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Malformed tickers are skipped here and reported when a handler reads them
+    valid_tickers = []
+    for ticker_data in tickers:
+        try:
+            ticker = schemas.decode_ticker_quote(ticker_data)
+            # Prices such as "1.2.3" pass the schema but cannot be parsed
+            float(ticker["min_ask"][0])
+            float(ticker["max_bid"][0])
+        except ValidationError as e:
+            validation_failures.inc(e.title)
+            continue
+        except ValueError:
+            continue
+        valid_tickers.append(ticker)
+    return calculate_spreads(valid_tickers).to_spreads()
@@ -0,0 +1,56 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional
+
+
+class StoredProfile(NamedTuple):
+    id: str
+    method: str
+    path: str
+    status: int
+    started_at: float
+    duration: float
+    phases: Dict[str, Dict[str, float]]
+
+
+class ProfileStore:
+    def __init__(self, max_profiles: int) -> None:
+        """
+        Initializes a bounded in-memory store of request profiles.
+
+        Args:
+            max_profiles (int): The number of most recent profiles kept. Older profiles are dropped.
+        """
+        self.max_profiles = max_profiles
+        self._profiles: Deque[StoredProfile] = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+
+    def add(self, profile: StoredProfile) -> None:
+        """
+        Stores a profile, dropping the oldest one if the store is full.
+
+        Args:
+            profile (StoredProfile): The profile to store.
+        """
+        with self._lock:
+            self._profiles.append(profile)
+
+    def get(self, profile_id: str) -> Optional[StoredProfile]:
+        """
+        Returns a stored profile, or None if it is unknown or was dropped.
+
+        Args:
+            profile_id (str): The id of the profile.
+        """
+        with self._lock:
+            for profile in self._profiles:
+                if profile.id == profile_id:
+                    return profile
+        return None
+
+    def get_all(self) -> List[StoredProfile]:
+        """
+        Returns every stored profile, oldest first.
+        """
+        with self._lock:
+            return list(self._profiles)
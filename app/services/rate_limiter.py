@@ -0,0 +1,275 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from requests.exceptions import RequestException
+
+HIGH_PRIORITY = "high"
+LOW_PRIORITY = "low"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS token_buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class RateLimitExceeded(RequestException):
+    """Raised when the upstream request budget stays exhausted for longer than callers may wait."""
+
+    def __init__(self, message: str, retry_after: float = 0.0) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _refill_and_take(
+    tokens: float,
+    elapsed: float,
+    rate: float,
+    capacity: float,
+    reserve: float,
+) -> Tuple[float, float]:
+    # Returns the tokens left and the seconds to wait, 0 if a token was taken
+    tokens = min(capacity, tokens + max(elapsed, 0.0) * rate)
+    if tokens - 1 >= reserve:
+        return tokens - 1, 0.0
+    return tokens, (reserve + 1 - tokens) / rate
+
+
+class TokenBucket:
+    # Taking a token never blocks, so callers may do it from the event loop
+    blocking = False
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initializes a token bucket refilled at a constant rate, shared by the threads and tasks of one process.
+
+        Args:
+            rate (float): The number of tokens added per second.
+            capacity (float): The maximum number of tokens, which is the largest burst allowed. The bucket starts full.
+            clock (Callable[[], float]): A monotonic clock returning the current time in seconds.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def try_take(self, reserve: float = 0.0) -> float:
+        """
+        Takes a token if one is available above the reserve.
+
+        Args:
+            reserve (float): The number of tokens that must remain in the bucket after taking one, kept for higher priority callers.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the number of seconds until one is available.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens, wait = _refill_and_take(
+                self._tokens,
+                now - self._updated_at,
+                self.rate,
+                self.capacity,
+                reserve,
+            )
+            self._updated_at = now
+            return wait
+
+    def close(self) -> None:
+        """
+        Does nothing, the bucket holds no resources.
+        """
+
+
+class SQLiteTokenBucket:
+    # Taking a token may wait for another process holding the database lock
+    blocking = True
+
+    def __init__(
+        self,
+        path: str,
+        rate: float,
+        capacity: float,
+        name: str = "buda_api",
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Initializes a token bucket stored in a SQLite database, shared by every process using the same file.
+
+        Each token is taken in an immediate transaction, so the processes never hand out the same token twice. The wall clock is used because monotonic clocks are not comparable across processes.
+
+        Args:
+            path (str): The path of the SQLite database file, created if missing.
+            rate (float): The number of tokens added per second, for all processes together.
+            capacity (float): The maximum number of tokens, which is the largest burst allowed. The bucket starts full.
+            name (str): The name of the bucket, so one file can hold several.
+            clock (Callable[[], float]): A clock returning the Unix time in seconds.
+        """
+        self.path = path
+        self.rate = rate
+        self.capacity = capacity
+        self.name = name
+        self._clock = clock
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=5.0, check_same_thread=False, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def try_take(self, reserve: float = 0.0) -> float:
+        """
+        Takes a token if one is available above the reserve.
+
+        Args:
+            reserve (float): The number of tokens that must remain in the bucket after taking one, kept for higher priority callers.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the number of seconds until one is available.
+        """
+        with self._lock:
+            connection = self.connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                now = self._clock()
+                row = connection.execute(
+                    "SELECT tokens, updated_at FROM token_buckets WHERE name = ?",
+                    (self.name,),
+                ).fetchone()
+                tokens, updated_at = row if row is not None else (self.capacity, now)
+                tokens, wait = _refill_and_take(
+                    tokens, now - updated_at, self.rate, self.capacity, reserve
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO token_buckets (name, tokens, updated_at) "
+                    "VALUES (?, ?, ?)",
+                    (self.name, tokens, now),
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            return wait
+
+    def close(self) -> None:
+        """
+        Closes the database connection, if it was opened.
+        """
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        bucket,
+        max_wait: float,
+        low_priority_reserve: float = 0.0,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initializes a rate limiter that makes callers wait for a token of the bucket before calling the upstream.
+
+        Low priority callers, such as bulk refreshes, leave a reserve of tokens in the bucket, so single-market requests still go through when bulk work has used up the rest of the budget.
+
+        Args:
+            bucket (TokenBucket | SQLiteTokenBucket): The bucket of the process, or one shared by every worker.
+            max_wait (float): The number of seconds a caller may wait for a token before RateLimitExceeded is raised.
+            low_priority_reserve (float): The number of tokens low priority callers leave in the bucket.
+            sleep (Callable[[float], None]): The function used by synchronous callers to wait.
+            clock (Callable[[], float]): A monotonic clock returning the current time in seconds.
+        """
+        self.bucket = bucket
+        self.max_wait = max_wait
+        self.low_priority_reserve = low_priority_reserve
+        self._sleep = sleep
+        self._clock = clock
+
+    def acquire(self, priority: str = HIGH_PRIORITY) -> float:
+        """
+        Waits until a token is taken for one upstream request.
+
+        Args:
+            priority (str): HIGH_PRIORITY or LOW_PRIORITY.
+
+        Returns:
+            float: The number of seconds spent waiting.
+
+        Raises:
+            RateLimitExceeded: If no token is available within max_wait seconds.
+        """
+        started_at = self._clock()
+        waited = 0.0
+        while True:
+            wait = self.bucket.try_take(self._reserve(priority))
+            if wait == 0:
+                return waited
+            self._sleep(self._next_sleep(started_at, wait))
+            waited = self._clock() - started_at
+
+    async def aacquire(self, priority: str = HIGH_PRIORITY) -> float:
+        """
+        Asynchronous version of acquire, waiting without blocking the event loop.
+
+        Args:
+            priority (str): HIGH_PRIORITY or LOW_PRIORITY.
+
+        Returns:
+            float: The number of seconds spent waiting.
+
+        Raises:
+            RateLimitExceeded: If no token is available within max_wait seconds.
+        """
+        started_at = self._clock()
+        waited = 0.0
+        reserve = self._reserve(priority)
+        while True:
+            if self.bucket.blocking:
+                wait = await asyncio.to_thread(self.bucket.try_take, reserve)
+            else:
+                wait = self.bucket.try_take(reserve)
+            if wait == 0:
+                return waited
+            await asyncio.sleep(self._next_sleep(started_at, wait))
+            waited = self._clock() - started_at
+
+    def close(self) -> None:
+        """
+        Releases the resources held by the bucket.
+        """
+        self.bucket.close()
+
+    def _reserve(self, priority: str) -> float:
+        return self.low_priority_reserve if priority == LOW_PRIORITY else 0.0
+
+    def _next_sleep(self, started_at: float, wait: float) -> float:
+        waited = self._clock() - started_at
+        if waited + wait > self.max_wait:
+            raise RateLimitExceeded(
+                f"The BUDA API request budget is exhausted, retry in {wait:.1f} seconds",
+                retry_after=wait,
+            )
+        return wait
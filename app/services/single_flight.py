@@ -0,0 +1,117 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        """
+        Initializes a request coalescer that lets concurrent callers for the same key share a single in-flight call.
+        """
+        self.executed = 0
+        self.collapsed = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Calls a function unless a call for the same key is already in flight, in which case its outcome is shared.
+
+        Args:
+            key (Hashable): The key identifying identical calls, e.g. the request path.
+            fn (Callable[[], Any]): The function to call.
+
+        Returns:
+            Any: The result of the in-flight call.
+
+        Raises:
+            Any exception raised by the in-flight call is raised to every caller sharing it.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                is_leader = True
+                self.executed += 1
+            else:
+                is_leader = False
+                self.collapsed += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the number of calls that were executed and the number of calls that were collapsed into an in-flight one.
+        """
+        return {"executed": self.executed, "collapsed": self.collapsed}
+
+
+class AsyncSingleFlight:
+    def __init__(self) -> None:
+        """
+        Initializes an asyncio request coalescer that lets concurrent coroutines for the same key share a single in-flight call.
+        """
+        self.executed = 0
+        self.collapsed = 0
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Awaits a coroutine function unless a call for the same key is already in flight, in which case its outcome is shared.
+
+        The call runs in its own task, so a cancelled caller does not cancel it for the others.
+
+        Args:
+            key (Hashable): The key identifying identical calls, e.g. the request path.
+            fn (Callable[[], Awaitable[Any]]): The coroutine function to call.
+
+        Returns:
+            Any: The result of the in-flight call.
+
+        Raises:
+            Any exception raised by the in-flight call is raised to every caller sharing it.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.executed += 1
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the number of calls that were executed and the number of calls that were collapsed into an in-flight one.
+        """
+        return {"executed": self.executed, "collapsed": self.collapsed}
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the error as retrieved even if every caller was cancelled
+            task.exception()
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional
+
+CANDLE_INTERVALS = {"1m": 60.0, "5m": 300.0, "1h": 3600.0}
+
+
+class Candle(NamedTuple):
+    start: float
+    open: float
+    high: float
+    low: float
+    close: float
+    mean: float
+    count: int
+
+
+class _CandleSeries:
+    """Closed candles of one market and interval, plus the candle being built."""
+
+    def __init__(self, interval: float, max_candles: int) -> None:
+        self.interval = interval
+        self.closed: Deque[Candle] = deque(maxlen=max_candles)
+        self.start: Optional[float] = None
+        self.open = self.high = self.low = self.close = self.total = 0.0
+        self.count = 0
+
+    def update(self, timestamp: float, value: float) -> None:
+        start = timestamp - timestamp % self.interval
+        if self.start is None or start > self.start:
+            if self.start is not None:
+                self.closed.append(self.current())
+            self.start = start
+            self.open = self.high = self.low = self.close = value
+            self.total = 0.0
+            self.count = 0
+        elif start < self.start:
+            # The candle of an older sample is already closed
+            return
+        self.high = max(self.high, value)
+        self.low = min(self.low, value)
+        self.close = value
+        self.total += value
+        self.count += 1
+
+    def current(self) -> Candle:
+        return Candle(
+            self.start,
+            self.open,
+            self.high,
+            self.low,
+            self.close,
+            self.total / self.count,
+            self.count,
+        )
+
+
+class SpreadCandles:
+    def __init__(
+        self,
+        max_candles: int,
+        intervals: Dict[str, float] = CANDLE_INTERVALS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Initializes an incremental aggregator of spreads into open/high/low/close/mean candles per market and interval.
+
+        Every spread updates the current candle of each interval in constant time. When a spread falls in a later period, the current candle is closed and a new one started, so serving candles never revisits raw samples.
+
+        Args:
+            max_candles (int): The number of closed candles kept per market and interval.
+            intervals (Dict[str, float]): The length in seconds of each interval, by name.
+            clock (Callable[[], float]): The function returning the Unix timestamp of a spread.
+        """
+        self.max_candles = max_candles
+        self.intervals = intervals
+        self._clock = clock
+        self._series: Dict[str, Dict[str, _CandleSeries]] = {}
+        self._lock = threading.Lock()
+
+    def on_spreads(self, spreads: List[Dict[str, Any]]) -> None:
+        """
+        Adds a batch of spreads to the candles, all with the current timestamp. Meant to be subscribed to a SpreadFeed.
+
+        Args:
+            spreads (List[Dict[str, Any]]): The spreads as returned by calculate_spread.
+        """
+        now = self._clock()
+        with self._lock:
+            for spread in spreads:
+                market_id = spread["market_id"].upper()
+                series_by_interval = self._series.get(market_id)
+                if series_by_interval is None:
+                    series_by_interval = self._series[market_id] = {
+                        name: _CandleSeries(interval, self.max_candles)
+                        for name, interval in self.intervals.items()
+                    }
+                for series in series_by_interval.values():
+                    series.update(now, spread["value"])
+
+    def get_candles(
+        self, market_id: str, interval: str, limit: Optional[int] = None
+    ) -> List[Candle]:
+        """
+        Returns the latest candles of a market, oldest first. The last one is still open and changes with every new spread.
+
+        Args:
+            market_id (str): The unique identifier for the market, in any case.
+            interval (str): The name of the interval, such as "1m".
+            limit (Optional[int]): The maximum number of candles returned, or None for every kept candle.
+
+        Returns:
+            List[Candle]: The candles, empty if no spread was recorded for the market.
+
+        Raises:
+            KeyError: If the interval is unknown.
+        """
+        if interval not in self.intervals:
+            raise KeyError(interval)
+        with self._lock:
+            series_by_interval = self._series.get(market_id.upper())
+            if series_by_interval is None:
+                return []
+            series = series_by_interval[interval]
+            candles = list(series.closed) + [series.current()]
+        return candles if limit is None else candles[-limit:]
@@ -0,0 +1,94 @@
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Tuple
+
+SpreadListener = Callable[[List[Dict[str, Any]]], None]
+
+
+class SpreadFeed:
+    def __init__(self) -> None:
+        """
+        Initializes the fan-out point that every freshly calculated spread is published to.
+        """
+        self._listeners: List[SpreadListener] = []
+
+    def subscribe(self, listener: SpreadListener) -> None:
+        """
+        Registers a listener called with every batch of published spreads. Listeners run on the publishing thread, so they must be quick and must not block.
+
+        Args:
+            listener (SpreadListener): A function receiving a list of spreads as returned by calculate_spread.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: SpreadListener) -> None:
+        """
+        Removes a previously registered listener.
+
+        Args:
+            listener (SpreadListener): The listener to remove.
+        """
+        self._listeners.remove(listener)
+
+    def publish(self, spreads: List[Dict[str, Any]]) -> None:
+        """
+        Hands a batch of spreads to every listener. A failing listener is reported and does not affect the others or the publisher.
+
+        Args:
+            spreads (List[Dict[str, Any]]): The spreads as returned by calculate_spread.
+        """
+        if not spreads:
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(spreads)
+            except Exception:
+                print(traceback.format_exc())
+
+
+class SpreadSampler:
+    def __init__(
+        self,
+        feed: SpreadFeed,
+        min_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initializes a filter turning the spreads served to clients into market updates, for listeners that keep one sample per update.
+
+        Every request publishes the spreads it served, including those calculated from cached tickers, so the same spread is published many times under load. The sampler forwards a spread to its feed only if its prices differ from the last one forwarded for the market, and at most once every min_interval seconds per market. A change dropped by the interval is forwarded by the next spread of the market published after it.
+
+        Args:
+            feed (SpreadFeed): The feed the sampled spreads are published to.
+            min_interval (float): The minimum number of seconds between two samples of a market.
+            clock (Callable[[], float]): A monotonic clock returning the current time in seconds.
+        """
+        self.feed = feed
+        self.min_interval = min_interval
+        self._clock = clock
+        # The time and prices of the last sample of each market
+        self._last: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def on_spreads(self, spreads: List[Dict[str, Any]]) -> None:
+        """
+        Forwards the spreads that are new market updates. Meant to be subscribed to a SpreadFeed.
+
+        Args:
+            spreads (List[Dict[str, Any]]): The spreads as returned by calculate_spread.
+        """
+        now = self._clock()
+        samples = []
+        with self._lock:
+            for spread in spreads:
+                market_id = spread["market_id"].upper()
+                prices = (spread["min_ask"], spread["max_bid"])
+                last = self._last.get(market_id)
+                if last is not None and (
+                    last[1:] == prices or now - last[0] < self.min_interval
+                ):
+                    continue
+                self._last[market_id] = (now, *prices)
+                samples.append(spread)
+        self.feed.publish(samples)
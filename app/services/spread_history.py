@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+
+class SpreadSamples(NamedTuple):
+    timestamp: np.ndarray
+    min_ask: np.ndarray
+    max_bid: np.ndarray
+    value: np.ndarray
+
+
+class SpreadRingBuffer:
+    def __init__(self, capacity: int) -> None:
+        """
+        Initializes a fixed-size buffer of the latest spread samples of one market.
+
+        Samples are stored in one preallocated float64 array per field, so the buffer takes 32 bytes per sample of capacity however many samples it holds. Once full, every new sample overwrites the oldest one.
+
+        Args:
+            capacity (int): The number of samples kept.
+        """
+        self.capacity = capacity
+        self._timestamp = np.zeros(capacity)
+        self._min_ask = np.zeros(capacity)
+        self._max_bid = np.zeros(capacity)
+        self._value = np.zeros(capacity)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(
+        self, timestamp: float, min_ask: float, max_bid: float, value: float
+    ) -> None:
+        """
+        Records a sample, overwriting the oldest one if the buffer is full. Timestamps are expected in non-decreasing order.
+        """
+        index = self._next
+        self._timestamp[index] = timestamp
+        self._min_ask[index] = min_ask
+        self._max_bid[index] = max_bid
+        self._value[index] = value
+        self._next = (index + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def get_range(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> SpreadSamples:
+        """
+        Returns copies of the samples recorded between two timestamps, oldest first.
+
+        Args:
+            start (Optional[float]): The earliest timestamp included, or None for the oldest sample.
+            end (Optional[float]): The latest timestamp included, or None for the newest sample.
+        """
+        oldest = (self._next - self._count) % self.capacity
+        # The samples wrap around the end of the arrays at most once
+        if oldest + self._count <= self.capacity:
+            segments = [(oldest, oldest + self._count)]
+        else:
+            segments = [(oldest, self.capacity), (0, self._next)]
+
+        indices = []
+        for first, last in segments:
+            timestamps = self._timestamp[first:last]
+            low = 0 if start is None else np.searchsorted(timestamps, start, "left")
+            high = (
+                len(timestamps)
+                if end is None
+                else np.searchsorted(timestamps, end, "right")
+            )
+            indices.append(np.arange(first + low, first + high))
+        selected = np.concatenate(indices)
+        return SpreadSamples(
+            self._timestamp[selected],
+            self._min_ask[selected],
+            self._max_bid[selected],
+            self._value[selected],
+        )
+
+
+class SpreadHistory:
+    def __init__(self, capacity: int, clock: Callable[[], float] = time.time) -> None:
+        """
+        Initializes the spread history of every market, with one ring buffer per market.
+
+        Args:
+            capacity (int): The number of samples kept per market.
+            clock (Callable[[], float]): The function returning the Unix timestamp of a sample.
+        """
+        self.capacity = capacity
+        self._clock = clock
+        self._buffers: Dict[str, SpreadRingBuffer] = {}
+        self._lock = threading.Lock()
+
+    def on_spreads(self, spreads: List[Dict[str, Any]]) -> None:
+        """
+        Records a batch of spreads, all with the current timestamp. Meant to be subscribed to a SpreadFeed.
+
+        Args:
+            spreads (List[Dict[str, Any]]): The spreads as returned by calculate_spread.
+        """
+        now = self._clock()
+        with self._lock:
+            for spread in spreads:
+                market_id = spread["market_id"].upper()
+                buffer = self._buffers.get(market_id)
+                if buffer is None:
+                    buffer = self._buffers[market_id] = SpreadRingBuffer(self.capacity)
+                buffer.append(
+                    now, spread["min_ask"], spread["max_bid"], spread["value"]
+                )
+
+    def get_range(
+        self,
+        market_id: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Optional[SpreadSamples]:
+        """
+        Returns the samples of a market recorded between two timestamps, oldest first.
+
+        Args:
+            market_id (str): The unique identifier for the market, in any case.
+            start (Optional[float]): The earliest Unix timestamp included, or None for the oldest sample.
+            end (Optional[float]): The latest Unix timestamp included, or None for the newest sample.
+
+        Returns:
+            Optional[SpreadSamples]: The samples, or None if no spread was recorded for the market.
+        """
+        with self._lock:
+            buffer = self._buffers.get(market_id.upper())
+            if buffer is None:
+                return None
+            return buffer.get_range(start, end)
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+class SpreadSubscription:
+    def __init__(self, market_ids: Optional[Set[str]] = None) -> None:
+        """
+        Initializes a subscription to spread changes, bound to the running event loop.
+
+        Pending changes are conflated per market, so a slow consumer only receives the latest spread of each market and its memory use is bounded by the number of markets.
+
+        Args:
+            market_ids (Optional[Set[str]]): The upper-cased identifiers of the markets to receive, or None for every market.
+        """
+        self.market_ids = market_ids
+        self.conflated = 0
+        self.loop = asyncio.get_running_loop()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._event = asyncio.Event()
+        self._closed = False
+
+    def wants(self, market_id: str) -> bool:
+        return self.market_ids is None or market_id.upper() in self.market_ids
+
+    def offer(self, spreads: List[Dict[str, Any]]) -> None:
+        """
+        Queues spread changes for the consumer. Must be called from the subscription's event loop.
+
+        Args:
+            spreads (List[Dict[str, Any]]): The changed spreads as returned by calculate_spread.
+        """
+        for spread in spreads:
+            if not self.wants(spread["market_id"]):
+                continue
+            if spread["market_id"] in self._pending:
+                self.conflated += 1
+            self._pending[spread["market_id"]] = spread
+        if self._pending:
+            self._event.set()
+
+    def close(self) -> None:
+        """
+        Ends the subscription, waking up a consumer waiting for changes. Must be called from the subscription's event loop.
+        """
+        self._closed = True
+        self._event.set()
+
+    async def next_changes(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Waits for the next batch of spread changes.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: The latest spread of every market that changed since the previous call, or None once the subscription is closed and drained.
+        """
+        if self._closed and not self._pending:
+            return None
+        await self._event.wait()
+        self._event.clear()
+        if not self._pending:
+            return None
+        changes = list(self._pending.values())
+        self._pending = {}
+        return changes
+
+
+class SpreadBroadcaster:
+    def __init__(self, max_subscribers: int) -> None:
+        """
+        Initializes a broadcaster forwarding spread changes to streaming subscribers.
+
+        Args:
+            max_subscribers (int): The maximum number of concurrent subscriptions.
+        """
+        self.max_subscribers = max_subscribers
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._subscriptions: Set[SpreadSubscription] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, market_ids: Optional[Set[str]] = None) -> SpreadSubscription:
+        """
+        Creates a subscription seeded with the latest known spread of every requested market. Must be called from a running event loop.
+
+        Args:
+            market_ids (Optional[Set[str]]): The upper-cased identifiers of the markets to receive, or None for every market.
+
+        Returns:
+            SpreadSubscription: The new subscription.
+
+        Raises:
+            OverflowError: If the maximum number of subscribers is reached.
+        """
+        subscription = SpreadSubscription(market_ids=market_ids)
+        with self._lock:
+            if len(self._subscriptions) >= self.max_subscribers:
+                raise OverflowError("Too many spread stream subscribers")
+            self._subscriptions.add(subscription)
+            latest = list(self._latest.values())
+        subscription.offer(latest)
+        return subscription
+
+    def unsubscribe(self, subscription: SpreadSubscription) -> None:
+        """
+        Removes a subscription so it stops receiving changes.
+
+        Args:
+            subscription (SpreadSubscription): The subscription to remove.
+        """
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, spreads: List[Dict[str, Any]]) -> None:
+        """
+        Forwards the spreads that changed since they were last published to every subscription. Safe to call from any thread.
+
+        Args:
+            spreads (List[Dict[str, Any]]): The spreads as returned by calculate_spread.
+        """
+        with self._lock:
+            changes = []
+            for spread in spreads:
+                market_id = spread["market_id"].upper()
+                if _spread_key(self._latest.get(market_id)) != _spread_key(spread):
+                    self._latest[market_id] = spread
+                    changes.append(spread)
+            subscriptions = list(self._subscriptions)
+
+        if not changes:
+            return
+        for subscription in subscriptions:
+            _call_in_loop(subscription.loop, subscription.offer, changes)
+
+    def close_all(self) -> None:
+        """
+        Closes every subscription, ending their streams. Safe to call from any thread.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            self._subscriptions.clear()
+        for subscription in subscriptions:
+            _call_in_loop(subscription.loop, subscription.close)
+
+
+def _spread_key(spread: Optional[Dict[str, Any]]) -> Optional[Tuple[Any, Any]]:
+    return None if spread is None else (spread["min_ask"], spread["max_bid"])
+
+
+def _call_in_loop(loop: asyncio.AbstractEventLoop, callback, *args) -> None:
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        # The subscriber's event loop is already closed
+        pass
@@ -0,0 +1,69 @@
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+class _Snapshot(NamedTuple):
+    tickers: List[Dict[str, Any]]
+    tickers_by_market_id: Dict[str, Dict[str, Any]]
+    updated_at: float
+
+
+class TickerBook:
+    def __init__(self, max_age: float) -> None:
+        """
+        Initializes an in-memory book holding the latest ticker of every market.
+
+        Args:
+            max_age (float): The number of seconds after its last update during which the book is considered ready to be read.
+        """
+        self.max_age = max_age
+        self.version = 0
+        self._snapshot: Optional[_Snapshot] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """
+        Whether the book holds a snapshot recent enough to answer requests.
+        """
+        age = self.age()
+        return age is not None and age < self.max_age
+
+    def update(self, tickers: List[Dict[str, Any]]) -> None:
+        """
+        Replaces the book with a new snapshot of tickers.
+
+        Args:
+            tickers (List[Dict[str, Any]]): The ticker of every market, in market order.
+        """
+        tickers_by_market_id = {
+            ticker["market_id"].upper(): ticker for ticker in tickers
+        }
+        # Swapping a single reference keeps readers from seeing a half-built snapshot
+        self._snapshot = _Snapshot(tickers, tickers_by_market_id, time.monotonic())
+        self.version += 1
+
+    def get_all(self) -> List[Dict[str, Any]]:
+        """
+        Returns the ticker of every market, in market order.
+        """
+        snapshot = self._snapshot
+        return [] if snapshot is None else snapshot.tickers
+
+    def get(self, market_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the ticker of a specific market, or None if the book does not hold it.
+
+        Args:
+            market_id (str): The unique identifier for the market, in any case.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        return snapshot.tickers_by_market_id.get(market_id.upper())
+
+    def age(self) -> Optional[float]:
+        """
+        Returns the number of seconds since the last update, or None if the book is empty.
+        """
+        snapshot = self._snapshot
+        return None if snapshot is None else time.monotonic() - snapshot.updated_at
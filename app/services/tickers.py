@@ -1,16 +1,272 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from requests.exceptions import RequestException
+
 from app.services.base_api_client import BaseAPIClient
-from typing import Dict, Any
+from app.services.cache import CacheLookup, StaleWhileRevalidateCache
+from config import settings
 
 
 class TickerService(BaseAPIClient):
-    def get_one_by_market_id(self, market_id: str) -> Dict[str, Any]:
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Hot markets are answered from memory and refreshed in the background
+        self.cache = StaleWhileRevalidateCache(
+            fresh_for=settings.TICKER_CACHE_FRESH_SECONDS,
+            stale_for=settings.TICKER_CACHE_STALE_SECONDS,
+            name="tickers",
+            stale_if_error=settings.TICKER_CACHE_STALE_IF_ERROR_SECONDS,
+        )
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        Lazily creates the thread pool shared by every ticker fan-out, which bounds the number of in-flight ticker requests.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.TICKER_FETCH_MAX_WORKERS,
+                thread_name_prefix="ticker-fetch",
+            )
+        return self._executor
+
+    def get_one_by_market_id(
+        self, market_id: str, use_cache: bool = True
+    ) -> Dict[str, Any]:
         """
         Retrieves the ticker for a specific market ID from the BUDA API.
 
         Args:
             market_id (str): The unique identifier for the market.
+            use_cache (bool): Whether the request may be answered from the ticker cache.
 
         Returns:
             Dict[str, Any]: A dictionary containing the JSON response for the specified market's ticker.
         """
-        return self._get(f"markets/{market_id}/ticker")
+        path = f"markets/{market_id}/ticker"
+        if not use_cache:
+            return self._get(path)
+        return self.cache.get_or_load(path, lambda: self._get(path))
+
+    def get_one_with_age_by_market_id(self, market_id: str) -> CacheLookup:
+        """
+        Retrieves the ticker for a specific market ID from the BUDA API together with how old it is.
+
+        Args:
+            market_id (str): The unique identifier for the market.
+
+        Returns:
+            CacheLookup: The JSON response for the specified market's ticker, the number of seconds since it was fetched from the BUDA API (None if caching is disabled) and whether it is stale and being refreshed.
+        """
+        path = f"markets/{market_id}/ticker"
+        return self.cache.get_or_load_with_age(path, lambda: self._get(path))
+
+    def get_many_by_market_ids(
+        self, market_ids: List[str], use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieves the tickers for several market IDs from the BUDA API concurrently.
+
+        Args:
+            market_ids (List[str]): The unique identifiers for the markets.
+            use_cache (bool): Whether the requests may be answered from the ticker cache.
+
+        Returns:
+            List[Dict[str, Any]]: The JSON responses for each market's ticker, in the same order as the given market IDs.
+
+        Raises:
+            The first exception raised by any of the ticker requests, following the order of the given market IDs.
+        """
+        return list(
+            self.executor.map(
+                lambda market_id: self.get_one_by_market_id(
+                    market_id=market_id, use_cache=use_cache
+                ),
+                market_ids,
+            )
+        )
+
+    def get_all(
+        self, market_ids: Optional[List[str]] = None, use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Retrieves the tickers for all markets from the BUDA API in a single request.
+
+        If the bulk tickers endpoint is unavailable, the tickers are fetched market by market with get_many_by_market_ids instead.
+
+        Args:
+            market_ids (Optional[List[str]]): The unique identifiers for the markets to return, in the desired order. Markets missing from the bulk response, or listed there without min_ask or max_bid, are fetched individually. Required for the per-market fallback.
+            use_cache (bool): Whether the bulk and per-market requests may be answered from the ticker cache.
+
+        Returns:
+            Dict[str, Any]: A dictionary with a "tickers" key holding the ticker of every requested market, or of every market if no market IDs are given.
+
+        Raises:
+            RequestException: If the bulk endpoint is unavailable and no market IDs are given, or if any per-market request fails.
+        """
+        try:
+            tickers = self._get_bulk(use_cache=use_cache)
+        except (RequestException, KeyError):
+            if market_ids is None:
+                raise
+            tickers = []
+
+        if market_ids is None:
+            return {"tickers": tickers}
+
+        missing_market_ids = _find_missing_market_ids(tickers, market_ids)
+        missing_tickers = self.get_many_by_market_ids(
+            missing_market_ids, use_cache=use_cache
+        )
+        return {
+            "tickers": _merge_tickers(
+                tickers, market_ids, missing_market_ids, missing_tickers
+            )
+        }
+
+    async def aget_one_by_market_id(
+        self, market_id: str, use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Retrieves the ticker for a specific market ID from the BUDA API asynchronously.
+
+        Args:
+            market_id (str): The unique identifier for the market.
+            use_cache (bool): Whether the request may be answered from the ticker cache.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing the JSON response for the specified market's ticker.
+        """
+        path = f"markets/{market_id}/ticker"
+        if not use_cache:
+            return await self._aget(path)
+        return await self.cache.aget_or_load(path, lambda: self._aget(path))
+
+    async def aget_one_with_age_by_market_id(self, market_id: str) -> CacheLookup:
+        """
+        Retrieves the ticker for a specific market ID from the BUDA API asynchronously together with how old it is.
+
+        Args:
+            market_id (str): The unique identifier for the market.
+
+        Returns:
+            CacheLookup: The JSON response for the specified market's ticker, the number of seconds since it was fetched from the BUDA API (None if caching is disabled) and whether it is stale and being refreshed.
+        """
+        path = f"markets/{market_id}/ticker"
+        return await self.cache.aget_or_load_with_age(path, lambda: self._aget(path))
+
+    async def aget_many_by_market_ids(
+        self, market_ids: List[str], use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieves the tickers for several market IDs from the BUDA API concurrently, with at most TICKER_FETCH_MAX_WORKERS requests in flight.
+
+        Args:
+            market_ids (List[str]): The unique identifiers for the markets.
+            use_cache (bool): Whether the requests may be answered from the ticker cache.
+
+        Returns:
+            List[Dict[str, Any]]: The JSON responses for each market's ticker, in the same order as the given market IDs.
+
+        Raises:
+            The first exception raised by any of the ticker requests.
+        """
+        semaphore = asyncio.Semaphore(settings.TICKER_FETCH_MAX_WORKERS)
+
+        async def _get_one(market_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.aget_one_by_market_id(
+                    market_id=market_id, use_cache=use_cache
+                )
+
+        return list(
+            await asyncio.gather(*(_get_one(market_id) for market_id in market_ids))
+        )
+
+    async def aget_all(
+        self, market_ids: Optional[List[str]] = None, use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Retrieves the tickers for all markets from the BUDA API in a single asynchronous request, falling back to aget_many_by_market_ids if the bulk tickers endpoint is unavailable.
+
+        Args:
+            market_ids (Optional[List[str]]): The unique identifiers for the markets to return, in the desired order. Markets missing from the bulk response, or listed there without min_ask or max_bid, are fetched individually. Required for the per-market fallback.
+            use_cache (bool): Whether the bulk and per-market requests may be answered from the ticker cache.
+
+        Returns:
+            Dict[str, Any]: A dictionary with a "tickers" key holding the ticker of every requested market, or of every market if no market IDs are given.
+
+        Raises:
+            RequestException: If the bulk endpoint is unavailable and no market IDs are given, or if any per-market request fails.
+        """
+        try:
+            tickers = await self._aget_bulk(use_cache=use_cache)
+        except (RequestException, KeyError):
+            if market_ids is None:
+                raise
+            tickers = []
+
+        if market_ids is None:
+            return {"tickers": tickers}
+
+        missing_market_ids = _find_missing_market_ids(tickers, market_ids)
+        missing_tickers = await self.aget_many_by_market_ids(
+            missing_market_ids, use_cache=use_cache
+        )
+        return {
+            "tickers": _merge_tickers(
+                tickers, market_ids, missing_market_ids, missing_tickers
+            )
+        }
+
+    def _get_bulk(self, use_cache: bool = True) -> List[Dict[str, Any]]:
+        if not use_cache:
+            return self._get("tickers")["tickers"]
+        return self.cache.get_or_load("tickers", lambda: self._get("tickers"))[
+            "tickers"
+        ]
+
+    async def _aget_bulk(self, use_cache: bool = True) -> List[Dict[str, Any]]:
+        if not use_cache:
+            return (await self._aget("tickers"))["tickers"]
+        tickers = await self.cache.aget_or_load(
+            "tickers", lambda: self._aget("tickers")
+        )
+        return tickers["tickers"]
+
+    def close(self) -> None:
+        """
+        Stops the fan-out thread pool and closes the underlying session.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        super().close()
+
+
+def _find_missing_market_ids(
+    tickers: List[Dict[str, Any]], market_ids: List[str]
+) -> List[str]:
+    # Bulk entries without prices, such as markets without orders, count as missing
+    found_market_ids = {
+        ticker.get("market_id")
+        for ticker in tickers
+        if ticker.get("min_ask") is not None and ticker.get("max_bid") is not None
+    }
+    return [market_id for market_id in market_ids if market_id not in found_market_ids]
+
+
+def _merge_tickers(
+    tickers: List[Dict[str, Any]],
+    market_ids: List[str],
+    missing_market_ids: List[str],
+    missing_tickers: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    # Order the bulk and individually fetched tickers following the market IDs
+    tickers_by_market_id = {ticker.get("market_id"): ticker for ticker in tickers}
+    for market_id, ticker_data in zip(missing_market_ids, missing_tickers):
+        tickers_by_market_id[market_id] = ticker_data["ticker"]
+    return [tickers_by_market_id[market_id] for market_id in market_ids]
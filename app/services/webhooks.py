@@ -0,0 +1,290 @@
+import asyncio
+import ipaddress
+import socket
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.utils import compare_spread_with_alert_value
+from config import settings
+
+
+class DeadLetter(NamedTuple):
+    url: str
+    payloads: List[Dict[str, Any]]
+    error: str
+    attempts: int
+    failed_at: float
+
+
+class WebhookURLNotAllowed(ValueError):
+    pass
+
+
+def check_webhook_url(url: str) -> None:
+    """
+    Checks that notifications may be POSTed to a webhook URL. Resolves its host, so it blocks.
+
+    Hosts in WEBHOOK_ALLOWED_HOSTS are always allowed. Any other webhook must use https and its host must only resolve to public addresses, so webhooks cannot reach the loopback, private networks or link-local metadata endpoints.
+
+    Args:
+        url (str): The webhook URL.
+
+    Raises:
+        WebhookURLNotAllowed: If the URL is not allowed, or its host cannot be resolved.
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host in (
+        allowed_host.lower() for allowed_host in settings.WEBHOOK_ALLOWED_HOSTS
+    ):
+        return
+    if parts.scheme != "https":
+        raise WebhookURLNotAllowed("Webhook URLs must use https")
+    try:
+        addresses = socket.getaddrinfo(
+            host, parts.port or 443, proto=socket.IPPROTO_TCP
+        )
+    except (socket.gaierror, UnicodeError) as e:
+        raise WebhookURLNotAllowed(
+            f"Webhook host '{host}' could not be resolved"
+        ) from e
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0])
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        if not address.is_global:
+            raise WebhookURLNotAllowed(
+                f"Webhook host '{host}' resolves to a non-public address"
+            )
+
+
+def create_webhook_client() -> httpx.AsyncClient:
+    """
+    Creates the asynchronous HTTP client webhooks are delivered with.
+
+    Returns:
+        httpx.AsyncClient: A client whose timeout comes from settings.
+    """
+    return httpx.AsyncClient(timeout=settings.WEBHOOK_TIMEOUT)
+
+
+class WebhookDispatcher:
+    def __init__(
+        self,
+        max_pending: int,
+        workers: int,
+        batch_size: int,
+        max_attempts: int,
+        backoff: float,
+        max_dead_letters: int,
+        create_client: Callable[[], httpx.AsyncClient] = create_webhook_client,
+    ) -> None:
+        """
+        Initializes a background dispatcher that POSTs JSON notifications to webhook URLs.
+
+        Notifications are queued per URL and delivered by a pool of worker tasks, so callers never wait for the network. Each delivery sends up to batch_size pending notifications of one URL as {"notifications": [...]}, once check_webhook_url allows the URL. Failed deliveries are retried with exponential backoff, and batches that are not allowed, run out of attempts, get a 4xx response other than 429 or do not fit in the queue are kept in a bounded dead-letter list.
+
+        Args:
+            max_pending (int): The maximum number of notifications waiting for delivery.
+            workers (int): The number of concurrent delivery tasks.
+            batch_size (int): The maximum number of notifications sent in one request.
+            max_attempts (int): The number of delivery attempts of a batch before it is dead-lettered.
+            backoff (float): The seconds waited before the first retry, doubled after every failed attempt.
+            max_dead_letters (int): The number of most recent dead letters kept.
+            create_client (Callable[[], httpx.AsyncClient]): The factory of the HTTP client, called on start.
+        """
+        self.max_pending = max_pending
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.create_client = create_client
+        self.dead_letters: Deque[DeadLetter] = deque(maxlen=max_dead_letters)
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def pending_count(self) -> int:
+        return self._pending_count
+
+    def enqueue(self, url: str, payload: Dict[str, Any]) -> bool:
+        """
+        Queues a notification for delivery. Safe to call from any thread.
+
+        Args:
+            url (str): The webhook URL the notification is POSTed to.
+            payload (Dict[str, Any]): The JSON-serializable notification.
+
+        Returns:
+            bool: Whether the notification was queued. A notification that does not fit in the queue is dead-lettered instead.
+        """
+        with self._lock:
+            if self._pending_count >= self.max_pending:
+                is_queued = False
+            else:
+                is_queued = True
+                self._pending_count += 1
+                batch = self._pending.setdefault(url, [])
+                batch.append(payload)
+                # A URL is queued once for workers, whatever its number of notifications
+                is_new_url = len(batch) == 1
+            loop = self._loop
+
+        if not is_queued:
+            self._dead_letter(url, [payload], "Delivery queue is full", 0)
+            return False
+        if is_new_url and loop is not None:
+            _call_in_loop(loop, self._queue.put_nowait, url)
+        return True
+
+    def start(self) -> None:
+        """
+        Starts the worker tasks in the running event loop, delivering the notifications queued before.
+        """
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._client = self.create_client()
+        with self._lock:
+            for url in self._pending:
+                self._queue.put_nowait(url)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """
+        Cancels the worker tasks and closes the HTTP client. Notifications still queued stay pending until the next start.
+        """
+        with self._lock:
+            self._loop = None
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _work(self) -> None:
+        while True:
+            url = await self._queue.get()
+            with self._lock:
+                batch = self._pending.pop(url, [])
+                payloads, rest = batch[: self.batch_size], batch[self.batch_size :]
+                if rest:
+                    self._pending[url] = rest
+            if rest:
+                self._queue.put_nowait(url)
+            if not payloads:
+                continue
+            try:
+                await self._deliver(url, payloads)
+            except asyncio.CancelledError:
+                self._dead_letter(url, payloads, "Dispatcher stopped", 0)
+                raise
+            finally:
+                with self._lock:
+                    self._pending_count -= len(payloads)
+
+    async def _deliver(self, url: str, payloads: List[Dict[str, Any]]) -> None:
+        try:
+            # Checked again before every delivery, as the host may resolve elsewhere now
+            await asyncio.to_thread(check_webhook_url, url)
+        except WebhookURLNotAllowed as e:
+            self._dead_letter(url, payloads, str(e), 0)
+            return
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                response = await self._client.post(
+                    url, json={"notifications": payloads}
+                )
+                if response.is_success:
+                    return
+                error = f"HTTP {response.status_code}"
+                if response.status_code < 500 and response.status_code != 429:
+                    # The endpoint rejected the notifications, retrying will not help
+                    break
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {e}"
+            if attempt < self.max_attempts:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+        self._dead_letter(url, payloads, error, attempt)
+
+    def _dead_letter(
+        self, url: str, payloads: List[Dict[str, Any]], error: str, attempts: int
+    ) -> None:
+        with self._lock:
+            self.dead_letters.append(
+                DeadLetter(url, payloads, error, attempts, time.time())
+            )
+
+
+class SpreadAlertNotifier:
+    def __init__(
+        self, spread_alert: Dict[str, Any], dispatcher: WebhookDispatcher
+    ) -> None:
+        """
+        Initializes a spread listener that notifies the webhook of the spread alert every time a market crosses its value.
+
+        The comparison of every market is remembered, so a notification is only sent when a spread moves to the other side of the alert value. The first spread seen for a market, or for a new alert value, only sets its initial state.
+
+        Args:
+            spread_alert (Dict[str, Any]): The spread alert, with its "value" and optional "webhook_url".
+            dispatcher (WebhookDispatcher): The dispatcher notifications are queued to.
+        """
+        self.spread_alert = spread_alert
+        self.dispatcher = dispatcher
+        self._last_states: Dict[str, Tuple[Any, bool, bool]] = {}
+        self._lock = threading.Lock()
+
+    def on_spreads(self, spreads: List[Dict[str, Any]]) -> None:
+        """
+        Compares a batch of spreads with the spread alert. Meant to be subscribed to a SpreadFeed.
+
+        Args:
+            spreads (List[Dict[str, Any]]): The spreads as returned by calculate_spread.
+        """
+        alert_value = self.spread_alert.get("value")
+        webhook_url = self.spread_alert.get("webhook_url")
+        if not alert_value or not webhook_url:
+            return
+        notifications = []
+        with self._lock:
+            for spread in spreads:
+                alert = compare_spread_with_alert_value(
+                    spread_value=spread["value"],
+                    alert_value=alert_value,
+                    market_id=spread["market_id"],
+                )
+                market_id = spread["market_id"].upper()
+                state = (alert_value, alert["is_greater"], alert["is_less"])
+                previous_state = self._last_states.get(market_id)
+                self._last_states[market_id] = state
+                if previous_state is None or previous_state[0] != alert_value:
+                    continue
+                if previous_state != state:
+                    notifications.append(alert)
+        for alert in notifications:
+            self.dispatcher.enqueue(webhook_url, alert)
+
+
+def _call_in_loop(loop: asyncio.AbstractEventLoop, callback, *args) -> None:
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        # The dispatcher's event loop is already closed
+        pass
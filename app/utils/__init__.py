@@ -1,2 +1,10 @@
 from app.utils.spread_utils import calculate_spread, compare_spread_with_alert_value
-from app.utils.format_utils import format_current_spread
+from app.utils.spread_engine import SpreadBatch, calculate_spreads
+from app.utils.format_utils import format_current_spread, format_server_sent_event
+from app.utils.header_utils import (
+    build_cache_headers,
+    build_etag,
+    build_ticker_age_headers,
+    etag_matches,
+)
+from app.utils.profiling import profile_phase, profile_request, profiled, record_phase
@@ -1,6 +1,10 @@
-from typing import Dict
+import json
+from typing import Any, Dict
 
+from app.utils.profiling import profiled
 
+
+@profiled("formatting")
 def format_current_spread(current_spread: Dict[str, str]) -> Dict[str, str]:
     """
     Format the spread dictionary to include formatted values.
@@ -23,11 +27,12 @@ def format_current_spread(current_spread: Dict[str, str]) -> Dict[str, str]:
         Any exceptions raised during the data processing will be propagated.
     """
     try:
+        # In the field order of SpreadResponse, as the routes return it unvalidated
         current_spread_formatted = {
-            "min_ask": "{:,.6f}".format(current_spread["min_ask"]),
-            "max_bid": "{:,.6f}".format(current_spread["max_bid"]),
-            "value": "{:,.6f}".format(current_spread["value"]),
             "market_id": current_spread["market_id"],
+            "value": "{:,.6f}".format(current_spread["value"]),
+            "max_bid": "{:,.6f}".format(current_spread["max_bid"]),
+            "min_ask": "{:,.6f}".format(current_spread["min_ask"]),
         }
 
         return current_spread_formatted
@@ -40,3 +45,19 @@ def format_current_spread(current_spread: Dict[str, str]) -> Dict[str, str]:
         raise KeyError(
             f"Error formatting spread for market {current_spread['market_id']}: {str(e)}"
         )
+
+
+def format_server_sent_event(event: str, data: Dict[str, Any]) -> str:
+    """
+    Format a message following the Server-Sent Events wire format.
+
+    **Args:**
+
+        - event (str): The name of the event, e.g. "spread".
+        - data (Dict[str, Any]): The JSON serializable payload of the event.
+
+    **Returns:**
+
+        message (str): The event message, terminated by a blank line.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,97 @@
+import hashlib
+from typing import Any, Dict, Iterable, Optional
+
+
+def build_ticker_age_headers(age: Optional[float], is_stale: bool) -> Dict[str, str]:
+    """
+    Build the response headers describing how old the ticker behind a response is.
+
+    **Args:**
+
+        - age (Optional[float]): The number of seconds since the ticker was fetched from the Buda API, or None if it was not cached.
+        - is_stale (bool): Whether the ticker was served while a newer one is being fetched.
+
+    **Returns:**
+
+        headers (Dict[str, str]): A dictionary with the following headers, or an empty dictionary if the age is unknown:
+
+            - X-Data-Age (str): The whole number of seconds since the ticker was fetched.
+            - X-Ticker-Stale (str): "true" if the ticker is stale, "false" otherwise.
+    """
+    if age is None:
+        return {}
+
+    # Not the standard Age header, which shared caches subtract from max-age
+    return {
+        "X-Data-Age": str(int(age)),
+        "X-Ticker-Stale": "true" if is_stale else "false",
+    }
+
+
+def build_etag(tickers: Iterable[Dict[str, Any]], *extra: Any) -> str:
+    """
+    Build a strong ETag from the ticker fields a spread response is calculated from.
+
+    The ETag is a digest of the data rather than the ticker book version, so every worker behind a proxy gives the same ETag to the same tickers.
+
+    **Args:**
+
+        - tickers (Iterable[Dict[str, Any]]): The tickers behind the response.
+        - extra (Any): Any other value the response depends on, such as the alert value.
+
+    **Returns:**
+
+        etag (str): The quoted ETag.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for ticker in tickers:
+        fields = (ticker.get("market_id"), ticker.get("min_ask"), ticker.get("max_bid"))
+        digest.update(repr(fields).encode())
+    digest.update(repr(extra).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check whether an If-None-Match header matches an ETag, so the client copy is still current.
+
+    **Args:**
+
+        - if_none_match (Optional[str]): The If-None-Match header of the request, a comma separated list of ETags or "*".
+        - etag (str): The quoted ETag of the current response.
+
+    **Returns:**
+
+        matches (bool): True if the response may be answered with 304 Not Modified.
+    """
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses the weak comparison, ignoring the W/ prefix
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def build_cache_headers(etag: str, max_age: int) -> Dict[str, str]:
+    """
+    Build the response headers letting clients and shared caches reuse a response.
+
+    **Args:**
+
+        - etag (str): The quoted ETag of the response.
+        - max_age (int): The number of seconds the response may be reused without revalidation.
+
+    **Returns:**
+
+        headers (Dict[str, str]): A dictionary with the following headers:
+
+            - ETag (str): The ETag of the response.
+            - Cache-Control (str): Public caching for max_age seconds, revalidated with the ETag afterwards.
+    """
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}",
+    }
@@ -0,0 +1,106 @@
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+class RequestProfile:
+    def __init__(self) -> None:
+        """
+        Initializes the per-phase timings of one profiled request.
+
+        Every phase keeps its total time in seconds and its number of calls. Concurrent calls of a phase, such as upstream requests fanned out with asyncio.gather, add up, so a phase may exceed the duration of the request.
+        """
+        self.phases: Dict[str, Dict[str, float]] = {}
+
+    def record(self, phase: str, seconds: float) -> None:
+        timing = self.phases.setdefault(phase, {"seconds": 0.0, "calls": 0})
+        timing["seconds"] += seconds
+        timing["calls"] += 1
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+@contextmanager
+def profile_request() -> Iterator[RequestProfile]:
+    """
+    Profile the enclosed request. Phases recorded inside the block, and in the tasks started from it, are added to the yielded profile.
+
+    **Returns:**
+
+        profile (RequestProfile): The profile of the request.
+    """
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    """
+    Add the time spent in a phase to the profile of the current request, if it is being profiled.
+
+    **Args:**
+
+        - phase (str): The name of the phase, e.g. "upstream".
+        - seconds (float): The time spent in the phase.
+    """
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record(phase, seconds)
+
+
+@contextmanager
+def profile_phase(phase: str) -> Iterator[None]:
+    """
+    Time the enclosed block as a phase of the current request. Requests that are not profiled only pay for one context variable lookup.
+
+    **Args:**
+
+        - phase (str): The name of the phase, e.g. "validation".
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.record(phase, time.perf_counter() - started_at)
+
+
+def profiled(phase: str) -> Callable:
+    """
+    Decorate a function so that every call is timed as a phase of the current request.
+
+    **Args:**
+
+        - phase (str): The name of the phase, e.g. "spread_math".
+
+    **Returns:**
+
+        decorator (Callable): A decorator for synchronous functions.
+    """
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            profile = _current_profile.get()
+            if profile is None:
+                return function(*args, **kwargs)
+            started_at = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profile.record(phase, time.perf_counter() - started_at)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,81 @@
+from typing import Any, Dict, List, NamedTuple
+
+import numpy as np
+
+from app.utils.profiling import profiled
+from app.utils.spread_utils import calculate_spread
+
+
+class SpreadBatch(NamedTuple):
+    market_ids: List[str]
+    min_ask: np.ndarray
+    max_bid: np.ndarray
+    value: np.ndarray
+    mid: np.ndarray
+    spread_bps: np.ndarray
+
+    def to_spreads(self) -> List[Dict[str, Any]]:
+        """
+        Convert the batch to one spread dictionary per market, as returned by calculate_spread.
+
+        **Returns:**
+
+            current_spreads (List[Dict[str, Any]]): A list with the min_ask, max_bid, value and market_id of every market, in the order of the batch.
+        """
+        return [
+            {
+                "min_ask": min_ask,
+                "max_bid": max_bid,
+                "value": value,
+                "market_id": market_id,
+            }
+            for market_id, min_ask, max_bid, value in zip(
+                self.market_ids,
+                self.min_ask.tolist(),
+                self.max_bid.tolist(),
+                self.value.tolist(),
+            )
+        ]
+
+
+@profiled("spread_math")
+def calculate_spreads(tickers: List[Dict[str, Any]]) -> SpreadBatch:
+    """
+    Calculate the spread of every market of a ticker snapshot at once, using one column array per field.
+
+    **Args:**
+
+        - tickers (List[Dict[str, Any]]): A list of dictionaries containing the ticker data of each market, as accepted by calculate_spread.
+
+    **Returns:**
+
+        spread_batch (SpreadBatch): A named tuple with the following columns, in the order of the given tickers:
+
+            - market_ids (List[str]): The unique identifier of each market.
+            - min_ask (np.ndarray): The minimum ask price of each market.
+            - max_bid (np.ndarray): The maximum bid price of each market.
+            - value (np.ndarray): The calculated spread value (min_ask - max_bid) of each market.
+            - mid (np.ndarray): The mid price ((min_ask + max_bid) / 2) of each market.
+            - spread_bps (np.ndarray): The spread value in basis points of the mid price of each market, or NaN if the mid price is 0.
+
+    **Raises:**
+
+        A ValueError will be raised if any price cannot be converted to a float, naming the first market that failed.
+    """
+    market_ids = [ticker["market_id"] for ticker in tickers]
+    try:
+        # NumPy parses the price strings without building a float per market
+        min_ask = np.array([ticker["min_ask"][0] for ticker in tickers], dtype=float)
+        max_bid = np.array([ticker["max_bid"][0] for ticker in tickers], dtype=float)
+    except ValueError:
+        # Find the offending market to report it like calculate_spread does
+        for ticker in tickers:
+            calculate_spread(ticker)
+        raise
+
+    value = min_ask - max_bid
+    mid = (min_ask + max_bid) / 2
+    spread_bps = np.divide(
+        value * 10_000, mid, out=np.full_like(value, np.nan), where=mid != 0
+    )
+    return SpreadBatch(market_ids, min_ask, max_bid, value, mid, spread_bps)
@@ -1,7 +1,9 @@
 from typing import Dict
-from app.services import buda_api
 
+from app.utils.profiling import profiled
 
+
+@profiled("spread_math")
 def calculate_spread(ticker: Dict[str, str]) -> Dict[str, str]:
     """
     Calculate the spread for a given market ID.
@@ -43,6 +45,7 @@ def calculate_spread(ticker: Dict[str, str]) -> Dict[str, str]:
         )
 
 
+@profiled("formatting")
 def compare_spread_with_alert_value(
     spread_value: str, alert_value: str, market_id: str
 ) -> Dict[str, str]:
@@ -0,0 +1,221 @@
+import argparse
+import asyncio
+import random
+import re
+from collections import Counter
+from typing import Any, Dict, List, Literal
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+CURRENCIES = ["BTC", "ETH", "LTC", "BCH", "USDC", "USDT", "XRP", "SOL", "DOT", "ADA"]
+QUOTE_CURRENCIES = ["CLP", "COP", "PEN", "ARS", "BTC"]
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+_MARKET_PATH = re.compile(r"/markets/[^/]+")
+
+
+class StandInSettings(BaseModel):
+    market_count: int = 20
+    latency: Literal[LATENCY_DISTRIBUTIONS] = "fixed"
+    latency_ms: float = 50.0
+    latency_spread_ms: float = 25.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_seconds: int = 1
+    seed: int = 0
+
+
+class BudaStandIn:
+    def __init__(self, settings: StandInSettings) -> None:
+        """
+        Initializes a deterministic stand-in for the public BUDA v2 endpoints used by BaseAPIClient.
+
+        Every response waits for a latency drawn from the configured distribution, then fails with a 429 or a 500 at the configured rates. Markets are generated from the seed and their prices follow a random walk, so two runs with the same settings serve the same data in the same order.
+
+        Args:
+            settings (StandInSettings): The number of markets, the latency distribution in milliseconds ("fixed" latency_ms, "uniform" latency_ms ± latency_spread_ms, or "lognormal" with median latency_ms and latency_spread_ms as sigma in tenths), the error and rate-limit rates between 0 and 1, and the random seed.
+        """
+        self.settings = settings
+        self.random = random.Random(settings.seed)
+        self.markets = _create_markets(settings.market_count)
+        self.markets_by_id = {market["id"].lower(): market for market in self.markets}
+        self.mid_prices = {
+            market["id"]: self.random.uniform(100, 100_000) for market in self.markets
+        }
+        self.requests: Counter = Counter()
+        self.statuses: Counter = Counter()
+
+    def latency(self) -> float:
+        settings = self.settings
+        if settings.latency == "uniform":
+            milliseconds = self.random.uniform(
+                settings.latency_ms - settings.latency_spread_ms,
+                settings.latency_ms + settings.latency_spread_ms,
+            )
+        elif settings.latency == "lognormal":
+            milliseconds = self.random.lognormvariate(
+                0, settings.latency_spread_ms / 10
+            )
+            milliseconds *= settings.latency_ms
+        else:
+            milliseconds = settings.latency_ms
+        return max(milliseconds, 0.0) / 1000
+
+    def ticker(self, market: Dict[str, Any]) -> Dict[str, Any]:
+        market_id = market["id"]
+        # Move the price a little on every read, like a live order book
+        mid_price = self.mid_prices[market_id] * self.random.uniform(0.999, 1.001)
+        self.mid_prices[market_id] = mid_price
+        half_spread = mid_price * self.random.uniform(0.0005, 0.01)
+        quote_currency = market["quote_currency"]
+        return {
+            "market_id": market_id,
+            "last_price": [f"{mid_price:.2f}", quote_currency],
+            "min_ask": [f"{mid_price + half_spread:.2f}", quote_currency],
+            "max_bid": [f"{mid_price - half_spread:.2f}", quote_currency],
+            "volume": [f"{self.random.uniform(1, 1000):.8f}", market["base_currency"]],
+            "price_variation_24h": f"{self.random.uniform(-0.1, 0.1):.3f}",
+            "price_variation_7d": f"{self.random.uniform(-0.2, 0.2):.3f}",
+        }
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {"requests": dict(self.requests), "statuses": dict(self.statuses)}
+
+    def reset_stats(self) -> None:
+        self.requests.clear()
+        self.statuses.clear()
+
+
+def create_app(settings: StandInSettings) -> FastAPI:
+    """
+    Creates the stand-in application, serving the BUDA endpoints under /api/v2 and its request counters under /_stats.
+
+    Args:
+        settings (StandInSettings): The behaviour of the stand-in.
+
+    Returns:
+        FastAPI: The application, with its BudaStandIn in app.state.stand_in.
+    """
+    stand_in = BudaStandIn(settings)
+    app = FastAPI(title="BUDA API stand-in")
+    app.state.stand_in = stand_in
+
+    @app.middleware("http")
+    async def simulate_upstream(request: Request, call_next):
+        if request.url.path.startswith("/_stats"):
+            return await call_next(request)
+        await asyncio.sleep(stand_in.latency())
+        roll = stand_in.random.random()
+        if roll < settings.rate_limit_rate:
+            response = JSONResponse(
+                {"message": "Too many requests"},
+                status_code=429,
+                headers={"Retry-After": str(settings.retry_after_seconds)},
+            )
+        elif roll < settings.rate_limit_rate + settings.error_rate:
+            response = JSONResponse({"message": "Internal error"}, status_code=500)
+        else:
+            response = await call_next(request)
+        stand_in.requests[_path_template(request.url.path)] += 1
+        stand_in.statuses[str(response.status_code)] += 1
+        return response
+
+    @app.get("/api/v2/markets")
+    async def get_markets():
+        return {"markets": stand_in.markets}
+
+    @app.get("/api/v2/markets/{market_id}")
+    async def get_market(market_id: str):
+        market = stand_in.markets_by_id.get(market_id.lower())
+        if market is None:
+            return _not_found()
+        return {"market": market}
+
+    @app.get("/api/v2/markets/{market_id}/ticker")
+    async def get_ticker(market_id: str):
+        market = stand_in.markets_by_id.get(market_id.lower())
+        if market is None:
+            return _not_found()
+        return {"ticker": stand_in.ticker(market)}
+
+    @app.get("/api/v2/tickers")
+    async def get_tickers():
+        return {"tickers": [stand_in.ticker(market) for market in stand_in.markets]}
+
+    @app.get("/_stats")
+    async def get_stats():
+        return stand_in.stats()
+
+    @app.post("/_stats/reset")
+    async def reset_stats():
+        stand_in.reset_stats()
+        return stand_in.stats()
+
+    return app
+
+
+def _create_markets(market_count: int) -> List[Dict[str, Any]]:
+    markets = []
+    for index in range(market_count):
+        base_currency = CURRENCIES[index % len(CURRENCIES)]
+        quote_currency = QUOTE_CURRENCIES[(index // len(CURRENCIES)) % 5]
+        # Suffix the id once every currency pair was used
+        suffix = "" if index < len(CURRENCIES) * 5 else str(index)
+        markets.append(
+            {
+                "id": f"{base_currency}{suffix}-{quote_currency}",
+                "name": f"{base_currency.lower()}-{quote_currency.lower()}",
+                "base_currency": base_currency,
+                "quote_currency": quote_currency,
+                "minimum_order_amount": ["0.001", base_currency],
+                "disabled": False,
+                "illiquid": False,
+                "rpo_disabled": None,
+                "taker_fee": 0.8,
+                "maker_fee": 0.4,
+                "max_orders_per_minute": 100,
+                "maker_discount_percentage": "0.0",
+                "taker_discount_percentage": "0.0",
+            }
+        )
+    return markets
+
+
+def _path_template(path: str) -> str:
+    # Count every market under one path, as the app labels its upstream metrics
+    return _MARKET_PATH.sub("/markets/{market_id}", path)
+
+
+def _not_found() -> JSONResponse:
+    return JSONResponse({"message": "Not found", "code": "not_found"}, status_code=404)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local BUDA API stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--log-level", default="info")
+    for name, field in StandInSettings.model_fields.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}",
+            type=type(field.default),
+            default=field.default,
+            choices=LATENCY_DISTRIBUTIONS if name == "latency" else None,
+        )
+    arguments = vars(parser.parse_args())
+    host, port = arguments.pop("host"), arguments.pop("port")
+    log_level = arguments.pop("log_level")
+    uvicorn.run(
+        create_app(StandInSettings(**arguments)),
+        host=host,
+        port=port,
+        log_level=log_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import httpx
+
+from bench.report import Results, finish, summarize_latencies
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "e2e.json")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Every scenario is a path template, {market_id} rotating over the stand-in markets
+SCENARIOS = {
+    "spreads": "/api/v1/spreads",
+    "spread": "/api/v1/spreads/{market_id}",
+    "alerts": "/api/v1/alerts",
+    "alert": "/api/v1/alerts/{market_id}",
+}
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    paths: Sequence[str],
+    concurrency: int,
+    requests: int,
+) -> Dict[str, float]:
+    """
+    Sends a number of GET requests with a fixed number of them in flight, and summarizes their latencies.
+
+    Args:
+        client (httpx.AsyncClient): The client, with the base URL of the app.
+        paths (Sequence[str]): The paths requested in turn.
+        concurrency (int): The number of requests in flight at any time.
+        requests (int): The total number of requests.
+
+    Returns:
+        Dict[str, float]: The summary of the run, as returned by summarize_latencies. Responses other than 200 count as errors and their latencies are left out.
+    """
+    latencies: List[float] = []
+    errors = 0
+    next_request = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_request
+        while next_request < requests:
+            path = paths[next_request % len(paths)]
+            next_request += 1
+            started_at = time.perf_counter()
+            try:
+                response = await client.get(path)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - started_at)
+            else:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize_latencies(latencies, time.perf_counter() - started_at, errors)
+
+
+async def run_benchmarks(
+    app_url: str,
+    stand_in_url: str,
+    scenarios: Dict[str, str],
+    concurrency: int,
+    requests: int,
+    warmup: int,
+    alert_value: float,
+) -> Results:
+    """
+    Runs every scenario against a running app, counting the calls its upstream stand-in received during each one.
+
+    Args:
+        app_url (str): The base URL of the app.
+        stand_in_url (str): The base URL of the BUDA stand-in behind the app.
+        scenarios (Dict[str, str]): The path template of every scenario, by name.
+        concurrency (int): The number of requests in flight at any time.
+        requests (int): The number of measured requests per scenario.
+        warmup (int): The number of requests sent before measuring each scenario, to fill connection pools and caches.
+        alert_value (float): The spread alert set before the alert scenarios run.
+
+    Returns:
+        Results: The summary of every scenario, by name.
+    """
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=app_url, limits=limits, timeout=30
+    ) as client, httpx.AsyncClient(base_url=stand_in_url) as stand_in:
+        markets = (await stand_in.get("/api/v2/markets")).json()["markets"]
+        market_ids = [market["id"] for market in markets]
+        (
+            await client.post("/api/v1/alerts", json={"value": alert_value})
+        ).raise_for_status()
+
+        results = {}
+        for name, template in scenarios.items():
+            paths = [template.format(market_id=market_id) for market_id in market_ids]
+            await run_scenario(client, paths, concurrency, warmup)
+            await stand_in.post("/_stats/reset")
+            summary = await run_scenario(client, paths, concurrency, requests)
+            stats = (await stand_in.get("/_stats")).json()
+            upstream_calls = sum(stats["requests"].values())
+            summary["upstream_calls_per_request"] = (
+                upstream_calls / summary["requests"] if summary["requests"] else 0.0
+            )
+            results[name] = summary
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 30) -> None:
+    """
+    Waits until a server started in a subprocess answers HTTP requests.
+
+    Raises:
+        RuntimeError: If the process exits or the server does not answer in time.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The server for {url} exited with {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"The server for {url} did not start in {timeout} seconds")
+
+
+@contextmanager
+def serve(
+    command: List[str], ready_url: str, env: Optional[Dict[str, str]] = None
+) -> Iterator[None]:
+    """
+    Runs a server in a subprocess for the duration of the block.
+    """
+    process = subprocess.Popen(
+        command,
+        cwd=ROOT,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(ready_url, process)
+        yield
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the API end to end against a local BUDA stand-in."
+    )
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS)
+    )
+    parser.add_argument("--alert-value", type=float, default=1000.0)
+    parser.add_argument("--market-count", type=int, default=20)
+    parser.add_argument(
+        "--latency", choices=("fixed", "uniform", "lognormal"), default="lognormal"
+    )
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--latency-spread-ms", type=float, default=3.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    arguments = parser.parse_args()
+
+    stand_in_port, app_port = free_port(), free_port()
+    stand_in_url = f"http://127.0.0.1:{stand_in_port}"
+    app_url = f"http://127.0.0.1:{app_port}"
+    stand_in_command = [
+        sys.executable,
+        "-m",
+        "bench.buda_stand_in",
+        "--port",
+        str(stand_in_port),
+        "--market-count",
+        str(arguments.market_count),
+        "--latency",
+        arguments.latency,
+        "--latency-ms",
+        str(arguments.latency_ms),
+        "--latency-spread-ms",
+        str(arguments.latency_spread_ms),
+        "--error-rate",
+        str(arguments.error_rate),
+        "--rate-limit-rate",
+        str(arguments.rate_limit_rate),
+        "--log-level",
+        "warning",
+    ]
+    app_command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--port",
+        str(app_port),
+        "--log-level",
+        "warning",
+    ]
+    app_env = {
+        "BUDA_API_URL": f"{stand_in_url}/api/v2",
+        # The stand-in ignores the signature, but the app signs every request
+        "BUDA_API_KEY": os.environ.get("BUDA_API_KEY", "stand-in"),
+        "BUDA_API_SECRET": os.environ.get("BUDA_API_SECRET", "stand-in"),
+        "ALERT_DB_PATH": os.path.join(tempfile.mkdtemp(), "alerts.db"),
+    }
+
+    with serve(stand_in_command, f"{stand_in_url}/_stats"), serve(
+        app_command, f"{app_url}/metrics", app_env
+    ):
+        results = asyncio.run(
+            run_benchmarks(
+                app_url,
+                stand_in_url,
+                {name: SCENARIOS[name] for name in arguments.scenarios},
+                arguments.concurrency,
+                arguments.requests,
+                arguments.warmup,
+                arguments.alert_value,
+            )
+        )
+    return finish(
+        results, arguments.baseline, arguments.tolerance, arguments.update_baseline
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
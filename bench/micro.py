@@ -0,0 +1,171 @@
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.api.middleware import CompressionMiddleware
+from app.schemas import SpreadResponse, TickerResponse, decode_ticker_quotes
+from app.utils import (
+    calculate_spread,
+    calculate_spreads,
+    compare_spread_with_alert_value,
+    format_current_spread,
+)
+from bench.report import Results, finish
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "micro.json")
+
+TICKER = {
+    "market_id": "BTC-CLP",
+    "last_price": ["40000000.0", "CLP"],
+    "min_ask": ["40010000.0", "CLP"],
+    "max_bid": ["39990000.0", "CLP"],
+    "volume": ["12.34567891", "BTC"],
+    "price_variation_24h": "0.012",
+    "price_variation_7d": "-0.034",
+}
+SPREAD = calculate_spread(TICKER)
+# The body of GET /spreads for a hundred markets
+ALL_SPREADS = [
+    format_current_spread({**SPREAD, "market_id": f"BTC{index}-CLP"})
+    for index in range(100)
+]
+ALL_SPREADS_BODY = ORJSONResponse(ALL_SPREADS).body
+COMPRESSION = CompressionMiddleware(app=None)
+# The tickers of GET /spreads for a hundred markets
+MARKET_COUNT = 100
+ALL_TICKERS = [
+    {**TICKER, "market_id": f"BTC{index}-CLP"} for index in range(MARKET_COUNT)
+]
+# What FastAPI does with a response_model when a route returns models
+SPREADS_RESPONSE_MODEL = TypeAdapter(List[SpreadResponse])
+
+
+def hot_path_benchmarks() -> Dict[str, Callable[[], object]]:
+    """
+    Returns the functions on the path of every spread and alert response, by benchmark name.
+    """
+    return {
+        "calculate_spread": lambda: calculate_spread(TICKER),
+        "format_current_spread": lambda: format_current_spread(SPREAD),
+        "compare_spread_with_alert_value": lambda: compare_spread_with_alert_value(
+            SPREAD["value"], 15000.0, SPREAD["market_id"]
+        ),
+        "ticker_response_validation": lambda: TickerResponse(**TICKER),
+        # Rendering the all-markets body with the default and the orjson response
+        "all_spreads_json_render": lambda: JSONResponse(ALL_SPREADS),
+        "all_spreads_orjson_render": lambda: ORJSONResponse(ALL_SPREADS),
+        "all_spreads_gzip": lambda: COMPRESSION.compress(ALL_SPREADS_BODY, "gzip"),
+        "all_spreads_brotli": lambda: COMPRESSION.compress(ALL_SPREADS_BODY, "br"),
+    }
+
+
+def model_all_spreads(tickers: List[Dict[str, Any]]) -> bytes:
+    # GET /spreads before the lean decode path, kept as the reference to compare with
+    tickers = [TickerResponse(**ticker).model_dump() for ticker in tickers]
+    spreads = [
+        SpreadResponse(**format_current_spread(spread))
+        for spread in calculate_spreads(tickers).to_spreads()
+    ]
+    content = SPREADS_RESPONSE_MODEL.dump_python(
+        SPREADS_RESPONSE_MODEL.validate_python(spreads), mode="json"
+    )
+    return JSONResponse(content).body
+
+
+def lean_all_spreads(tickers: List[Dict[str, Any]]) -> bytes:
+    # GET /spreads with the tickers validated once and the response not validated again
+    spreads = calculate_spreads(decode_ticker_quotes(tickers)).to_spreads()
+    return ORJSONResponse([format_current_spread(spread) for spread in spreads]).body
+
+
+def pipeline_benchmarks() -> Dict[str, Callable[[], object]]:
+    """
+    Returns the whole GET /spreads pipeline for a hundred markets, from the upstream tickers to the response body, before and after the lean decode path.
+    """
+    return {
+        "all_spreads_model_path": lambda: model_all_spreads(ALL_TICKERS),
+        "all_spreads_lean_path": lambda: lean_all_spreads(ALL_TICKERS),
+    }
+
+
+def run_micro_benchmarks(
+    benchmarks: Dict[str, Callable[[], object]], number: int, repeat: int
+) -> Results:
+    """
+    Times every benchmark, keeping the fastest of several repetitions to filter out noise from other processes.
+
+    Args:
+        benchmarks (Dict[str, Callable[[], object]]): The functions to time, by benchmark name.
+        number (int): The number of calls per repetition.
+        repeat (int): The number of repetitions.
+
+    Returns:
+        Results: The nanoseconds per call of every benchmark.
+    """
+    results = {}
+    for name, benchmark in benchmarks.items():
+        timings = timeit.repeat(benchmark, number=number, repeat=repeat)
+        results[name] = {"ns_per_call": min(timings) / number * 1e9}
+    return results
+
+
+def measure_allocations(
+    benchmarks: Dict[str, Callable[[], object]], markets: int
+) -> Results:
+    """
+    Measures the memory allocated by one call of every benchmark with tracemalloc.
+
+    Args:
+        benchmarks (Dict[str, Callable[[], object]]): The functions to measure, by benchmark name.
+        markets (int): The number of markets each call handles.
+
+    Returns:
+        Results: The peak number of bytes allocated per market by every benchmark, above what was allocated before the call.
+    """
+    results = {}
+    for name, benchmark in benchmarks.items():
+        # Warm up first, so caches filled on the first call are not counted
+        benchmark()
+        tracemalloc.start()
+        try:
+            allocated_before, _ = tracemalloc.get_traced_memory()
+            benchmark()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        results[name] = {"peak_bytes_per_market": (peak - allocated_before) / markets}
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Micro-benchmark the spread and alert hot path."
+    )
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    arguments = parser.parse_args()
+
+    results = run_micro_benchmarks(
+        {**hot_path_benchmarks(), **pipeline_benchmarks()},
+        arguments.number,
+        arguments.repeat,
+    )
+    allocations = measure_allocations(pipeline_benchmarks(), MARKET_COUNT)
+    for name, allocation in allocations.items():
+        results[name].update(allocation)
+    return finish(
+        results, arguments.baseline, arguments.tolerance, arguments.update_baseline
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
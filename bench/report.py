@@ -0,0 +1,157 @@
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Metrics that regress when they go up, and those that regress when they go down
+LOWER_IS_BETTER = (
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "upstream_calls_per_request",
+    "ns_per_call",
+    "peak_bytes_per_market",
+)
+HIGHER_IS_BETTER = ("requests_per_second",)
+
+Results = Dict[str, Dict[str, float]]
+
+
+def summarize_latencies(
+    latencies: Sequence[float],
+    duration: float,
+    errors: int = 0,
+    upstream_calls: Optional[int] = None,
+) -> Dict[str, float]:
+    """
+    Summarizes the latencies of a load test run.
+
+    Args:
+        latencies (Sequence[float]): The latency of every request, in seconds.
+        duration (float): The wall time of the run, in seconds.
+        errors (int): The number of requests that failed or got an unexpected status.
+        upstream_calls (Optional[int]): The number of calls the upstream received during the run, if known.
+
+    Returns:
+        Dict[str, float]: The request count, errors, throughput, p50/p95/p99 latencies in milliseconds and upstream calls per request.
+    """
+    count = len(latencies)
+    p50, p95, p99 = (
+        np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+        if count
+        else (0.0, 0.0, 0.0)
+    )
+    summary = {
+        "requests": count,
+        "errors": errors,
+        "requests_per_second": count / duration if duration > 0 else 0.0,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+    }
+    if upstream_calls is not None:
+        summary["upstream_calls_per_request"] = upstream_calls / count if count else 0.0
+    return summary
+
+
+def compare_with_baseline(
+    results: Results, baseline: Results, tolerance: float
+) -> List[str]:
+    """
+    Compares benchmark results with a baseline, metric by metric.
+
+    Args:
+        results (Results): The metrics of every benchmark, by benchmark name.
+        baseline (Results): The stored metrics, in the same shape. Benchmarks or metrics missing from it are not compared.
+        tolerance (float): The relative change allowed before a metric counts as a regression, e.g. 0.2 for 20%.
+
+    Returns:
+        List[str]: One description per regressed metric, empty if none regressed.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        expected = baseline.get(name, {})
+        for metric, value in metrics.items():
+            reference = expected.get(metric)
+            if reference is None:
+                continue
+            if metric in LOWER_IS_BETTER and value > reference * (1 + tolerance):
+                regressions.append(
+                    f"{name} {metric}: {value:.4g} > {reference:.4g} (+{tolerance:.0%})"
+                )
+            elif metric in HIGHER_IS_BETTER and value < reference * (1 - tolerance):
+                regressions.append(
+                    f"{name} {metric}: {value:.4g} < {reference:.4g} (-{tolerance:.0%})"
+                )
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[Results]:
+    """
+    Returns the baseline stored in a JSON file, or None if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(path: str, results: Results) -> None:
+    """
+    Stores benchmark results as the baseline of later runs.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as baseline_file:
+        json.dump(results, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
+
+
+def format_results(results: Results) -> str:
+    """
+    Formats benchmark results as a plain text table, one row per benchmark.
+    """
+    columns = sorted({metric for metrics in results.values() for metric in metrics})
+    widths = [max(len(column), 10) + 2 for column in columns]
+    width = max([len(name) for name in results] + [len("benchmark")])
+    lines = [
+        "benchmark".ljust(width)
+        + "".join(column.rjust(size) for column, size in zip(columns, widths))
+    ]
+    for name, metrics in results.items():
+        cells = "".join(
+            f"{metrics[column]:>{size}.4g}" if column in metrics else " " * size
+            for column, size in zip(columns, widths)
+        )
+        lines.append(name.ljust(width) + cells)
+    return "\n".join(lines)
+
+
+def finish(
+    results: Results, baseline_path: str, tolerance: float, update_baseline: bool
+) -> int:
+    """
+    Prints the results, then stores them as the baseline or compares them with it.
+
+    Returns:
+        int: The exit status, 1 if any metric regressed beyond the tolerance and 0 otherwise.
+    """
+    print(format_results(results))
+    if update_baseline:
+        save_baseline(baseline_path, results)
+        print(f"\nBaseline saved to {baseline_path}")
+        return 0
+    baseline = load_baseline(baseline_path)
+    if baseline is None:
+        print(
+            f"\nNo baseline at {baseline_path}, run with --update-baseline to store one"
+        )
+        return 0
+    regressions = compare_with_baseline(results, baseline, tolerance)
+    if regressions:
+        print("\nRegressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"\nNo regressions against {baseline_path}")
+    return 0
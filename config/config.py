@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pydantic import ConfigDict
 from pydantic_settings import BaseSettings
@@ -9,6 +9,89 @@ class Settings(BaseSettings):
     API_URL_PREFIX: str = "api/v1"
     BUDA_API_URL: str = "https://www.buda.com/api/v2"
 
+    # UPSTREAM HTTP SETTINGS
+    BUDA_API_POOL_CONNECTIONS: int = 10
+    BUDA_API_POOL_MAXSIZE: int = 20
+    BUDA_API_CONNECT_TIMEOUT: float = 3.05
+    BUDA_API_READ_TIMEOUT: float = 10.0
+    BUDA_API_ASYNC_MAX_CONNECTIONS: int = 100
+    TICKER_FETCH_MAX_WORKERS: int = 10
+    # Read timeouts overriding BUDA_API_READ_TIMEOUT, by path template
+    BUDA_API_PATH_READ_TIMEOUTS: Dict[str, float] = {
+        "markets/{market_id}/ticker": 3.0,
+    }
+
+    # UPSTREAM RESILIENCE SETTINGS
+    # Retries of timeouts, connection errors, 429 and 5xx responses
+    BUDA_API_MAX_RETRIES: int = 2
+    BUDA_API_RETRY_BACKOFF: float = 0.1
+    BUDA_API_RETRY_MAX_BACKOFF: float = 2.0
+    # Consecutive failures that stop calling the BUDA API for the reset timeout
+    BUDA_API_BREAKER_FAILURE_THRESHOLD: int = 5
+    BUDA_API_BREAKER_RESET_TIMEOUT: float = 10.0
+
+    # UPSTREAM RATE LIMIT SETTINGS
+    # Requests per second to the BUDA API, 0 or less disables the limiter
+    BUDA_API_RATE_LIMIT: float = 10.0
+    BUDA_API_RATE_LIMIT_BURST: int = 20
+    # Seconds a request waits for the budget before failing
+    BUDA_API_RATE_LIMIT_MAX_WAIT: float = 2.0
+    # Tokens bulk refreshes leave for single-market requests
+    BUDA_API_RATE_LIMIT_HIGH_PRIORITY_RESERVE: float = 5.0
+    # A SQLite file shares the budget between every worker using it
+    BUDA_API_RATE_LIMIT_DB_PATH: Optional[str] = None
+
+    # CACHE SETTINGS
+    MARKETS_CACHE_TTL: float = 3600.0
+    TICKER_CACHE_FRESH_SECONDS: float = 1.0
+    TICKER_CACHE_STALE_SECONDS: float = 30.0
+    # How long expired entries may still be served when the BUDA API fails
+    MARKETS_CACHE_STALE_IF_ERROR_SECONDS: float = 86400.0
+    TICKER_CACHE_STALE_IF_ERROR_SECONDS: float = 300.0
+    # How long clients and proxies may reuse a spread or alert response
+    SPREAD_RESPONSES_MAX_AGE: int = 1
+    # Smaller responses are sent uncompressed
+    RESPONSE_COMPRESSION_MINIMUM_SIZE: int = 1024
+
+    # MARKET DATA POLLER SETTINGS
+    MARKET_DATA_POLLER_ENABLED: bool = False
+    MARKET_DATA_POLL_INTERVAL: float = 1.0
+    MARKET_DATA_MAX_AGE: float = 10.0
+
+    # SPREAD STREAM SETTINGS
+    SPREAD_STREAM_MAX_SUBSCRIBERS: int = 1000
+    SPREAD_STREAM_KEEPALIVE_SECONDS: float = 15.0
+
+    # SPREAD HISTORY SETTINGS
+    # A market is sampled when its spread changes, at most once per interval
+    SPREAD_SAMPLE_MIN_INTERVAL: float = 1.0
+    # A day of samples at one sample per second, 2.6 MiB per market
+    SPREAD_HISTORY_SIZE: int = 86400
+    # Closed candles kept per market and interval: 12 hours of 1m candles
+    SPREAD_CANDLES_MAX_COUNT: int = 720
+
+    # ALERT SETTINGS
+    ALERT_EVENT_LOG_SIZE: int = 10000
+    ALERT_DB_PATH: str = "alerts.db"
+    ALERT_STORE_SYNC_INTERVAL: float = 1.0
+
+    # WEBHOOK SETTINGS
+    WEBHOOK_MAX_PENDING: int = 10000
+    WEBHOOK_WORKERS: int = 4
+    WEBHOOK_BATCH_SIZE: int = 50
+    WEBHOOK_MAX_ATTEMPTS: int = 5
+    WEBHOOK_BACKOFF_SECONDS: float = 0.5
+    WEBHOOK_TIMEOUT: float = 5.0
+    WEBHOOK_MAX_DEAD_LETTERS: int = 1000
+    # Hosts notified whatever their scheme and address, other webhooks need https and a public address
+    WEBHOOK_ALLOWED_HOSTS: List[str] = []
+
+    # PROFILING SETTINGS
+    # Profiling is off unless a sample rate or an admin token is set
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_ADMIN_TOKEN: Optional[str] = None
+    PROFILING_MAX_PROFILES: int = 100
+
     # Environment variables
     BUDA_API_SECRET: Optional[str] = None
     BUDA_API_KEY: Optional[str] = None
@@ -37,6 +37,13 @@ SAMPLE_TICKER_DATA_MARKET_3 = {
         "min_ask": ["200", "CLP"],
     }
 }
+SAMPLE_ALL_TICKERS_DATA = {
+    "tickers": [
+        SAMPLE_TICKER_DATA_MARKET_1["ticker"],
+        SAMPLE_TICKER_DATA_MARKET_2["ticker"],
+        SAMPLE_TICKER_DATA_MARKET_3["ticker"],
+    ]
+}
 SAMPLE_TICKER_DATA_MARKET_1_INVALID_DATA = {
     "ticker": {
         "market_id": "market_1",
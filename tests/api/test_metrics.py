@@ -0,0 +1,59 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import buda_api
+from app.services.metrics import http_request_duration
+
+from config import settings
+
+client = TestClient(app)
+
+
+class TestGetMetrics:
+    def test_get_metrics_succeeds(self):
+        # Making the request
+        response = client.get("/metrics")
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        for name in [
+            "http_request_duration_seconds",
+            "buda_api_request_duration_seconds",
+            "buda_api_requests_in_flight",
+            "cache_requests_total",
+            "validation_failures_total",
+            "buda_api_single_flight_calls_total",
+            "buda_api_retries_total",
+            "buda_api_circuit_breaker_state",
+            "buda_api_circuit_breaker_rejections_total",
+        ]:
+            assert f"# TYPE {name} " in response.text
+
+    def test_circuit_breaker_state_is_exposed(self):
+        # Making the request
+        response = client.get("/metrics")
+
+        # Validate the one-hot state of the breaker
+        state = buda_api.circuit_breaker.state
+        assert f'buda_api_circuit_breaker_state{{state="{state}"}} 1' in response.text
+
+    def test_requests_are_recorded_by_route_template(self):
+        labels = ("GET", "/api/v1/spreads/{market_id}/history", "200")
+        before = sum(http_request_duration.values().get(labels, [0, 0])[:-1])
+
+        # Making the request
+        client.get(f"{settings.API_URL_PREFIX}/spreads/market_1/history")
+
+        # Validate the recorded observation
+        assert sum(http_request_duration.values()[labels][:-1]) == before + 1
+
+    def test_unmatched_requests_are_recorded(self):
+        labels = ("GET", "unmatched", "404")
+        before = sum(http_request_duration.values().get(labels, [0, 0])[:-1])
+
+        # Making the request
+        client.get("/not-a-route")
+
+        # Validate the recorded observation
+        assert sum(http_request_duration.values()[labels][:-1]) == before + 1
@@ -0,0 +1,234 @@
+import gzip
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api.middleware import (
+    CompressionMiddleware,
+    ProfilingMiddleware,
+    negotiate_encoding,
+)
+from app.services.profiles import ProfileStore
+from app.utils import profile_phase
+
+
+def _client(profile_store, sample_rate=0.0, admin_token=None, rng=lambda: 0.5):
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        with profile_phase("validation"):
+            pass
+        return {"message": "pong"}
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        profile_store=profile_store,
+        sample_rate=sample_rate,
+        admin_token=admin_token,
+        rng=rng,
+    )
+    return TestClient(app)
+
+
+@pytest.fixture
+def profile_store():
+    return ProfileStore(max_profiles=2)
+
+
+class TestProfilingMiddleware:
+    def test_request_with_admin_token_is_profiled(self, profile_store):
+        client = _client(profile_store, admin_token="secret")
+
+        # Making the request
+        response = client.get("/ping", headers={"X-Profile-Token": "secret"})
+
+        # Validate the response and the stored profile
+        assert response.status_code == 200
+        profile = profile_store.get(response.headers["X-Profile-Id"])
+        assert profile.method == "GET"
+        assert profile.path == "/ping"
+        assert profile.status == 200
+        assert profile.phases["validation"]["calls"] == 1
+
+    def test_request_with_wrong_token_is_not_profiled(self, profile_store):
+        client = _client(profile_store, admin_token="secret")
+
+        # Making the request
+        response = client.get("/ping", headers={"X-Profile-Token": "guess"})
+
+        # Validate the response and the stored profiles
+        assert "X-Profile-Id" not in response.headers
+        assert profile_store.get_all() == []
+
+    @pytest.mark.parametrize("random_number, is_profiled", [(0.05, True), (0.5, False)])
+    def test_requests_are_sampled(self, profile_store, random_number, is_profiled):
+        client = _client(profile_store, sample_rate=0.1, rng=lambda: random_number)
+
+        # Making the request
+        response = client.get("/ping")
+
+        # Validate the stored profiles
+        assert ("X-Profile-Id" in response.headers) is is_profiled
+        assert len(profile_store.get_all()) == int(is_profiled)
+
+    def test_only_latest_profiles_are_kept(self, profile_store):
+        client = _client(profile_store, sample_rate=1.0)
+
+        # Making the requests
+        profile_ids = [client.get("/ping").headers["X-Profile-Id"] for _ in range(3)]
+
+        # Validate the stored profiles
+        assert [profile.id for profile in profile_store.get_all()] == profile_ids[1:]
+
+
+def _compressed_client(minimum_size=100):
+    app = FastAPI()
+
+    @app.get("/spreads")
+    async def spreads():
+        return [
+            {"market_id": f"BTC{index}-CLP", "value": "1.00"} for index in range(20)
+        ]
+
+    @app.get("/ping")
+    async def ping():
+        return {"message": "pong"}
+
+    @app.get("/stream")
+    async def stream():
+        async def events():
+            yield "data: " + "x" * 200 + "\n\n"
+            yield "data: " + "y" * 200 + "\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/tagged")
+    async def tagged():
+        return Response("x" * 200, media_type="text/plain", headers={"ETag": '"abc"'})
+
+    @app.get("/not-modified")
+    async def not_modified():
+        return Response(status_code=304, headers={"ETag": '"abc"'})
+
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+    return TestClient(app)
+
+
+class TestCompressionMiddleware:
+    def test_response_is_compressed_with_brotli(self):
+        client = _compressed_client()
+
+        # Making the request
+        response = client.get("/spreads", headers={"Accept-Encoding": "gzip, br"})
+
+        # Validate the response was compressed
+        assert response.headers["Content-Encoding"] == "br"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert int(response.headers["Content-Length"]) < 20 * 40
+        assert len(response.json()) == 20
+
+    def test_response_is_compressed_with_gzip(self):
+        client = _compressed_client()
+
+        # Making the request
+        response = client.get("/spreads", headers={"Accept-Encoding": "gzip"})
+
+        # Validate the response was compressed
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert len(response.json()) == 20
+
+    def test_response_is_not_compressed_without_accept_encoding(self):
+        client = _compressed_client()
+
+        # Making the request
+        response = client.get("/spreads", headers={"Accept-Encoding": "identity"})
+
+        # Validate the response was sent as is
+        assert "Content-Encoding" not in response.headers
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert len(response.json()) == 20
+
+    def test_small_response_is_not_compressed(self):
+        client = _compressed_client()
+
+        # Making the request
+        response = client.get("/ping", headers={"Accept-Encoding": "br"})
+
+        # Validate the response was sent as is
+        assert "Content-Encoding" not in response.headers
+        assert response.json() == {"message": "pong"}
+
+    def test_event_stream_is_not_compressed(self):
+        client = _compressed_client()
+
+        # Making the request
+        response = client.get("/stream", headers={"Accept-Encoding": "br"})
+
+        # Validate the events were sent as is
+        assert "Content-Encoding" not in response.headers
+        assert "Vary" not in response.headers
+        assert response.text.count("data: ") == 2
+
+    def test_compressed_response_has_a_weak_etag(self):
+        client = _compressed_client()
+
+        # Making the request
+        response = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+
+        # Validate the response
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["ETag"] == 'W/"abc"'
+
+    def test_not_modified_response_matches_the_compressed_one(self):
+        client = _compressed_client()
+
+        # Making the request
+        response = client.get("/not-modified", headers={"Accept-Encoding": "br"})
+
+        # Validate the response
+        assert response.status_code == 304
+        assert response.headers["ETag"] == 'W/"abc"'
+        assert response.headers["Vary"] == "Accept-Encoding"
+
+    def test_not_modified_response_keeps_strong_etag_without_compression(self):
+        client = _compressed_client()
+
+        # Making the request
+        response = client.get(
+            "/not-modified", headers={"Accept-Encoding": "identity"}
+        )
+
+        # Validate the response
+        assert response.status_code == 304
+        assert response.headers["ETag"] == '"abc"'
+        assert response.headers["Vary"] == "Accept-Encoding"
+
+    def test_compress(self):
+        middleware = CompressionMiddleware(app=None)
+        body = b'{"market_id": "BTC-CLP"}' * 10
+
+        # Validate both encodings round trip
+        assert gzip.decompress(middleware.compress(body, "gzip")) == body
+        assert brotli.decompress(middleware.compress(body, "br")) == body
+
+
+class TestNegotiateEncoding:
+    @pytest.mark.parametrize(
+        "accept_encoding, expected",
+        [
+            ("gzip, deflate, br", "br"),
+            ("gzip", "gzip"),
+            ("br;q=0.5, gzip;q=0.8", "gzip"),
+            ("br;q=0, gzip", "gzip"),
+            ("*", "br"),
+            ("*, br;q=0", "gzip"),
+            ("identity", None),
+            ("", None),
+        ],
+    )
+    def test_negotiate_encoding(self, accept_encoding, expected):
+        assert negotiate_encoding(accept_encoding) == expected
@@ -6,7 +6,15 @@ from pydantic import ValidationError
 from requests import Response, HTTPError
 
 from app.main import app
+from app.services import buda_api
+from app.services.alert_events import AlertEventLog
+from app.services.alert_index import AlertIndex
+from app.services.alert_store import AlertRepository, AlertStore
+from app.services.cache import CacheLookup
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.webhooks import DeadLetter
 from app.services.markets import MarketService
+from app.services.ticker_book import TickerBook
 from app.services.tickers import TickerService
 
 from app.api.v1.alerts import spread_alert
@@ -15,6 +23,7 @@ from config import settings
 from config import (
     SAMPLE_MARKETS_DATA,
     SAMPLE_MARKETS_DATA_MISSING_MARKET_ID,
+    SAMPLE_ALL_TICKERS_DATA,
     SAMPLE_TICKER_DATA_MARKET_1_INVALID_DATA,
     SAMPLE_TICKER_DATA_MARKET_2_MISSING_FIELD,
     SAMPLE_TICKER_DATA_MARKET_3_INVALID_DATA_AND_MISSING_FIELD,
@@ -30,21 +39,25 @@ client = TestClient(app)
 
 
 # Functions to return different ticker data based on market ID
-def _get_tickers_data_set(market_id: str):
+def _get_tickers_data_set(market_id: str, use_cache: bool = True):
     if market_id not in SAMPLE_TICKERS_DATA_SET:
         response = MagicMock(status_code=404)
         raise HTTPError("Market not found", response=response)
     return SAMPLE_TICKERS_DATA_SET[market_id]
 
-def _get_tickers_data_set_with_invalid_value_sample(market_id: str):
+def _get_tickers_data_set_with_invalid_value_sample(market_id: str, use_cache: bool = True):
     return SAMPLE_TICKERS_DATA_SET_INVALID_VALUE[market_id]
 
-def _get_tickers_data_set_with_missing_field_sample(market_id: str):
+def _get_tickers_data_set_with_missing_field_sample(market_id: str, use_cache: bool = True):
     return SAMPLE_TICKERS_DATA_SET_MISSING_FIELD[market_id]
 
-def _get_tickers_data_set_with_invalid_value_and_missing_field_sample(market_id: str):
+def _get_tickers_data_set_with_invalid_value_and_missing_field_sample(market_id: str, use_cache: bool = True):
     return SAMPLE_TICKERS_DATA_SET_INVALID_VALUE_AND_MISSING_FIELD[market_id]
 
+def _lookup_tickers_data_set(market_id: str):
+    return CacheLookup(_get_tickers_data_set(market_id), None, False)
+
+
 # Aux function to raise an HTTP error
 def _raise_http_error(detail: str, status_code: int):
     def error_raiser(*args, **kwargs):
@@ -53,10 +66,19 @@ def _raise_http_error(detail: str, status_code: int):
     return error_raiser
 
 class TestCompareAlertWithAllMarkets:
-
-    @patch.object(MarketService, "get_all", return_value=SAMPLE_MARKETS_DATA)
+    @pytest.fixture(autouse=True)
+    def bulk_tickers_unavailable(self):
+        # Force the per-market fallback so tickers come from aget_one_by_market_id
+        with patch.object(
+            TickerService,
+            "_aget_bulk",
+            side_effect=_raise_http_error(detail="Not Found", status_code=404),
+        ):
+            yield
+
+    @patch.object(MarketService, "aget_all", return_value=SAMPLE_MARKETS_DATA)
     @patch.object(
-        TickerService, "get_one_by_market_id", side_effect=_get_tickers_data_set
+        TickerService, "aget_one_by_market_id", side_effect=_get_tickers_data_set
     )
     @patch.dict(
         "app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP
@@ -71,10 +93,10 @@ class TestCompareAlertWithAllMarkets:
         # Making the request
         response = client.get(f"{settings.API_URL_PREFIX}/alerts")
 
-        # Check if MarketService.get_all was called once
+        # Check if MarketService.aget_all was called once
         mock_get_all_markets.assert_called_once()
 
-        # Check if TickerService.get_one_by_market_id was called for each market
+        # Check if TickerService.aget_one_by_market_id was called for each market
         assert mock_get_one_ticker_by_market_id.call_count == number_of_markets
 
         # Validate the response
@@ -91,9 +113,9 @@ class TestCompareAlertWithAllMarkets:
             assert "is_less" in alert
             assert "message" in alert
 
-    @patch.object(MarketService, "get_all", return_value=SAMPLE_MARKETS_DATA)
+    @patch.object(MarketService, "aget_all", return_value=SAMPLE_MARKETS_DATA)
     @patch.object(
-        TickerService, "get_one_by_market_id", side_effect=_get_tickers_data_set
+        TickerService, "aget_one_by_market_id", side_effect=_get_tickers_data_set
     )
     @patch.dict(
         "app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_EMPTY
@@ -105,9 +127,9 @@ class TestCompareAlertWithAllMarkets:
         # Making the request
         response = client.get(f"{settings.API_URL_PREFIX}/alerts")
 
-        # Check MarketService.get_all was not called
+        # Check MarketService.aget_all was not called
         mock_get_all_markets.assert_not_called()
-        # Check TickerService.get_one_by_market_id was not called
+        # Check TickerService.aget_one_by_market_id was not called
         mock_get_one_ticker_by_market_id.assert_not_called()
 
         # Validate the response
@@ -116,10 +138,10 @@ class TestCompareAlertWithAllMarkets:
         assert error["detail"] == "Spread Alert not set yet. Please set one first."
 
     @patch.object(
-        MarketService, "get_all", return_value=SAMPLE_MARKETS_DATA_MISSING_MARKET_ID
+        MarketService, "aget_all", return_value=SAMPLE_MARKETS_DATA_MISSING_MARKET_ID
     )
     @patch.object(
-        TickerService, "get_one_by_market_id", side_effect=_get_tickers_data_set
+        TickerService, "aget_one_by_market_id", side_effect=_get_tickers_data_set
     )
     @patch.dict(
         "app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP,
@@ -130,10 +152,10 @@ class TestCompareAlertWithAllMarkets:
         # Making the request
         response = client.get(f"{settings.API_URL_PREFIX}/alerts")
 
-        # Check if MarketService.get_all was called once
+        # Check if MarketService.aget_all was called once
         mock_get_all_markets.assert_called_once()
 
-        # Check if TickerService.get_one_by_market_id was called at least once
+        # Check if TickerService.aget_one_by_market_id was called at least once
         mock_get_one_ticker_by_market_id.assert_called()
 
         # Validate the response for not found error
@@ -149,8 +171,8 @@ class TestCompareAlertWithAllMarkets:
             _get_tickers_data_set_with_invalid_value_and_missing_field_sample,
         ],
     )
-    @patch.object(MarketService, "get_all", return_value=SAMPLE_MARKETS_DATA)
-    @patch.object(TickerService, "get_one_by_market_id")
+    @patch.object(MarketService, "aget_all", return_value=SAMPLE_MARKETS_DATA)
+    @patch.object(TickerService, "aget_one_by_market_id")
     @patch.dict(
         "app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP,
     )
@@ -163,10 +185,10 @@ class TestCompareAlertWithAllMarkets:
         # Making the request
         response = client.get(f"{settings.API_URL_PREFIX}/alerts")
 
-        # Check if MarketService.get_all was called once
+        # Check if MarketService.aget_all was called once
         mock_get_all_markets.assert_called_once()
 
-        # Check if TickerService.get_one_by_market_id was called at least once
+        # Check if TickerService.aget_one_by_market_id was called at least once
         mock_get_one_ticker_by_market_id.assert_called()
 
         # Validate the response for unproucessable entity error
@@ -177,10 +199,10 @@ class TestCompareAlertWithAllMarkets:
 
     @patch.object(
         MarketService,
-        "get_all",
+        "aget_all",
         side_effect=_raise_http_error(detail="Internal Server Error", status_code=500),
     )
-    @patch.object(TickerService, "get_one_by_market_id")
+    @patch.object(TickerService, "aget_one_by_market_id")
     @patch.dict(
         "app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP,
     )
@@ -190,10 +212,10 @@ class TestCompareAlertWithAllMarkets:
         # Making the request
         response = client.get(f"{settings.API_URL_PREFIX}/alerts")
 
-        # Check if MarketService.get_all was called once
+        # Check if MarketService.aget_all was called once
         mock_get_all_markets.assert_called_once()
 
-        # Check if TickerService.get_one_by_market_id was not called
+        # Check if TickerService.aget_one_by_market_id was not called
         mock_get_one_ticker_by_market_id.assert_not_called()
 
         # Validate the response for internal server error
@@ -202,10 +224,10 @@ class TestCompareAlertWithAllMarkets:
         assert "detail" in error_response
         assert (error_response["detail"] == "An unexpected error occurred: HTTPError: Internal Server Error")
 
-    @patch.object(MarketService, "get_all", return_value=SAMPLE_MARKETS_DATA)
+    @patch.object(MarketService, "aget_all", return_value=SAMPLE_MARKETS_DATA)
     @patch.object(
         TickerService,
-        "get_one_by_market_id",
+        "aget_one_by_market_id",
         side_effect=_raise_http_error(detail="Internal Server Error", status_code=500),
     )
     @patch.dict(
@@ -217,10 +239,10 @@ class TestCompareAlertWithAllMarkets:
         # Making the request
         response = client.get(f"{settings.API_URL_PREFIX}/alerts")
 
-        # Check if MarketService.get_all was called once
+        # Check if MarketService.aget_all was called once
         mock_get_all_markets.assert_called_once()
 
-        # Check if TickerService.get_one_by_market_id was called at least once
+        # Check if TickerService.aget_one_by_market_id was called at least once
         mock_get_one_ticker_by_market_id.assert_called()
 
         # Validate the response for internal server error
@@ -229,10 +251,37 @@ class TestCompareAlertWithAllMarkets:
         assert "detail" in error_response
         assert (error_response["detail"] == "An unexpected error occurred: HTTPError: Internal Server Error")
 
+class TestCompareAlertWithAllMarketsFromBulkTickers:
+    @patch.object(MarketService, "aget_all", return_value=SAMPLE_MARKETS_DATA)
+    @patch.object(TickerService, "aget_one_by_market_id")
+    @patch.object(
+        TickerService, "_aget_bulk", return_value=SAMPLE_ALL_TICKERS_DATA["tickers"]
+    )
+    @patch.dict(
+        "app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP,
+    )
+    def test_compare_alert_with_all_markets_uses_one_bulk_ticker_request(
+        self, mock_get_bulk, mock_get_one_ticker_by_market_id, mock_get_all_markets
+    ):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/alerts")
+
+        # Check the snapshot came from a single bulk request
+        mock_get_bulk.assert_called_once()
+        mock_get_one_ticker_by_market_id.assert_not_called()
+
+        # Validate the response
+        assert response.status_code == 200
+        alerts = response.json()
+        assert list(alerts) == ["market_1", "market_2", "market_3"]
+        assert alerts["market_3"]["is_greater"] == True
+
 class TestCompareAlertWithOneMarket:
 
     @patch.object(
-        TickerService, "get_one_by_market_id", side_effect=_get_tickers_data_set
+        TickerService,
+        "aget_one_with_age_by_market_id",
+        side_effect=_lookup_tickers_data_set,
     )
     @patch.dict(
         "app.api.v1.alerts.spread_alert",  SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP,
@@ -244,7 +293,7 @@ class TestCompareAlertWithOneMarket:
         # Making the request
         market_id = "market_1"
         response = client.get(f"{settings.API_URL_PREFIX}/alerts/{market_id}")
-        # Check if TickerService.get_one_by_market_id was called once
+        # Check if TickerService.aget_one_with_age_by_market_id was called once
         mock_get_one_ticker_by_market_id.assert_called_once_with(market_id=market_id)
 
         # Validate the response
@@ -259,7 +308,9 @@ class TestCompareAlertWithOneMarket:
         assert alert["message"] == "Spread is for market market_1 is EQUAL to the alert value. Spread Value: 100.00, Alert Value: 100.00"
 
     @patch.object(
-        TickerService, "get_one_by_market_id", side_effect=_get_tickers_data_set
+        TickerService,
+        "aget_one_with_age_by_market_id",
+        side_effect=_lookup_tickers_data_set,
     )
     @patch.dict(
         "app.api.v1.alerts.spread_alert",  SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP,
@@ -271,7 +322,7 @@ class TestCompareAlertWithOneMarket:
         # Making the request
         market_id = "market_2"
         response = client.get(f"{settings.API_URL_PREFIX}/alerts/{market_id}")
-        # Check if TickerService.get_one_by_market_id was called once
+        # Check if TickerService.aget_one_with_age_by_market_id was called once
         mock_get_one_ticker_by_market_id.assert_called_once_with(market_id=market_id)
 
         # Validate the response
@@ -287,7 +338,9 @@ class TestCompareAlertWithOneMarket:
 
 
     @patch.object(
-        TickerService, "get_one_by_market_id", side_effect=_get_tickers_data_set
+        TickerService,
+        "aget_one_with_age_by_market_id",
+        side_effect=_lookup_tickers_data_set,
     )
     @patch.dict(
         "app.api.v1.alerts.spread_alert",  SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP,
@@ -299,7 +352,7 @@ class TestCompareAlertWithOneMarket:
         # Making the request
         market_id = "market_3"
         response = client.get(f"{settings.API_URL_PREFIX}/alerts/{market_id}")
-        # Check if TickerService.get_one_by_market_id was called once
+        # Check if TickerService.aget_one_with_age_by_market_id was called once
         mock_get_one_ticker_by_market_id.assert_called_once_with(market_id=market_id)
 
         # Validate the response
@@ -315,7 +368,27 @@ class TestCompareAlertWithOneMarket:
 
     @patch.object(
         TickerService,
-        "get_one_by_market_id",
+        "aget_one_with_age_by_market_id",
+        return_value=CacheLookup(SAMPLE_TICKERS_DATA_SET["market_1"], 0.2, False),
+    )
+    @patch.dict(
+        "app.api.v1.alerts.spread_alert",  SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP,
+    )
+    def test_compare_alert_with_one_market_sets_ticker_age_headers(
+        self, mock_get_one_ticker_by_market_id
+    ):
+        # Making the request
+        market_id = "market_1"
+        response = client.get(f"{settings.API_URL_PREFIX}/alerts/{market_id}")
+
+        # Validate the response headers
+        assert response.status_code == 200
+        assert response.headers["X-Data-Age"] == "0"
+        assert response.headers["X-Ticker-Stale"] == "false"
+
+    @patch.object(
+        TickerService,
+        "aget_one_with_age_by_market_id",
         side_effect=_raise_http_error(detail="Market not found", status_code=404),
     )
     @patch.dict(
@@ -328,7 +401,7 @@ class TestCompareAlertWithOneMarket:
         market_id = "market_1"
         response = client.get(f"{settings.API_URL_PREFIX}/alerts/{market_id}")
 
-        # Check TickerService.get_one_by_market_id was not called
+        # Check TickerService.aget_one_with_age_by_market_id was not called
         mock_get_one_ticker_by_market_id.assert_not_called()
 
         # Validate the response for not found error
@@ -339,7 +412,7 @@ class TestCompareAlertWithOneMarket:
 
     @patch.object(
         TickerService,
-        "get_one_by_market_id",
+        "aget_one_with_age_by_market_id",
         side_effect=_raise_http_error(detail="Market not found", status_code=404),
     )
     @patch.dict(
@@ -352,7 +425,7 @@ class TestCompareAlertWithOneMarket:
         market_id = "unkownw_market"
         response = client.get(f"{settings.API_URL_PREFIX}/alerts/{market_id}")
 
-        # Check TickerService.get_one_by_market_id was not called
+        # Check TickerService.aget_one_with_age_by_market_id was not called
         mock_get_one_ticker_by_market_id.assert_called_with(market_id=market_id)
 
         # Validate the response for not found error
@@ -372,7 +445,7 @@ class TestCompareAlertWithOneMarket:
     )
     @patch.object(
         TickerService,
-        "get_one_by_market_id")
+        "aget_one_with_age_by_market_id")
     @patch.dict(
         "app.api.v1.alerts.spread_alert",  SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP,
     )
@@ -380,12 +453,14 @@ class TestCompareAlertWithOneMarket:
         self, mock_get_one_ticker_by_market_id, market_id, malformed_ticker
     ):
         # Set the side effect for the mock_get_one_ticker_by_market_id
-        mock_get_one_ticker_by_market_id.return_value = malformed_ticker
+        mock_get_one_ticker_by_market_id.return_value = CacheLookup(
+            malformed_ticker, None, False
+        )
 
         # Making the request
         response = client.get(f"{settings.API_URL_PREFIX}/alerts/{market_id}")
 
-        # Check TickerService.get_one_by_market_id was called once with specific argument
+        # Check TickerService.aget_one_with_age_by_market_id was called once with specific argument
         mock_get_one_ticker_by_market_id.assert_called_once_with(market_id=market_id)
 
         # Validate the response for unprocessable entity
@@ -395,7 +470,7 @@ class TestCompareAlertWithOneMarket:
 
     @patch.object(
         TickerService,
-        "get_one_by_market_id",
+        "aget_one_with_age_by_market_id",
         side_effect=_raise_http_error(detail="Internal Server Error", status_code=500),
     )
     @patch.dict(
@@ -408,7 +483,7 @@ class TestCompareAlertWithOneMarket:
         market_id = "market_1"
         response = client.get(f"{settings.API_URL_PREFIX}/alerts/{market_id}")
 
-        # Check TickerService.get_one_by_market_id was called once
+        # Check TickerService.aget_one_with_age_by_market_id was called once
         mock_get_one_ticker_by_market_id.assert_called_once_with(market_id=market_id)
 
         # Validate the response for internal server error
@@ -439,6 +514,63 @@ class TestSetSpreadAlert:
         assert message == {"message": "Alert set successfully. Alert value: 100.00"}
         assert spread_alert["value"] == 100.00
 
+    @patch.dict("app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_EMPTY)
+    @patch.object(settings, "WEBHOOK_ALLOWED_HOSTS", ["hooks.test"])
+    def test_set_spread_alert_with_webhook_url_succeeds(self):
+        # Making the request
+        response = client.post(
+            f"{settings.API_URL_PREFIX}/alerts",
+            json={"value": "100.00", "webhook_url": "http://hooks.test/alerts"},
+        )
+
+        # Validate the response and later status of spread_alert
+        assert response.status_code == 200
+        assert spread_alert["value"] == 100.00
+        assert spread_alert["webhook_url"] == "http://hooks.test/alerts"
+
+    @patch.dict("app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_EMPTY)
+    @patch(
+        "app.services.webhooks.socket.getaddrinfo",
+        return_value=[(2, 1, 6, "", ("169.254.169.254", 443))],
+    )
+    def test_set_spread_alert_fails_with_non_public_webhook_url(self, _):
+        # Making the request
+        response = client.post(
+            f"{settings.API_URL_PREFIX}/alerts",
+            json={"value": "100.00", "webhook_url": "https://metadata.test/latest"},
+        )
+
+        # Validate the response and later status of spread_alert
+        assert response.status_code == 422
+        assert response.json()["detail"] == (
+            "Webhook host 'metadata.test' resolves to a non-public address"
+        )
+        assert spread_alert["value"] == None
+
+    @patch.dict("app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_EMPTY)
+    def test_set_spread_alert_fails_with_http_webhook_url(self):
+        # Making the request
+        response = client.post(
+            f"{settings.API_URL_PREFIX}/alerts",
+            json={"value": "100.00", "webhook_url": "http://hooks.test/alerts"},
+        )
+
+        # Validate the response and later status of spread_alert
+        assert response.status_code == 422
+        assert spread_alert["value"] == None
+
+    @patch.dict("app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_EMPTY)
+    def test_set_spread_alert_fails_with_invalid_webhook_url(self):
+        # Making the request
+        response = client.post(
+            f"{settings.API_URL_PREFIX}/alerts",
+            json={"value": "100.00", "webhook_url": "not a url"},
+        )
+
+        # Validate the response and later status of spread_alert
+        assert response.status_code == 422
+        assert spread_alert["value"] == None
+
     @patch.dict(
         "app.api.v1.alerts.spread_alert",  SAMPLE_SPREAD_ALERT_EMPTY
     )
@@ -474,3 +606,385 @@ class TestSetSpreadAlert:
             # Validate the response and later status of spread_alert
             assert response.status_code == 422
             assert spread_alert["value"] == None
+
+
+class TestAlertsFromTickerBook:
+    @pytest.fixture(autouse=True)
+    def ready_ticker_book(self):
+        # Simulate a running poller that already filled the ticker book
+        ticker_book = TickerBook(max_age=10)
+        ticker_book.update(SAMPLE_ALL_TICKERS_DATA["tickers"])
+        with patch.object(buda_api, "ticker_book", ticker_book):
+            yield
+
+    @patch.object(MarketService, "aget_all")
+    @patch.object(TickerService, "aget_all")
+    @patch.dict(
+        "app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP,
+    )
+    def test_compare_alert_with_all_markets_reads_ticker_book(
+        self, mock_get_all_tickers, mock_get_all_markets
+    ):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/alerts")
+
+        # Check the BUDA API was not reached
+        mock_get_all_markets.assert_not_called()
+        mock_get_all_tickers.assert_not_called()
+
+        # Validate the response
+        assert response.status_code == 200
+        assert list(response.json()) == ["market_1", "market_2", "market_3"]
+
+    @patch.object(TickerService, "aget_one_with_age_by_market_id")
+    @patch.dict(
+        "app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP,
+    )
+    def test_compare_alert_with_one_market_reads_ticker_book(
+        self, mock_get_one_ticker_by_market_id
+    ):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/alerts/market_3")
+
+        # Check the BUDA API was not reached
+        mock_get_one_ticker_by_market_id.assert_not_called()
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.json()["is_greater"] == True
+
+
+class TestAlertsConditionalRequests:
+    @pytest.fixture(autouse=True)
+    def ready_ticker_book(self):
+        # Simulate a running poller that already filled the ticker book
+        ticker_book = TickerBook(max_age=10)
+        ticker_book.update(SAMPLE_ALL_TICKERS_DATA["tickers"])
+        with patch.object(buda_api, "ticker_book", ticker_book):
+            yield
+
+    @patch.dict(
+        "app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP,
+    )
+    def test_compare_alert_with_all_markets_not_modified(self):
+        etag = client.get(f"{settings.API_URL_PREFIX}/alerts").headers["ETag"]
+
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/alerts", headers={"If-None-Match": etag}
+        )
+
+        # Validate the response
+        assert response.status_code == 304
+        assert response.headers["Cache-Control"] == (
+            f"public, max-age={settings.SPREAD_RESPONSES_MAX_AGE}"
+        )
+
+    def test_compare_alert_with_one_market_modified_after_the_alert_changes(self):
+        with patch.dict("app.api.v1.alerts.spread_alert", {"value": 100.0}):
+            etag = client.get(f"{settings.API_URL_PREFIX}/alerts/market_3").headers[
+                "ETag"
+            ]
+
+        # Making the request
+        with patch.dict("app.api.v1.alerts.spread_alert", {"value": 200.0}):
+            response = client.get(
+                f"{settings.API_URL_PREFIX}/alerts/market_3",
+                headers={"If-None-Match": etag},
+            )
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_get_triggered_alert_rules_modified_after_the_rules_change(self):
+        alert_index = AlertIndex()
+        with patch("app.api.v1.alerts.alert_index", alert_index):
+            etag = client.get(
+                f"{settings.API_URL_PREFIX}/alerts/market_1/rules/triggered"
+            ).headers["ETag"]
+            alert_index.add("market_1", "wide", "above", 50)
+
+            # Making the request
+            response = client.get(
+                f"{settings.API_URL_PREFIX}/alerts/market_1/rules/triggered",
+                headers={"If-None-Match": etag},
+            )
+
+        # Validate the response
+        assert response.status_code == 200
+        assert [rule["name"] for rule in response.json()["triggered"]] == ["wide"]
+
+
+class TestAlertRules:
+    @pytest.fixture(autouse=True)
+    def alert_index(self, tmp_path):
+        alert_index = AlertIndex()
+        alert_store = AlertStore(
+            repository=AlertRepository(path=str(tmp_path / "alerts.db")),
+            index=alert_index,
+        )
+        with patch("app.api.v1.alerts.alert_index", alert_index), patch(
+            "app.api.v1.alerts.alert_store", alert_store
+        ):
+            yield alert_index
+        alert_store.repository.close()
+
+    def test_set_alert_rule_succeeds(self, alert_index):
+        # Making the request
+        response = client.put(
+            f"{settings.API_URL_PREFIX}/alerts/market_1/rules/wide",
+            json={"direction": "above", "threshold": 120},
+        )
+
+        # Validate the response and the stored rule
+        assert response.status_code == 200
+        assert response.json() == {
+            "market_id": "MARKET_1",
+            "name": "wide",
+            "direction": "above",
+            "threshold": 120.0,
+        }
+        assert alert_index.get("market_1", "wide").threshold == 120.0
+
+    def test_set_alert_rule_fails_with_invalid_direction(self, alert_index):
+        # Making the request
+        response = client.put(
+            f"{settings.API_URL_PREFIX}/alerts/market_1/rules/wide",
+            json={"direction": "sideways", "threshold": 120},
+        )
+
+        # Validate the response for unprocessable entity
+        assert response.status_code == 422
+        assert len(alert_index) == 0
+
+    def test_get_alert_rules_succeeds(self, alert_index):
+        alert_index.add("market_1", "wide", "above", 120)
+        alert_index.add("market_1", "tight", "below", 20)
+
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/alerts/market_1/rules")
+
+        # Validate the response
+        assert response.status_code == 200
+        assert [rule["name"] for rule in response.json()] == ["wide", "tight"]
+
+    def test_delete_alert_rule_succeeds(self, alert_index):
+        client.put(
+            f"{settings.API_URL_PREFIX}/alerts/market_1/rules/wide",
+            json={"direction": "above", "threshold": 120},
+        )
+
+        # Making the request
+        response = client.delete(
+            f"{settings.API_URL_PREFIX}/alerts/market_1/rules/wide"
+        )
+
+        # Validate the response and the rule was removed
+        assert response.status_code == 200
+        assert response.json()["message"] == "Alert rule 'wide' deleted successfully."
+        assert len(alert_index) == 0
+
+    def test_delete_alert_rule_fails_with_rule_not_found_error(self):
+        # Making the request
+        response = client.delete(
+            f"{settings.API_URL_PREFIX}/alerts/market_1/rules/wide"
+        )
+
+        # Validate the response for not found error
+        assert response.status_code == 404
+        assert response.json()["detail"] == (
+            "Alert rule 'wide' not found for market 'market_1'"
+        )
+
+    @patch.object(
+        TickerService,
+        "aget_one_with_age_by_market_id",
+        side_effect=_lookup_tickers_data_set,
+    )
+    def test_get_triggered_alert_rules_succeeds(
+        self, mock_get_one_ticker_by_market_id, alert_index
+    ):
+        alert_index.add("market_3", "wide", "above", 120)
+        alert_index.add("market_3", "very_wide", "above", 200)
+        alert_index.add("market_3", "tight", "below", 20)
+
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/alerts/market_3/rules/triggered"
+        )
+
+        # Validate only the rule crossed by the 150 spread is triggered
+        assert response.status_code == 200
+        triggered_rules = response.json()
+        assert triggered_rules["spread_value"] == "150.00"
+        assert [rule["name"] for rule in triggered_rules["triggered"]] == ["wide"]
+
+    @patch.object(
+        TickerService,
+        "aget_one_with_age_by_market_id",
+        side_effect=_raise_http_error(detail="Market not found", status_code=404),
+    )
+    def test_get_triggered_alert_rules_fails_with_market_not_found_error(
+        self, mock_get_one_ticker_by_market_id
+    ):
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/alerts/unknown_market/rules/triggered"
+        )
+
+        # Validate the response for not found error
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Market with id 'unknown_market' not found"
+
+
+class TestGetAlertEvents:
+    @pytest.fixture(autouse=True)
+    def alert_event_log(self):
+        alert_event_log = AlertEventLog(max_events=2)
+        with patch("app.api.v1.alerts.alert_event_log", alert_event_log):
+            yield alert_event_log
+
+    @staticmethod
+    def _append_event(alert_event_log, is_triggered):
+        alert_event_log.append(
+            market_id="MARKET_1",
+            name="wide",
+            direction="above",
+            threshold=120.0,
+            previous_spread_value=100.0,
+            spread_value=150.0,
+            is_triggered=is_triggered,
+            created_at=1700000000.0,
+        )
+
+    def test_get_alert_events_succeeds(self, alert_event_log):
+        self._append_event(alert_event_log, is_triggered=True)
+        self._append_event(alert_event_log, is_triggered=False)
+
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/alerts/events", params={"after": 1}
+        )
+
+        # Validate only the events after the cursor are returned
+        assert response.status_code == 200
+        events = response.json()
+        assert [event["id"] for event in events["events"]] == [2]
+        assert events["events"][0]["is_triggered"] == False
+        assert events["last_id"] == 2
+        assert events["missed_events"] == False
+
+    def test_get_alert_events_without_new_events(self, alert_event_log):
+        self._append_event(alert_event_log, is_triggered=True)
+
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/alerts/events", params={"after": 1}
+        )
+
+        # Validate the cursor is kept
+        assert response.status_code == 200
+        assert response.json() == {"events": [], "last_id": 1, "missed_events": False}
+
+    def test_get_alert_events_reports_dropped_events(self, alert_event_log):
+        for is_triggered in [True, False, True]:
+            self._append_event(alert_event_log, is_triggered=is_triggered)
+
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/alerts/events")
+
+        # Validate the first event was dropped from the log
+        assert response.status_code == 200
+        events = response.json()
+        assert [event["id"] for event in events["events"]] == [2, 3]
+        assert events["missed_events"] == True
+
+    def test_get_alert_events_fails_with_invalid_cursor(self):
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/alerts/events", params={"after": -1}
+        )
+
+        # Validate the response for unprocessable entity
+        assert response.status_code == 422
+
+
+class TestGetWebhookDeadLetters:
+    @pytest.fixture(autouse=True)
+    def admin_token(self):
+        with patch.object(settings, "PROFILING_ADMIN_TOKEN", "secret"):
+            yield
+
+    def test_get_webhook_dead_letters_succeeds(self):
+        dead_letter = DeadLetter(
+            url="http://hooks.test/alerts",
+            payloads=[{"market_id": "market_1"}],
+            error="HTTP 500",
+            attempts=5,
+            failed_at=1.0,
+        )
+        with patch(
+            "app.api.v1.alerts.webhook_dispatcher",
+            MagicMock(dead_letters=[dead_letter]),
+        ):
+            # Making the request
+            response = client.get(
+                f"{settings.API_URL_PREFIX}/alerts/webhooks/dead-letters",
+                headers={"X-Profile-Token": "secret"},
+            )
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.json() == [
+            {
+                "url": "http://hooks.test/alerts",
+                "payloads": [{"market_id": "market_1"}],
+                "error": "HTTP 500",
+                "attempts": 5,
+                "failed_at": 1.0,
+            }
+        ]
+
+    def test_get_webhook_dead_letters_fails_without_admin_token(self):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/alerts/webhooks/dead-letters")
+
+        # Validate the response for forbidden
+        assert response.status_code == 403
+
+
+class TestAlertsWhileUpstreamIsUnavailable:
+    @patch.object(
+        MarketService,
+        "aget_all",
+        side_effect=CircuitOpenError("circuit open", retry_after=0.5),
+    )
+    @patch.dict("app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP)
+    def test_compare_alert_with_all_markets_fails_with_service_unavailable(
+        self, mock_get_all_markets
+    ):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/alerts")
+
+        # Validate the response
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
+    @patch.object(
+        TickerService,
+        "aget_one_with_age_by_market_id",
+        side_effect=CircuitOpenError("circuit open", retry_after=0.5),
+    )
+    @patch.dict("app.api.v1.alerts.spread_alert", SAMPLE_SPREAD_ALERT_WITH_VALUE_SETUP)
+    def test_compare_alert_with_one_market_fails_with_service_unavailable(
+        self, mock_get_one_ticker_by_market_id
+    ):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/alerts/market_1")
+
+        # Validate the response
+        assert response.status_code == 503
+        assert response.json() == {
+            "detail": "The BUDA API is unavailable, try again later"
+        }
@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.profiles import ProfileStore, StoredProfile
+
+from config import settings
+
+client = TestClient(app)
+
+SAMPLE_PROFILE = StoredProfile(
+    id="abc123",
+    method="GET",
+    path="/api/v1/alerts",
+    status=200,
+    started_at=1000.0,
+    duration=0.25,
+    phases={"upstream": {"seconds": 0.2, "calls": 3}},
+)
+
+
+@pytest.fixture(autouse=True)
+def profile_store():
+    profile_store = ProfileStore(max_profiles=10)
+    profile_store.add(SAMPLE_PROFILE)
+    with patch("app.api.v1.profiles.profile_store", profile_store), patch.object(
+        settings, "PROFILING_ADMIN_TOKEN", "secret"
+    ):
+        yield profile_store
+
+
+class TestGetProfiles:
+    def test_get_profiles_succeeds(self):
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/profiles", headers={"X-Profile-Token": "secret"}
+        )
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.json() == [
+            {
+                "id": "abc123",
+                "method": "GET",
+                "path": "/api/v1/alerts",
+                "status": 200,
+                "started_at": 1000.0,
+                "duration": 0.25,
+                "phases": {"upstream": {"seconds": 0.2, "calls": 3}},
+            }
+        ]
+
+    def test_get_profiles_fails_without_admin_token(self):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/profiles")
+
+        # Validate the response for forbidden
+        assert response.status_code == 403
+
+    def test_get_profiles_fails_when_profiling_is_not_configured(self):
+        with patch.object(settings, "PROFILING_ADMIN_TOKEN", None):
+            # Making the request
+            response = client.get(
+                f"{settings.API_URL_PREFIX}/profiles",
+                headers={"X-Profile-Token": "secret"},
+            )
+
+        # Validate the response for forbidden
+        assert response.status_code == 403
+
+
+class TestGetProfile:
+    def test_get_profile_downloads_profile(self):
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/profiles/abc123",
+            headers={"X-Profile-Token": "secret"},
+        )
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.json()["id"] == "abc123"
+        assert response.headers["Content-Disposition"] == (
+            'attachment; filename="profile-abc123.json"'
+        )
+
+    def test_get_profile_fails_with_unknown_id(self):
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/profiles/unknown",
+            headers={"X-Profile-Token": "secret"},
+        )
+
+        # Validate the response for not found
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Profile 'unknown' not found"}
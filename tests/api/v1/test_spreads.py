@@ -5,13 +5,22 @@ from fastapi.testclient import TestClient
 from requests import HTTPError
 
 from app.main import app
+from app.services import buda_api
+from app.services.cache import CacheLookup
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.rate_limiter import RateLimitExceeded
 from app.services.markets import MarketService
+from app.services.spread_candles import SpreadCandles
+from app.services.spread_history import SpreadHistory
+from app.services.spread_stream import SpreadBroadcaster
+from app.services.ticker_book import TickerBook
 from app.services.tickers import TickerService
 
 from config import settings
 from config import (
     SAMPLE_MARKETS_DATA,
     SAMPLE_MARKETS_DATA_MISSING_MARKET_ID,
+    SAMPLE_ALL_TICKERS_DATA,
     SAMPLE_TICKER_DATA_MARKET_1,
     SAMPLE_TICKER_DATA_MARKET_1_INVALID_DATA,
     SAMPLE_TICKER_DATA_MARKET_2_MISSING_FIELD,
@@ -26,22 +35,26 @@ client = TestClient(app)
 
 
 # Functions to return different ticker data based on market ID
-def _get_tickers_data_set(market_id: str):
+def _get_tickers_data_set(market_id: str, use_cache: bool = True):
     if market_id not in SAMPLE_TICKERS_DATA_SET:
         response = MagicMock(status_code=404)
         raise HTTPError("Market not found", response=response)
     return SAMPLE_TICKERS_DATA_SET[market_id]
 
-def _get_tickers_data_set_with_invalid_value_sample(market_id: str):
+def _get_tickers_data_set_with_invalid_value_sample(market_id: str, use_cache: bool = True):
     return SAMPLE_TICKERS_DATA_SET_INVALID_VALUE[market_id]
 
-def _get_tickers_data_set_with_missing_field_sample(market_id: str):
+def _get_tickers_data_set_with_missing_field_sample(market_id: str, use_cache: bool = True):
     return SAMPLE_TICKERS_DATA_SET_MISSING_FIELD[market_id]
 
-def _get_tickers_data_set_with_invalid_value_and_missing_field_sample(market_id: str):
+def _get_tickers_data_set_with_invalid_value_and_missing_field_sample(market_id: str, use_cache: bool = True):
     return SAMPLE_TICKERS_DATA_SET_INVALID_VALUE_AND_MISSING_FIELD[market_id]
 
 
+def _lookup_tickers_data_set(market_id: str):
+    return CacheLookup(_get_tickers_data_set(market_id), None, False)
+
+
 # Aux function to raise an HTTP error
 def _raise_http_error(detail: str, status_code: int):
     def error_raiser(*args, **kwargs):
@@ -52,9 +65,19 @@ def _raise_http_error(detail: str, status_code: int):
 
 
 class TestGetAllSpreads:
-    @patch.object(MarketService, "get_all", return_value=SAMPLE_MARKETS_DATA)
+    @pytest.fixture(autouse=True)
+    def bulk_tickers_unavailable(self):
+        # Force the per-market fallback so tickers come from aget_one_by_market_id
+        with patch.object(
+            TickerService,
+            "_aget_bulk",
+            side_effect=_raise_http_error(detail="Not Found", status_code=404),
+        ):
+            yield
+
+    @patch.object(MarketService, "aget_all", return_value=SAMPLE_MARKETS_DATA)
     @patch.object(
-        TickerService, "get_one_by_market_id", side_effect=_get_tickers_data_set
+        TickerService, "aget_one_by_market_id", side_effect=_get_tickers_data_set
     )
     def test_get_spreads_from_all_markets_succeeds(
         self,
@@ -67,10 +90,10 @@ class TestGetAllSpreads:
         # Making the request
         response = client.get(f"{settings.API_URL_PREFIX}/spreads")
 
-        # Check if MarketService.get_all was called once
+        # Check if MarketService.aget_all was called once
         mock_get_all_markets.assert_called_once()
 
-        # Check if TickerService.get_one_by_market_id was called for each market
+        # Check if TickerService.aget_one_by_market_id was called for each market
         assert mock_get_one_ticker_by_market_id.call_count == number_of_markets
 
         # Validate the response
@@ -87,11 +110,11 @@ class TestGetAllSpreads:
 
     @patch.object(
         MarketService,
-        "get_all",
+        "aget_all",
         return_value=SAMPLE_MARKETS_DATA_MISSING_MARKET_ID,
     )
     @patch.object(
-        TickerService, "get_one_by_market_id", side_effect=_get_tickers_data_set
+        TickerService, "aget_one_by_market_id", side_effect=_get_tickers_data_set
     )
     def test_get_spreads_from_all_markets_fails_with_invalid_market_data(
         self, mock_get_one_ticker_by_market_id, mock_get_all_markets
@@ -100,9 +123,9 @@ class TestGetAllSpreads:
         # Making the request
         response = client.get(f"{settings.API_URL_PREFIX}/spreads")
 
-        # Check if MarketService.get_all was called once
+        # Check if MarketService.aget_all was called once
         mock_get_all_markets.assert_called_once()
-        # Check if TickerService.get_one_by_market_id was called at least once
+        # Check if TickerService.aget_one_by_market_id was called at least once
         mock_get_one_ticker_by_market_id.assert_called()
 
         # Validate the response for not found error
@@ -119,8 +142,8 @@ class TestGetAllSpreads:
             _get_tickers_data_set_with_invalid_value_and_missing_field_sample,
         ],
     )
-    @patch.object(MarketService, "get_all", return_value=SAMPLE_MARKETS_DATA)
-    @patch.object(TickerService, "get_one_by_market_id")
+    @patch.object(MarketService, "aget_all", return_value=SAMPLE_MARKETS_DATA)
+    @patch.object(TickerService, "aget_one_by_market_id")
     def test_get_spreads_from_all_markets_fails_with_invalid_ticker_data(
         self, mock_get_one_ticker_by_market_id, mock_get_all_markets, side_effect
     ):
@@ -130,9 +153,9 @@ class TestGetAllSpreads:
         # Making the request
         response = client.get(f"{settings.API_URL_PREFIX}/spreads")
 
-        # Check if MarketService.get_all was called once
+        # Check if MarketService.aget_all was called once
         mock_get_all_markets.assert_called_once()
-        # Check TickerService.get_one_by_market_id was called at least once
+        # Check TickerService.aget_one_by_market_id was called at least once
         mock_get_one_ticker_by_market_id.assert_called()
 
         # Validate the response for unprocessable entity error
@@ -142,19 +165,19 @@ class TestGetAllSpreads:
 
     @patch.object(
         MarketService,
-        "get_all",
+        "aget_all",
         side_effect=_raise_http_error(detail="Internal Server Error", status_code=500),
     )
-    @patch.object(TickerService, "get_one_by_market_id")
+    @patch.object(TickerService, "aget_one_by_market_id")
     def test_get_spreads_from_all_markets_fails_with_internal_server_error_from_markets_service(
         self, mock_get_one_ticker_by_market_id, mock_get_all_markets
     ):
         # Making the request
         response = client.get(f"{settings.API_URL_PREFIX}/spreads")
 
-        # Check if MarketService.get_all was called once
+        # Check if MarketService.aget_all was called once
         mock_get_all_markets.assert_called_once()
-        # Check if TickerService.get_one_by_market_id was not called
+        # Check if TickerService.aget_one_by_market_id was not called
         mock_get_one_ticker_by_market_id.assert_not_called()
 
         # Validate the response for internal server error
@@ -166,10 +189,10 @@ class TestGetAllSpreads:
             == "An unexpected error occurred: HTTPError: Internal Server Error"
         )
 
-    @patch.object(MarketService, "get_all", return_value=SAMPLE_MARKETS_DATA)
+    @patch.object(MarketService, "aget_all", return_value=SAMPLE_MARKETS_DATA)
     @patch.object(
         TickerService,
-        "get_one_by_market_id",
+        "aget_one_by_market_id",
         side_effect=_raise_http_error(detail="Internal Server Error", status_code=500),
     )
     def test_get_all_spreads_fails_with_internal_server_error_from_tickers_service(
@@ -178,9 +201,9 @@ class TestGetAllSpreads:
         # Making the request
         response = client.get(f"{settings.API_URL_PREFIX}/spreads")
 
-        # Check MarketService.get_all was called once
+        # Check MarketService.aget_all was called once
         mock_get_all_markets.assert_called_once()
-        # Check TickerService.get_one_by_market_id was called at least once
+        # Check TickerService.aget_one_by_market_id was called at least once
         mock_get_one_ticker_by_market_id.assert_called()
 
         # Validate the response for internal server error
@@ -193,17 +216,201 @@ class TestGetAllSpreads:
         )
 
 
+class TestGetAllSpreadsFromBulkTickers:
+    @patch.object(MarketService, "aget_all", return_value=SAMPLE_MARKETS_DATA)
+    @patch.object(TickerService, "aget_one_by_market_id")
+    @patch.object(
+        TickerService, "_aget_bulk", return_value=SAMPLE_ALL_TICKERS_DATA["tickers"]
+    )
+    def test_get_spreads_from_all_markets_uses_one_bulk_ticker_request(
+        self, mock_get_bulk, mock_get_one_ticker_by_market_id, mock_get_all_markets
+    ):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/spreads")
+
+        # Check the snapshot came from a single bulk request
+        mock_get_bulk.assert_called_once()
+        mock_get_one_ticker_by_market_id.assert_not_called()
+
+        # Validate the response keeps the market order
+        assert response.status_code == 200
+        spreads = response.json()
+        assert [spread["market_id"] for spread in spreads] == [
+            "market_1",
+            "market_2",
+            "market_3",
+        ]
+        assert spreads[0]["value"] == "100.000000"
+
+    @patch.object(
+        MarketService,
+        "aget_all",
+        return_value=SAMPLE_MARKETS_DATA_MISSING_MARKET_ID,
+    )
+    @patch.object(
+        TickerService, "aget_one_by_market_id", side_effect=_get_tickers_data_set
+    )
+    @patch.object(
+        TickerService, "_aget_bulk", return_value=SAMPLE_ALL_TICKERS_DATA["tickers"]
+    )
+    def test_get_spreads_from_all_markets_fetches_markets_missing_from_bulk_tickers(
+        self, mock_get_bulk, mock_get_one_ticker_by_market_id, mock_get_all_markets
+    ):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/spreads")
+
+        # Check only the market missing from the bulk response was fetched
+        mock_get_one_ticker_by_market_id.assert_called_once_with(
+            market_id="unknown_market", use_cache=True
+        )
+
+        # Validate the response for not found error
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Market not found"
+
+
+class TestStreamSpreads:
+    @pytest.fixture
+    def broadcaster(self):
+        broadcaster = SpreadBroadcaster(max_subscribers=1)
+        broadcaster.publish(
+            [
+                {
+                    "market_id": "market_1",
+                    "min_ask": 1000.0,
+                    "max_bid": 900.0,
+                    "value": 100.0,
+                },
+                {
+                    "market_id": "market_2",
+                    "min_ask": 550.0,
+                    "max_bid": 500.0,
+                    "value": 50.0,
+                },
+            ]
+        )
+        subscribe = broadcaster.subscribe
+
+        def _subscribe_and_close(*args, **kwargs):
+            # End the stream once the seeded spreads are sent
+            subscription = subscribe(*args, **kwargs)
+            subscription.close()
+            return subscription
+
+        with patch("app.api.v1.spreads.spread_broadcaster", broadcaster):
+            with patch.object(
+                broadcaster, "subscribe", side_effect=_subscribe_and_close
+            ):
+                yield broadcaster
+
+    @pytest.fixture(autouse=True)
+    def poller(self):
+        # Keep the stream from reaching the BUDA API through the poller
+        with patch.object(buda_api.poller, "retain") as mock_retain:
+            with patch.object(buda_api.poller, "release") as mock_release:
+                yield mock_retain, mock_release
+
+    def test_stream_spreads_sends_spread_events(self, broadcaster):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/spreads/stream")
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text == (
+            'event: spread\ndata: {"market_id": "market_1", "value": "100.000000", '
+            '"max_bid": "900.000000", "min_ask": "1,000.000000"}\n\n'
+            'event: spread\ndata: {"market_id": "market_2", "value": "50.000000", '
+            '"max_bid": "500.000000", "min_ask": "550.000000"}\n\n'
+        )
+        assert broadcaster.subscriber_count == 0
+
+    def test_stream_spreads_runs_poller_while_connected(self, broadcaster, poller):
+        mock_retain, mock_release = poller
+
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/spreads/stream")
+
+        # Check the poller was retained for the stream and released at its end
+        assert response.status_code == 200
+        mock_retain.assert_called_once()
+        mock_release.assert_awaited_once()
+
+    def test_stream_spreads_skips_malformed_spreads(self, broadcaster):
+        # A spread with a non numeric price cannot be formatted
+        broadcaster.publish(
+            [{"market_id": "market_0", "min_ask": "n/a", "max_bid": 1.0, "value": 0.0}]
+        )
+
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/spreads/stream")
+
+        # Validate the other spreads are still sent
+        assert response.status_code == 200
+        assert response.text.count("event: spread") == 2
+
+    def test_stream_spreads_filters_markets(self, broadcaster):
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/spreads/stream", params={"markets": "MARKET_2"}
+        )
+
+        # Validate the response only carries the subscribed market
+        assert response.status_code == 200
+        assert "market_1" not in response.text
+        assert '"market_id": "market_2"' in response.text
+
+    def test_stream_spreads_fails_when_subscribers_are_full(self, broadcaster):
+        with patch.object(
+            broadcaster,
+            "subscribe",
+            side_effect=OverflowError("Too many spread stream subscribers"),
+        ):
+            response = client.get(f"{settings.API_URL_PREFIX}/spreads/stream")
+
+        # Validate the response for service unavailable error
+        assert response.status_code == 503
+        assert response.json()["detail"] == (
+            "Too many spread stream subscribers. Please try again later."
+        )
+
+    @patch.object(
+        TickerService,
+        "aget_one_with_age_by_market_id",
+        return_value=CacheLookup(SAMPLE_TICKER_DATA_MARKET_1, None, False),
+    )
+    def test_get_spread_by_market_id_publishes_spread(
+        self, mock_get_one_ticker_by_market_id
+    ):
+        with patch("app.api.v1.spreads.spread_feed") as mock_spread_feed:
+            client.get(f"{settings.API_URL_PREFIX}/spreads/market_1")
+
+        # Check the calculated spread was published for streaming
+        mock_spread_feed.publish.assert_called_once_with(
+            [
+                {
+                    "market_id": "market_1",
+                    "min_ask": 1000.0,
+                    "max_bid": 900.0,
+                    "value": 100.0,
+                }
+            ]
+        )
+
+
 class TestGetSpreadByMarketId:
     # Test for successful data retrieval
     @patch.object(
-        TickerService, "get_one_by_market_id", return_value=SAMPLE_TICKER_DATA_MARKET_1
+        TickerService,
+        "aget_one_with_age_by_market_id",
+        return_value=CacheLookup(SAMPLE_TICKER_DATA_MARKET_1, None, False),
     )
     def test_get_spread_by_market_id_succeeds(self, mock_get_one_ticker_by_market_id):
         # Making the request
         market_id = "market_1"
         response = client.get(f"{settings.API_URL_PREFIX}/spreads/{market_id}")
 
-        # Check TickerService.get_one_by_market_id was called once with specific argument
+        # Check TickerService.aget_one_with_age_by_market_id was called once with specific argument
         mock_get_one_ticker_by_market_id.assert_called_once_with(market_id=market_id)
 
         # Validate the response
@@ -216,7 +423,26 @@ class TestGetSpreadByMarketId:
 
     @patch.object(
         TickerService,
-        "get_one_by_market_id",
+        "aget_one_with_age_by_market_id",
+        return_value=CacheLookup(SAMPLE_TICKER_DATA_MARKET_1, 3.2, True),
+    )
+    def test_get_spread_by_market_id_sets_ticker_age_headers(
+        self, mock_get_one_ticker_by_market_id
+    ):
+        # Making the request
+        market_id = "market_1"
+        response = client.get(f"{settings.API_URL_PREFIX}/spreads/{market_id}")
+
+        # Validate the response headers
+        assert response.status_code == 200
+        assert response.headers["X-Data-Age"] == "3"
+        assert response.headers["X-Ticker-Stale"] == "true"
+        # Shared caches would count a standard Age header against max-age
+        assert "Age" not in response.headers
+
+    @patch.object(
+        TickerService,
+        "aget_one_with_age_by_market_id",
         side_effect=_raise_http_error(detail="Market not found", status_code=404),
     )
     def test_get_spread_by_market_id_fails_with_market_not_found_error(
@@ -226,7 +452,7 @@ class TestGetSpreadByMarketId:
         market_id = "unknown_market"
         response = client.get(f"{settings.API_URL_PREFIX}/spreads/{market_id}")
 
-        # Check TickerService.get_one_by_market_id was called once with specific argument
+        # Check TickerService.aget_one_with_age_by_market_id was called once with specific argument
         mock_get_one_ticker_by_market_id.assert_called_once_with(market_id=market_id)
 
         # Validate the response for not found error
@@ -243,17 +469,19 @@ class TestGetSpreadByMarketId:
             ("market_3", SAMPLE_TICKER_DATA_MARKET_3_INVALID_DATA_AND_MISSING_FIELD),
         ],
     )
-    @patch.object(TickerService, "get_one_by_market_id")
+    @patch.object(TickerService, "aget_one_with_age_by_market_id")
     def test_get_spread_by_market_id_fails_with_invalid_ticker_data(
         self, mock_get_one_ticker_by_market_id, market_id, malformed_ticker
     ):
         # Set the side effect for the mock_get_one_ticker_by_market_id
-        mock_get_one_ticker_by_market_id.return_value = malformed_ticker
+        mock_get_one_ticker_by_market_id.return_value = CacheLookup(
+            malformed_ticker, None, False
+        )
 
         # Making the request
         response = client.get(f"{settings.API_URL_PREFIX}/spreads/{market_id}")
 
-        # Check TickerService.get_one_by_market_id was called once with specific argument
+        # Check TickerService.aget_one_with_age_by_market_id was called once with specific argument
         mock_get_one_ticker_by_market_id.assert_called_once_with(market_id=market_id)
 
         # Validate the response for unprocessable entity
@@ -263,7 +491,7 @@ class TestGetSpreadByMarketId:
 
     @patch.object(
         TickerService,
-        "get_one_by_market_id",
+        "aget_one_with_age_by_market_id",
         side_effect=_raise_http_error(detail="Internal Server Error", status_code=500),
     )
     def test_get_spread_by_market_id_internal_server_error(
@@ -273,7 +501,7 @@ class TestGetSpreadByMarketId:
         market_id = "market_1"
         response = client.get(f"{settings.API_URL_PREFIX}/spreads/{market_id}")
 
-        # Check TickerService.get_one_by_market_id was called once with specific argument
+        # Check TickerService.aget_one_with_age_by_market_id was called once with specific argument
         mock_get_one_ticker_by_market_id.assert_called_once_with(market_id=market_id)
 
         # Validate the response for internal server error
@@ -284,3 +512,315 @@ class TestGetSpreadByMarketId:
             error_response["detail"]
             == "An unexpected error occurred: HTTPError: Internal Server Error"
         )
+
+
+class TestSpreadsFromTickerBook:
+    @pytest.fixture(autouse=True)
+    def ready_ticker_book(self):
+        # Simulate a running poller that already filled the ticker book
+        ticker_book = TickerBook(max_age=10)
+        ticker_book.update(SAMPLE_ALL_TICKERS_DATA["tickers"])
+        with patch.object(buda_api, "ticker_book", ticker_book):
+            yield
+
+    @patch.object(MarketService, "aget_all")
+    @patch.object(TickerService, "aget_all")
+    def test_get_spreads_from_all_markets_reads_ticker_book(
+        self, mock_get_all_tickers, mock_get_all_markets
+    ):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/spreads")
+
+        # Check the BUDA API was not reached
+        mock_get_all_markets.assert_not_called()
+        mock_get_all_tickers.assert_not_called()
+
+        # Validate the response
+        assert response.status_code == 200
+        spreads = response.json()
+        assert [spread["market_id"] for spread in spreads] == [
+            "market_1",
+            "market_2",
+            "market_3",
+        ]
+
+    @patch.object(TickerService, "aget_one_with_age_by_market_id")
+    def test_get_spread_by_market_id_reads_ticker_book(
+        self, mock_get_one_ticker_by_market_id
+    ):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/spreads/market_1")
+
+        # Check the BUDA API was not reached
+        mock_get_one_ticker_by_market_id.assert_not_called()
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.json()["value"] == "100.000000"
+        assert response.headers["X-Data-Age"] == "0"
+
+    @patch.object(
+        TickerService,
+        "aget_one_with_age_by_market_id",
+        side_effect=_raise_http_error(detail="Market not found", status_code=404),
+    )
+    def test_get_spread_by_market_id_missing_from_ticker_book_reaches_buda_api(
+        self, mock_get_one_ticker_by_market_id
+    ):
+        # Making the request
+        market_id = "unknown_market"
+        response = client.get(f"{settings.API_URL_PREFIX}/spreads/{market_id}")
+
+        # Check the BUDA API was reached for the unknown market
+        mock_get_one_ticker_by_market_id.assert_called_once_with(market_id=market_id)
+
+        # Validate the response for not found error
+        assert response.status_code == 404
+
+
+class TestSpreadsConditionalRequests:
+    @pytest.fixture(autouse=True)
+    def ready_ticker_book(self):
+        # Simulate a running poller that already filled the ticker book
+        ticker_book = TickerBook(max_age=10)
+        ticker_book.update(SAMPLE_ALL_TICKERS_DATA["tickers"])
+        with patch.object(buda_api, "ticker_book", ticker_book):
+            yield ticker_book
+
+    def test_get_all_spreads_sends_validators(self):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/spreads")
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.headers["ETag"].startswith('"')
+        assert response.headers["Cache-Control"] == (
+            f"public, max-age={settings.SPREAD_RESPONSES_MAX_AGE}"
+        )
+
+    def test_get_all_spreads_not_modified(self):
+        etag = client.get(f"{settings.API_URL_PREFIX}/spreads").headers["ETag"]
+
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/spreads", headers={"If-None-Match": etag}
+        )
+
+        # Validate the response
+        assert response.status_code == 304
+        assert response.content == b""
+        # Weak, as the test client accepts compressed responses
+        assert response.headers["ETag"] == f"W/{etag}"
+
+    def test_get_all_spreads_modified_after_the_tickers_change(
+        self, ready_ticker_book
+    ):
+        etag = client.get(f"{settings.API_URL_PREFIX}/spreads").headers["ETag"]
+        tickers = SAMPLE_ALL_TICKERS_DATA["tickers"]
+        ready_ticker_book.update(
+            [dict(tickers[0], min_ask=["250.0", "CLP"])] + tickers[1:]
+        )
+
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/spreads", headers={"If-None-Match": etag}
+        )
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert len(response.json()) == 3
+
+    def test_get_spread_by_market_id_not_modified(self):
+        etag = client.get(f"{settings.API_URL_PREFIX}/spreads/market_1").headers[
+            "ETag"
+        ]
+
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/spreads/market_1",
+            headers={"If-None-Match": etag},
+        )
+
+        # Validate the response
+        assert response.status_code == 304
+        assert response.headers["ETag"] == f"W/{etag}"
+        assert response.headers["X-Data-Age"] == "0"
+
+    def test_get_spread_by_market_id_modified_for_another_market(self):
+        etag = client.get(f"{settings.API_URL_PREFIX}/spreads/market_1").headers[
+            "ETag"
+        ]
+
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/spreads/market_2",
+            headers={"If-None-Match": etag},
+        )
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+
+class TestGetSpreadHistory:
+    @pytest.fixture(autouse=True)
+    def spread_history(self):
+        timestamps = iter([1000.0, 1001.0, 1002.0])
+        spread_history = SpreadHistory(capacity=10, clock=lambda: next(timestamps))
+        for value in [5.0, 6.0, 7.0]:
+            spread = {
+                "market_id": "MARKET_1",
+                "min_ask": value + 10,
+                "max_bid": 10.0,
+                "value": value,
+            }
+            spread_history.on_spreads([spread])
+        with patch("app.api.v1.spreads.spread_history", spread_history):
+            yield spread_history
+
+    def test_get_spread_history_succeeds(self):
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/spreads/market_1/history",
+            params={"from": 1001, "to": 1002},
+        )
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.json() == {
+            "market_id": "market_1",
+            "timestamp": [1001.0, 1002.0],
+            "min_ask": [16.0, 17.0],
+            "max_bid": [10.0, 10.0],
+            "value": [6.0, 7.0],
+        }
+
+    def test_get_spread_history_of_market_without_samples(self):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/spreads/market_2/history")
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.json()["value"] == []
+
+    def test_get_spread_history_fails_with_invalid_range(self):
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/spreads/market_1/history",
+            params={"from": "yesterday"},
+        )
+
+        # Validate the response for unprocessable entity
+        assert response.status_code == 422
+
+
+class TestGetSpreadCandles:
+    @pytest.fixture(autouse=True)
+    def spread_candles(self):
+        timestamps = iter([3600.0, 3630.0, 3660.0])
+        spread_candles = SpreadCandles(max_candles=10, clock=lambda: next(timestamps))
+        for value in [5.0, 9.0, 7.0]:
+            spread = {
+                "market_id": "MARKET_1",
+                "min_ask": value + 10,
+                "max_bid": 10.0,
+                "value": value,
+            }
+            spread_candles.on_spreads([spread])
+        with patch("app.api.v1.spreads.spread_candles", spread_candles):
+            yield spread_candles
+
+    def test_get_spread_candles_succeeds(self):
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/spreads/market_1/candles",
+            params={"interval": "5m"},
+        )
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.json() == {
+            "market_id": "market_1",
+            "interval": "5m",
+            "candles": [
+                {
+                    "start": 3600.0,
+                    "open": 5.0,
+                    "high": 9.0,
+                    "low": 5.0,
+                    "close": 7.0,
+                    "mean": 7.0,
+                    "count": 3,
+                }
+            ],
+        }
+
+    def test_get_spread_candles_with_limit(self):
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/spreads/market_1/candles",
+            params={"limit": 1},
+        )
+
+        # Validate the response
+        assert response.status_code == 200
+        assert [candle["start"] for candle in response.json()["candles"]] == [3660.0]
+
+    def test_get_spread_candles_fails_with_invalid_interval(self):
+        # Making the request
+        response = client.get(
+            f"{settings.API_URL_PREFIX}/spreads/market_1/candles",
+            params={"interval": "1d"},
+        )
+
+        # Validate the response for unprocessable entity
+        assert response.status_code == 422
+
+
+class TestSpreadsWhileUpstreamIsUnavailable:
+    @patch.object(
+        MarketService,
+        "aget_all",
+        side_effect=CircuitOpenError("circuit open", retry_after=4.2),
+    )
+    def test_get_all_spreads_fails_with_service_unavailable(self, mock_get_all_markets):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/spreads")
+
+        # Validate the response
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+        assert response.json() == {
+            "detail": "The BUDA API is unavailable, try again later"
+        }
+
+    @patch.object(
+        TickerService,
+        "aget_one_with_age_by_market_id",
+        side_effect=CircuitOpenError("circuit open", retry_after=4.2),
+    )
+    def test_get_spread_by_market_id_fails_with_service_unavailable(
+        self, mock_get_one_ticker_by_market_id
+    ):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/spreads/market_1")
+
+        # Validate the response
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+
+    @patch.object(
+        TickerService,
+        "aget_one_with_age_by_market_id",
+        side_effect=RateLimitExceeded("budget exhausted", retry_after=0.3),
+    )
+    def test_get_spread_by_market_id_fails_when_the_request_budget_is_exhausted(
+        self, mock_get_one_ticker_by_market_id
+    ):
+        # Making the request
+        response = client.get(f"{settings.API_URL_PREFIX}/spreads/market_1")
+
+        # Validate the response
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
@@ -0,0 +1,195 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.schemas import MarketResponse, TickerResponse
+from bench.buda_stand_in import BudaStandIn, StandInSettings, create_app
+
+
+def _client(**settings) -> TestClient:
+    return TestClient(create_app(StandInSettings(latency_ms=0, **settings)))
+
+
+class TestBudaStandInEndpoints:
+    def test_get_markets(self):
+        # Making the request
+        response = _client(market_count=60).get("/api/v2/markets")
+
+        # Validate the response
+        assert response.status_code == 200
+        markets = response.json()["markets"]
+        assert len(markets) == 60
+        assert len({market["id"] for market in markets}) == 60
+        for market in markets:
+            MarketResponse(**market)
+
+    def test_get_market_ignores_case(self):
+        # Making the request
+        response = _client().get("/api/v2/markets/btc-clp")
+
+        # Validate the response
+        assert response.status_code == 200
+        assert response.json()["market"]["id"] == "BTC-CLP"
+
+    def test_get_unknown_market(self):
+        client = _client()
+
+        # Making the requests
+        market_response = client.get("/api/v2/markets/foo-bar")
+        ticker_response = client.get("/api/v2/markets/foo-bar/ticker")
+
+        # Validate the responses
+        assert market_response.status_code == 404
+        assert ticker_response.status_code == 404
+
+    def test_get_ticker(self):
+        # Making the request
+        response = _client().get("/api/v2/markets/eth-clp/ticker")
+
+        # Validate the response
+        assert response.status_code == 200
+        ticker = TickerResponse(**response.json()["ticker"])
+        assert ticker.market_id == "ETH-CLP"
+        assert float(ticker.min_ask[0]) > float(ticker.max_bid[0])
+
+    def test_get_tickers(self):
+        # Making the request
+        response = _client(market_count=5).get("/api/v2/tickers")
+
+        # Validate the response
+        assert response.status_code == 200
+        tickers = response.json()["tickers"]
+        assert [ticker["market_id"] for ticker in tickers] == [
+            "BTC-CLP",
+            "ETH-CLP",
+            "LTC-CLP",
+            "BCH-CLP",
+            "USDC-CLP",
+        ]
+
+    def test_same_seed_serves_same_tickers(self):
+        # Making the requests
+        first = _client(seed=7).get("/api/v2/tickers").json()
+        second = _client(seed=7).get("/api/v2/tickers").json()
+        other = _client(seed=8).get("/api/v2/tickers").json()
+
+        # Validate the responses
+        assert first == second
+        assert first != other
+
+
+class TestBudaStandInFailures:
+    def test_rate_limited_responses(self):
+        # Making the request
+        response = _client(rate_limit_rate=1.0, retry_after_seconds=3).get(
+            "/api/v2/markets"
+        )
+
+        # Validate the response
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "3"
+
+    def test_error_responses(self):
+        # Making the request
+        response = _client(error_rate=1.0).get("/api/v2/markets")
+
+        # Validate the response
+        assert response.status_code == 500
+
+    def test_error_rate_is_respected(self):
+        client = _client(error_rate=0.3, seed=1)
+
+        # Making the requests
+        statuses = [client.get("/api/v2/markets").status_code for _ in range(200)]
+
+        # Validate the responses
+        assert 30 < statuses.count(500) < 90
+        assert statuses.count(500) + statuses.count(200) == 200
+
+    def test_stats_are_not_delayed_nor_failed(self):
+        client = _client(error_rate=1.0)
+
+        # Making the request
+        with patch("bench.buda_stand_in.asyncio.sleep") as mock_sleep:
+            response = client.get("/_stats")
+
+        # Validate the response
+        assert response.status_code == 200
+        mock_sleep.assert_not_called()
+
+
+class TestBudaStandInLatency:
+    def test_fixed_latency(self):
+        stand_in = BudaStandIn(StandInSettings(latency="fixed", latency_ms=40))
+
+        # Validate the latency
+        assert stand_in.latency() == 0.04
+
+    def test_uniform_latency(self):
+        stand_in = BudaStandIn(
+            StandInSettings(latency="uniform", latency_ms=40, latency_spread_ms=10)
+        )
+
+        # Validate the latencies
+        latencies = [stand_in.latency() for _ in range(1000)]
+        assert all(0.03 <= latency <= 0.05 for latency in latencies)
+
+    def test_lognormal_latency(self):
+        stand_in = BudaStandIn(
+            StandInSettings(latency="lognormal", latency_ms=40, latency_spread_ms=5)
+        )
+
+        # Validate the latencies
+        latencies = sorted(stand_in.latency() for _ in range(1001))
+        assert 0.035 < latencies[500] < 0.045
+        assert latencies[-1] > 0.08
+
+    def test_latency_is_never_negative(self):
+        stand_in = BudaStandIn(
+            StandInSettings(latency="uniform", latency_ms=0, latency_spread_ms=10)
+        )
+
+        # Validate the latencies
+        assert min(stand_in.latency() for _ in range(100)) == 0.0
+
+    def test_requests_wait_for_the_latency(self):
+        client = TestClient(create_app(StandInSettings(latency_ms=25)))
+
+        # Making the request
+        with patch("bench.buda_stand_in.asyncio.sleep") as mock_sleep:
+            client.get("/api/v2/markets")
+
+        # Validate the delay
+        mock_sleep.assert_called_once_with(0.025)
+
+
+class TestBudaStandInStats:
+    def test_stats_count_requests_by_path_and_status(self):
+        client = _client()
+
+        # Making the requests
+        client.get("/api/v2/markets")
+        client.get("/api/v2/markets/btc-clp/ticker")
+        client.get("/api/v2/markets/eth-clp/ticker")
+        client.get("/api/v2/markets/foo-bar")
+        response = client.get("/_stats")
+
+        # Validate the response
+        assert response.json() == {
+            "requests": {
+                "/api/v2/markets": 1,
+                "/api/v2/markets/{market_id}/ticker": 2,
+                "/api/v2/markets/{market_id}": 1,
+            },
+            "statuses": {"200": 3, "404": 1},
+        }
+
+    def test_reset_stats(self):
+        client = _client()
+        client.get("/api/v2/markets")
+
+        # Making the request
+        response = client.post("/_stats/reset")
+
+        # Validate the response
+        assert response.json() == {"requests": {}, "statuses": {}}
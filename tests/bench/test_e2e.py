@@ -0,0 +1,55 @@
+import asyncio
+
+import httpx
+
+from bench.buda_stand_in import StandInSettings, create_app
+from bench.e2e import run_scenario
+
+
+def _run_scenario(settings: StandInSettings, paths, concurrency, requests):
+    async def run():
+        transport = httpx.ASGITransport(app=create_app(settings))
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://stand-in"
+        ) as client:
+            summary = await run_scenario(client, paths, concurrency, requests)
+            stats = (await client.get("/_stats")).json()
+        return summary, stats
+
+    return asyncio.run(run())
+
+
+class TestRunScenario:
+    def test_requests_rotate_over_paths(self):
+        paths = ["/api/v2/markets/btc-clp/ticker", "/api/v2/markets/eth-clp/ticker"]
+
+        # Running the scenario
+        summary, stats = _run_scenario(
+            StandInSettings(latency_ms=0), paths, concurrency=4, requests=10
+        )
+
+        # Validate the summary
+        assert summary["requests"] == 10
+        assert summary["errors"] == 0
+        assert summary["requests_per_second"] > 0
+        assert 0 < summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"]
+        assert stats["requests"] == {"/api/v2/markets/{market_id}/ticker": 10}
+
+    def test_failed_requests_are_errors(self):
+        # Running the scenario
+        summary, _ = _run_scenario(
+            StandInSettings(latency_ms=0), ["/api/v2/markets/foo-bar"], 2, 6
+        )
+
+        # Validate the summary
+        assert summary["requests"] == 0
+        assert summary["errors"] == 6
+
+    def test_concurrency_overlaps_requests(self):
+        # Running the scenario
+        summary, _ = _run_scenario(
+            StandInSettings(latency_ms=50), ["/api/v2/markets"], 10, 10
+        )
+
+        # Validate the requests ran at the same time
+        assert summary["requests_per_second"] > 50
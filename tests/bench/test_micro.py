@@ -0,0 +1,51 @@
+from bench.micro import (
+    ALL_TICKERS,
+    hot_path_benchmarks,
+    lean_all_spreads,
+    measure_allocations,
+    model_all_spreads,
+    pipeline_benchmarks,
+    run_micro_benchmarks,
+)
+
+
+class TestMicroBenchmarks:
+    def test_hot_path_benchmarks_run(self):
+        benchmarks = hot_path_benchmarks()
+
+        # Validate every benchmark runs without errors
+        assert set(benchmarks) == {
+            "calculate_spread",
+            "format_current_spread",
+            "compare_spread_with_alert_value",
+            "ticker_response_validation",
+            "all_spreads_json_render",
+            "all_spreads_orjson_render",
+            "all_spreads_gzip",
+            "all_spreads_brotli",
+        }
+        for benchmark in benchmarks.values():
+            benchmark()
+
+    def test_run_micro_benchmarks(self):
+        calls = []
+
+        # Timing a benchmark
+        results = run_micro_benchmarks({"noop": lambda: calls.append(1)}, 10, 3)
+
+        # Validate the results
+        assert len(calls) == 30
+        assert list(results) == ["noop"]
+        assert results["noop"]["ns_per_call"] > 0
+
+    def test_lean_path_renders_the_same_body_as_the_model_path(self):
+        assert lean_all_spreads(ALL_TICKERS) == model_all_spreads(ALL_TICKERS)
+
+    def test_measure_allocations(self):
+        # Measuring the allocations of the pipelines
+        results = measure_allocations(pipeline_benchmarks(), markets=100)
+
+        # Validate the results
+        assert set(results) == {"all_spreads_model_path", "all_spreads_lean_path"}
+        for result in results.values():
+            assert result["peak_bytes_per_market"] > 0
@@ -0,0 +1,136 @@
+import os
+import tempfile
+
+import pytest
+
+from bench.report import (
+    compare_with_baseline,
+    finish,
+    format_results,
+    load_baseline,
+    save_baseline,
+    summarize_latencies,
+)
+
+
+class TestSummarizeLatencies:
+    def test_summary(self):
+        latencies = [i / 1000 for i in range(1, 101)]
+
+        # Summarizing the latencies
+        summary = summarize_latencies(latencies, 2.0, errors=3, upstream_calls=25)
+
+        # Validate the summary
+        assert summary["requests"] == 100
+        assert summary["errors"] == 3
+        assert summary["requests_per_second"] == 50
+        assert summary["p50_ms"] == pytest.approx(50.5)
+        assert summary["p95_ms"] == pytest.approx(95.05)
+        assert summary["p99_ms"] == pytest.approx(99.01)
+        assert summary["upstream_calls_per_request"] == 0.25
+
+    def test_summary_without_requests(self):
+        # Summarizing no latencies
+        summary = summarize_latencies([], 0.0, errors=5)
+
+        # Validate the summary
+        assert summary == {
+            "requests": 0,
+            "errors": 5,
+            "requests_per_second": 0.0,
+            "p50_ms": 0.0,
+            "p95_ms": 0.0,
+            "p99_ms": 0.0,
+        }
+
+
+class TestCompareWithBaseline:
+    baseline = {
+        "spreads": {"p95_ms": 100.0, "requests_per_second": 500.0, "errors": 0},
+        "calculate_spread": {"ns_per_call": 1000.0},
+    }
+
+    def test_within_tolerance(self):
+        results = {
+            "spreads": {"p95_ms": 110.0, "requests_per_second": 450.0, "errors": 4},
+            "calculate_spread": {"ns_per_call": 800.0},
+        }
+
+        # Validate the comparison
+        assert compare_with_baseline(results, self.baseline, 0.2) == []
+
+    def test_regressions(self):
+        results = {
+            "spreads": {"p95_ms": 130.0, "requests_per_second": 350.0},
+            "calculate_spread": {"ns_per_call": 1300.0},
+        }
+
+        # Comparing the results
+        regressions = compare_with_baseline(results, self.baseline, 0.2)
+
+        # Validate the regressions
+        assert len(regressions) == 3
+        assert regressions[0].startswith("spreads p95_ms: 130")
+        assert regressions[1].startswith("spreads requests_per_second: 350")
+        assert regressions[2].startswith("calculate_spread ns_per_call: 1300")
+
+    def test_new_benchmarks_are_not_compared(self):
+        results = {"alerts": {"p95_ms": 1000.0}}
+
+        # Validate the comparison
+        assert compare_with_baseline(results, self.baseline, 0.2) == []
+
+
+class TestBaselineFiles:
+    def test_save_and_load(self):
+        path = os.path.join(tempfile.mkdtemp(), "baselines", "e2e.json")
+        results = {"spreads": {"p95_ms": 12.5}}
+
+        # Saving and loading the baseline
+        save_baseline(path, results)
+
+        # Validate the baseline
+        assert load_baseline(path) == results
+
+    def test_load_missing(self):
+        # Validate the missing baseline
+        assert load_baseline(os.path.join(tempfile.mkdtemp(), "none.json")) is None
+
+
+class TestFinish:
+    results = {"spreads": {"p95_ms": 130.0}}
+
+    def test_update_baseline(self, capsys):
+        path = os.path.join(tempfile.mkdtemp(), "e2e.json")
+
+        # Validate the exit status and the stored baseline
+        assert finish(self.results, path, 0.2, update_baseline=True) == 0
+        assert load_baseline(path) == self.results
+        assert "Baseline saved" in capsys.readouterr().out
+
+    def test_regression_fails(self, capsys):
+        path = os.path.join(tempfile.mkdtemp(), "e2e.json")
+        save_baseline(path, {"spreads": {"p95_ms": 100.0}})
+
+        # Validate the exit status and the report
+        assert finish(self.results, path, 0.2, update_baseline=False) == 1
+        assert "spreads p95_ms: 130" in capsys.readouterr().out
+
+    def test_missing_baseline_passes(self, capsys):
+        path = os.path.join(tempfile.mkdtemp(), "e2e.json")
+
+        # Validate the exit status and the report
+        assert finish(self.results, path, 0.2, update_baseline=False) == 0
+        assert "No baseline" in capsys.readouterr().out
+
+    def test_format_results(self):
+        # Formatting the results
+        table = format_results(
+            {"spreads": {"p95_ms": 12.5}, "calculate_spread": {"ns_per_call": 950.0}}
+        )
+
+        # Validate the table
+        lines = table.splitlines()
+        assert lines[0].split() == ["benchmark", "ns_per_call", "p95_ms"]
+        assert lines[1].split() == ["spreads", "12.5"]
+        assert lines[2].split() == ["calculate_spread", "950"]
@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Keep the alerts written by the tests out of the working directory. This runs
+# before the app is imported, so the settings pick it up.
+os.environ.setdefault("ALERT_DB_PATH", os.path.join(tempfile.mkdtemp(), "alerts.db"))
@@ -0,0 +1,57 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas import decode_market_records, decode_ticker_quote, decode_ticker_quotes
+from config import SAMPLE_ALL_TICKERS_DATA, SAMPLE_MARKETS_DATA
+
+
+class TestDecodeTickerQuotes:
+    def test_decode_ticker_quotes_keeps_the_spread_fields(self):
+        quotes = decode_ticker_quotes(SAMPLE_ALL_TICKERS_DATA["tickers"])
+
+        # Validate only the fields used by the spreads are kept
+        assert [quote["market_id"] for quote in quotes] == [
+            "market_1",
+            "market_2",
+            "market_3",
+        ]
+        assert all(
+            set(quote) == {"market_id", "min_ask", "max_bid"} for quote in quotes
+        )
+
+    def test_decode_ticker_quote_fails_with_invalid_price(self):
+        ticker = {
+            "market_id": "market_1",
+            "min_ask": ["not a price", "CLP"],
+            "max_bid": ["900.0", "CLP"],
+        }
+
+        # Validate the error names the record that failed
+        with pytest.raises(ValidationError) as error:
+            decode_ticker_quote(ticker)
+        assert error.value.title == "TickerQuote"
+        assert error.value.errors()[0]["loc"] == ("min_ask",)
+
+    def test_decode_ticker_quotes_fails_with_missing_field(self):
+        tickers = [{"market_id": "market_1", "min_ask": ["1000.0", "CLP"]}]
+
+        # Validate the error locates the ticker that failed
+        with pytest.raises(ValidationError) as error:
+            decode_ticker_quotes(tickers)
+        assert error.value.title == "TickerQuote"
+        assert error.value.errors()[0]["loc"] == (0, "max_bid")
+
+
+class TestDecodeMarketRecords:
+    def test_decode_market_records_keeps_the_id(self):
+        records = decode_market_records(SAMPLE_MARKETS_DATA["markets"])
+
+        # Validate only the id is kept
+        assert records == [
+            {"id": market["id"]} for market in SAMPLE_MARKETS_DATA["markets"]
+        ]
+
+    def test_decode_market_records_fails_without_id(self):
+        with pytest.raises(ValidationError) as error:
+            decode_market_records([{"name": "btc-clp"}])
+        assert error.value.title == "MarketRecord"
@@ -0,0 +1,89 @@
+import pytest
+
+from app.services.alert_events import AlertCrossingDetector, AlertEventLog
+from app.services.alert_index import AlertIndex
+
+
+def _spread(market_id, value):
+    return {"market_id": market_id, "min_ask": value, "max_bid": 0.0, "value": value}
+
+
+def _append_event(event_log, name="rule"):
+    return event_log.append(
+        market_id="MARKET_1",
+        name=name,
+        direction="above",
+        threshold=100.0,
+        previous_spread_value=50.0,
+        spread_value=150.0,
+        is_triggered=True,
+        created_at=0.0,
+    )
+
+
+@pytest.fixture
+def event_log():
+    return AlertEventLog(max_events=3)
+
+
+@pytest.fixture
+def detector(event_log):
+    alert_index = AlertIndex()
+    alert_index.add("market_1", "wide", "above", 100)
+    alert_index.add("market_1", "tight", "below", 20)
+    return AlertCrossingDetector(alert_index=alert_index, event_log=event_log)
+
+
+class TestAlertEventLog:
+    def test_get_after_reads_events_following_cursor(self, event_log):
+        for name in ["first", "second", "third"]:
+            _append_event(event_log, name)
+
+        assert [event.name for event in event_log.get_after(0, 10)] == [
+            "first",
+            "second",
+            "third",
+        ]
+        assert [event.name for event in event_log.get_after(1, 10)] == [
+            "second",
+            "third",
+        ]
+        assert [event.name for event in event_log.get_after(0, 1)] == ["first"]
+        assert event_log.get_after(3, 10) == []
+
+    def test_append_drops_oldest_events(self, event_log):
+        for name in ["first", "second", "third", "fourth"]:
+            _append_event(event_log, name)
+
+        assert event_log.first_id() == 2
+        assert event_log.last_id == 4
+        assert [event.id for event in event_log.get_after(0, 10)] == [2, 3, 4]
+
+
+class TestAlertCrossingDetector:
+    def test_on_spreads_sets_initial_state_without_events(self, detector, event_log):
+        detector.on_spreads([_spread("market_1", 150)])
+
+        assert event_log.last_id == 0
+
+    def test_on_spreads_logs_crossings_only(self, detector, event_log):
+        detector.on_spreads([_spread("market_1", 50)])
+        detector.on_spreads([_spread("market_1", 150)])
+        # Moving without crossing any threshold is not logged
+        detector.on_spreads([_spread("market_1", 160)])
+        detector.on_spreads([_spread("market_1", 10)])
+
+        events = event_log.get_after(0, 10)
+        assert [(event.name, event.is_triggered) for event in events] == [
+            ("wide", True),
+            ("wide", False),
+            ("tight", True),
+        ]
+        assert events[0].previous_spread_value == 50
+        assert events[0].spread_value == 150
+
+    def test_on_spreads_tracks_markets_independently(self, detector, event_log):
+        detector.on_spreads([_spread("market_1", 50), _spread("market_2", 150)])
+        detector.on_spreads([_spread("MARKET_1", 150), _spread("market_2", 50)])
+
+        assert [event.market_id for event in event_log.get_after(0, 10)] == ["MARKET_1"]
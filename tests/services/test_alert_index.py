@@ -0,0 +1,134 @@
+import pytest
+
+from app.services.alert_index import AlertIndex, AlertRule
+
+
+@pytest.fixture
+def alert_index():
+    alert_index = AlertIndex()
+    alert_index.add("market_1", "wide", "above", 100)
+    alert_index.add("market_1", "very_wide", "above", 200)
+    alert_index.add("market_1", "tight", "below", 50)
+    alert_index.add("market_1", "very_tight", "below", 10)
+    alert_index.add("market_2", "wide", "above", 100)
+    return alert_index
+
+
+def _names(rules):
+    return sorted(rule.name for rule in rules)
+
+
+class TestAlertIndex:
+    def test_add_stores_rule_per_market(self, alert_index):
+        assert alert_index.get("MARKET_1", "wide") == AlertRule(
+            "MARKET_1", "wide", "above", 100.0
+        )
+        assert len(alert_index) == 5
+        assert sorted(alert_index.market_ids()) == ["MARKET_1", "MARKET_2"]
+
+    def test_add_replaces_rule_with_same_name(self, alert_index):
+        alert_index.add("market_1", "wide", "below", 30)
+
+        assert alert_index.get("market_1", "wide").direction == "below"
+        assert len(alert_index) == 5
+        assert _names(alert_index.find_triggered("market_1", 150)) == []
+
+    def test_add_with_invalid_direction_fails(self, alert_index):
+        with pytest.raises(ValueError):
+            alert_index.add("market_1", "rule", "sideways", 1)
+
+    def test_remove_deletes_rule(self, alert_index):
+        removed_rule = alert_index.remove("market_1", "wide")
+
+        assert removed_rule.name == "wide"
+        assert alert_index.get("market_1", "wide") is None
+        assert alert_index.remove("market_1", "wide") is None
+        assert alert_index.remove("unknown_market", "wide") is None
+
+    def test_remove_rule_sharing_threshold(self):
+        alert_index = AlertIndex()
+        alert_index.add("market_1", "first", "above", 100)
+        alert_index.add("market_1", "second", "above", 100)
+
+        alert_index.remove("market_1", "second")
+
+        assert _names(alert_index.get_by_market_id("market_1")) == ["first"]
+
+    def test_get_by_market_id_sorts_rules(self, alert_index):
+        rules = alert_index.get_by_market_id("market_1")
+
+        assert [rule.name for rule in rules] == [
+            "wide",
+            "very_wide",
+            "very_tight",
+            "tight",
+        ]
+        assert alert_index.get_by_market_id("unknown_market") == []
+
+    @pytest.mark.parametrize(
+        "spread_value, expected_names",
+        [
+            (5, ["tight", "very_tight"]),
+            (10, ["tight"]),
+            (75, []),
+            (100, []),
+            (150, ["wide"]),
+            (250, ["very_wide", "wide"]),
+        ],
+    )
+    def test_find_triggered(self, alert_index, spread_value, expected_names):
+        triggered_rules = alert_index.find_triggered("market_1", spread_value)
+
+        assert _names(triggered_rules) == expected_names
+
+    def test_find_crossed_when_spread_rises(self, alert_index):
+        crossed = alert_index.find_crossed("market_1", 5, 150)
+
+        assert sorted((rule.name, state) for rule, state in crossed) == [
+            ("tight", False),
+            ("very_tight", False),
+            ("wide", True),
+        ]
+
+    def test_find_crossed_when_spread_falls(self, alert_index):
+        crossed = alert_index.find_crossed("market_1", 250, 100)
+
+        assert sorted((rule.name, state) for rule, state in crossed) == [
+            ("very_wide", False),
+            ("wide", False),
+        ]
+
+    def test_find_crossed_matches_find_triggered(self, alert_index):
+        values = [0, 10, 10, 49, 50, 51, 100, 100.5, 199, 200, 201, 7]
+        for previous_value, spread_value in zip(values, values[1:]):
+            before = set(alert_index.find_triggered("market_1", previous_value))
+            after = set(alert_index.find_triggered("market_1", spread_value))
+            crossed = alert_index.find_crossed("market_1", previous_value, spread_value)
+
+            assert {rule for rule, state in crossed if state} == after - before
+            assert {rule for rule, state in crossed if not state} == before - after
+
+    def test_find_crossed_without_change(self, alert_index):
+        assert alert_index.find_crossed("market_1", 150, 150) == []
+
+
+class TestAlertIndexReplaceAll:
+    def test_replace_all_swaps_every_rule(self):
+        alert_index = AlertIndex()
+        alert_index.add("market_1", "wide", "above", 120)
+        alert_index.add("market_2", "tight", "below", 20)
+
+        alert_index.replace_all(
+            [
+                AlertRule("market_1", "wide", "below", 30),
+                AlertRule("MARKET_3", "x", "above", 5),
+            ]
+        )
+
+        assert alert_index.get_by_market_id("market_1") == [
+            AlertRule("MARKET_1", "wide", "below", 30.0)
+        ]
+        assert alert_index.get_by_market_id("market_2") == []
+        assert alert_index.find_triggered("market_3", 10) == [
+            AlertRule("MARKET_3", "x", "above", 5.0)
+        ]
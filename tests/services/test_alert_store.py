@@ -0,0 +1,159 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.services.alert_index import AlertIndex, AlertRule
+from app.services.alert_store import AlertRepository, AlertStore
+
+
+def _store(path):
+    return AlertStore(repository=AlertRepository(path=path), index=AlertIndex())
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "alerts.db")
+
+
+@pytest.fixture
+def store(db_path):
+    store = _store(db_path)
+    store.load()
+    yield store
+    store.repository.close()
+
+
+@pytest.fixture
+def other_store(db_path):
+    # Another worker sharing the same database file
+    store = _store(db_path)
+    store.load()
+    yield store
+    store.repository.close()
+
+
+class TestAlertRepository:
+    def test_database_uses_wal_mode(self, db_path):
+        repository = AlertRepository(path=db_path)
+        repository.get_rules()
+
+        connection = sqlite3.connect(db_path)
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        connection.close()
+        repository.close()
+
+    def test_saved_rules_survive_reopening(self, db_path):
+        repository = AlertRepository(path=db_path)
+        repository.save_rule(AlertRule("MARKET_1", "wide", "above", 120.0))
+        repository.save_rule(AlertRule("MARKET_1", "wide", "below", 20.0))
+        repository.set_spread_alert(100.0, "http://hooks.test/alerts")
+        repository.close()
+
+        repository = AlertRepository(path=db_path)
+        assert repository.get_rules() == [AlertRule("MARKET_1", "wide", "below", 20.0)]
+        assert repository.get_spread_alert() == {
+            "value": 100.0,
+            "webhook_url": "http://hooks.test/alerts",
+        }
+        assert repository.delete_rule("MARKET_1", "wide") is True
+        assert repository.delete_rule("MARKET_1", "wide") is False
+        repository.close()
+
+    def test_database_without_webhook_column_is_migrated(self, db_path):
+        connection = sqlite3.connect(db_path)
+        connection.execute(
+            "CREATE TABLE spread_alert (id INTEGER PRIMARY KEY CHECK (id = 1), value REAL)"
+        )
+        connection.execute("INSERT INTO spread_alert (id, value) VALUES (1, 100.0)")
+        connection.commit()
+        connection.close()
+
+        repository = AlertRepository(path=db_path)
+        assert repository.get_spread_alert() == {"value": 100.0, "webhook_url": None}
+        repository.close()
+
+
+class TestAlertStore:
+    def test_writes_update_cache_and_repository(self, store):
+        store.add_rule("market_1", "wide", "above", 120)
+        store.set_spread_alert(100.0)
+
+        assert store.index.get("market_1", "wide").threshold == 120.0
+        assert store.spread_alert["value"] == 100.0
+        assert store.repository.get_rules() == [
+            AlertRule("MARKET_1", "wide", "above", 120.0)
+        ]
+
+        assert store.remove_rule("market_1", "wide") is True
+        assert store.remove_rule("market_1", "wide") is False
+        assert store.repository.get_rules() == []
+        assert store.index.get("market_1", "wide") is None
+
+    def test_add_rule_with_invalid_direction_stores_nothing(self, store):
+        with pytest.raises(ValueError):
+            store.add_rule("market_1", "wide", "sideways", 120)
+
+        assert store.repository.get_rules() == []
+        assert len(store.index) == 0
+
+    def test_load_reads_alerts_stored_before_start(self, db_path, store):
+        store.add_rule("market_1", "wide", "above", 120)
+        store.set_spread_alert(100.0)
+
+        restarted_store = _store(db_path)
+        restarted_store.load()
+
+        assert restarted_store.index.get_by_market_id("MARKET_1") == [
+            AlertRule("MARKET_1", "wide", "above", 120.0)
+        ]
+        assert restarted_store.spread_alert["value"] == 100.0
+        restarted_store.repository.close()
+
+    def test_sync_picks_up_writes_of_other_workers(self, store, other_store):
+        assert other_store.sync() is False
+
+        store.add_rule("market_1", "wide", "above", 120)
+        store.set_spread_alert(100.0)
+
+        # The writer's own commits do not invalidate its cache
+        assert store.sync() is False
+        assert other_store.index.get("market_1", "wide") is None
+        assert other_store.sync() is True
+        assert other_store.index.get("market_1", "wide").threshold == 120.0
+        assert other_store.spread_alert["value"] == 100.0
+
+        store.remove_rule("market_1", "wide")
+        assert other_store.sync() is True
+        assert other_store.index.get("market_1", "wide") is None
+
+    def test_remove_rule_of_other_worker_before_sync(self, store, other_store):
+        store.add_rule("market_1", "wide", "above", 120)
+
+        # Not in the cache yet, but the repository has it
+        assert other_store.remove_rule("market_1", "wide") is True
+        assert store.repository.get_rules() == []
+
+    def test_spread_alert_is_updated_in_place(self, store, other_store):
+        spread_alert = other_store.spread_alert
+        store.set_spread_alert(100.0)
+
+        other_store.sync()
+
+        assert spread_alert["value"] == 100.0
+
+
+class TestAlertStoreSyncTask:
+    def test_sync_task_picks_up_writes_of_other_workers(self, store, other_store):
+        async def _run():
+            other_store.start_sync(interval=0.01)
+            store.add_rule("market_1", "wide", "above", 120)
+            for _ in range(100):
+                if other_store.index.get("market_1", "wide") is not None:
+                    break
+                await asyncio.sleep(0.01)
+            await other_store.stop_sync()
+
+        asyncio.run(_run())
+
+        assert other_store.index.get("market_1", "wide").threshold == 120.0
@@ -3,7 +3,9 @@ import base64
 import hmac
 import time
 from unittest.mock import MagicMock, patch
-from app.services.auth import BudaHMACAuth
+import httpx
+
+from app.services.auth import BudaHMACAuth, BudaHMACHttpxAuth
 
 
 @pytest.fixture
@@ -85,3 +87,25 @@ class TestBudaHMACAuth:
         assert "X-SBTC-NONCE" in modified_request.headers
         assert "X-SBTC-SIGNATURE" in modified_request.headers
         assert modified_request.headers["X-SBTC-APIKEY"] == auth_instance.api_key
+
+
+class TestBudaHMACHttpxAuth:
+    def test_auth_flow_signs_httpx_request(self, api_key, secret):
+        auth = BudaHMACHttpxAuth(api_key, secret)
+        request = httpx.Request("GET", "https://www.buda.com/api/v2/markets?page=1")
+
+        with patch("app.services.auth.time") as mock_time:
+            mock_time.time.return_value = 1234567
+            signed_request = next(auth.auth_flow(request))
+
+        # Create expected signature over the path and query string
+        nonce = str(int(1234567 * 1e6))
+        expected_signature = hmac.new(
+            key=secret.encode(),
+            msg=f"GET /api/v2/markets?page=1 {nonce}".encode(),
+            digestmod="sha384",
+        ).hexdigest()
+
+        assert signed_request.headers["X-SBTC-APIKEY"] == api_key
+        assert signed_request.headers["X-SBTC-NONCE"] == nonce
+        assert signed_request.headers["X-SBTC-SIGNATURE"] == expected_signature
@@ -1,11 +1,21 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+import httpx
 import pytest
 import requests
 from unittest.mock import MagicMock, patch
-from requests.exceptions import RequestException
+from requests.exceptions import ConnectionError, HTTPError, RequestException
 
 from config import settings
-from app.services.base_api_client import BaseAPIClient
+from app.services.base_api_client import BaseAPIClient, create_session
 from app.services.auth import BudaHMACAuth
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.metrics import upstream_request_duration
+from app.services.rate_limiter import RateLimitExceeded, RateLimiter, SQLiteTokenBucket
 
 
 @pytest.fixture
@@ -13,19 +23,38 @@ def base_api_client():
     return BaseAPIClient()
 
 
+class TestCreateSession:
+    def test_create_session_mounts_pooled_adapters(self):
+        session = create_session()
+
+        # Check both schemes use an adapter sized from settings
+        for scheme in ("https://", "http://"):
+            adapter = session.get_adapter(scheme)
+            assert adapter._pool_connections == settings.BUDA_API_POOL_CONNECTIONS
+            assert adapter._pool_maxsize == settings.BUDA_API_POOL_MAXSIZE
+
+    def test_create_session_signs_requests_with_buda_auth(self):
+        session = create_session()
+
+        assert isinstance(session.auth, BudaHMACAuth)
+
+
 class TestBaseAPIClient:
     def test_base_client_init_correctly(self, base_api_client):
         assert base_api_client.base_url == settings.BUDA_API_URL
+        assert base_api_client.timeout == (
+            settings.BUDA_API_CONNECT_TIMEOUT,
+            settings.BUDA_API_READ_TIMEOUT,
+        )
+        assert isinstance(base_api_client.session, requests.Session)
 
-    @patch.object(requests, "get")
-    @patch("app.services.base_api_client.BudaHMACAuth")
-    def test_base_api_client_get_request_succeeds(
-        self, mock_buda_hmac_auth_class, mock_get, base_api_client
-    ):
-        # Mock the BudaHMACAuth class and instance
-        mock_buda_hmac_auth_instance = MagicMock()
-        mock_buda_hmac_auth_class.return_value = mock_buda_hmac_auth_instance
+    def test_base_client_reuses_given_session(self):
+        session = create_session()
+
+        assert BaseAPIClient(session=session).session is session
 
+    @patch.object(requests.Session, "get")
+    def test_base_api_client_get_request_succeeds(self, mock_get, base_api_client):
         # Define a sample response for the mock GET request
         mock_get.return_value.ok = True
         mock_get.return_value.json.return_value = {"key": "value"}
@@ -33,32 +62,463 @@ class TestBaseAPIClient:
         # Call the get method with a mock path
         response = base_api_client._get("some_path")
 
-        # Assert that requests.get was called with the expected URL
+        # Assert that the pooled session was called with the expected URL and timeouts
         mock_get.assert_called_once_with(
-            f"{settings.BUDA_API_URL}/some_path", auth=mock_buda_hmac_auth_instance
+            f"{settings.BUDA_API_URL}/some_path", timeout=base_api_client.timeout
         )
 
         # Assert that the response data matches the expected data
         assert response == {"key": "value"}
 
-    @patch.object(requests, "get")
-    @patch("app.services.base_api_client.BudaHMACAuth")
-    def test_base_api_client_get_request_fails(
-        self, mock_buda_hmac_auth_class, mock_get, base_api_client
-    ):
-        # Mock the BudaHMACAuth class and instance
-        mock_buda_hmac_auth_instance = MagicMock()
-        mock_buda_hmac_auth_class.return_value = mock_buda_hmac_auth_instance
-
+    @patch.object(requests.Session, "get")
+    def test_base_api_client_get_request_fails(self, mock_get, base_api_client):
         # Define a sample response for the mock GET request
         mock_get.return_value.ok = False
         mock_get.return_value.raise_for_status.side_effect = RequestException
 
         # Call the get method with a mock path
         with pytest.raises(RequestException):
-            response = base_api_client._get("some_path")
+            base_api_client._get("some_path")
+
+        # Assert that the pooled session was called with the expected URL
+        mock_get.assert_called_once_with(
+            f"{settings.BUDA_API_URL}/some_path", timeout=base_api_client.timeout
+        )
+
+    @patch.object(requests.Session, "get")
+    def test_base_api_client_coalesces_concurrent_get_requests(
+        self, mock_get, base_api_client
+    ):
+        def _slow_get(*args, **kwargs):
+            time.sleep(0.05)
+            return MagicMock(ok=True, json=MagicMock(return_value={"key": "value"}))
+
+        mock_get.side_effect = _slow_get
+        started = threading.Barrier(5)
+        results = []
+
+        def _caller():
+            started.wait()
+            results.append(base_api_client._get("some_path"))
+
+        threads = [threading.Thread(target=_caller) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert a single upstream request served every caller
+        mock_get.assert_called_once()
+        assert results == [{"key": "value"}] * 5
+        assert base_api_client.single_flight.stats() == {"executed": 1, "collapsed": 4}
+
+    @patch.object(requests.Session, "close")
+    def test_base_api_client_close_releases_session(self, mock_close, base_api_client):
+        base_api_client.close()
+
+        mock_close.assert_called_once()
+
+
+def _mock_async_client(handler):
+    # Serve the asynchronous client from an in-process transport
+    return patch(
+        "app.services.base_api_client.create_async_client",
+        side_effect=lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+
+def _no_backoff():
+    return patch("app.services.base_api_client._backoff_delay", return_value=0)
+
+
+class TestBaseAPIClientAsync:
+    def test_base_api_client_aget_request_succeeds(self, base_api_client):
+        requested_urls = []
+
+        def _handler(request):
+            requested_urls.append(str(request.url))
+            return httpx.Response(200, json={"key": "value"})
+
+        with _mock_async_client(_handler):
+            response = asyncio.run(base_api_client._aget("some_path"))
+
+        assert requested_urls == [f"{settings.BUDA_API_URL}/some_path"]
+        assert response == {"key": "value"}
+
+    def test_base_api_client_aget_request_fails_with_requests_http_error(
+        self, base_api_client
+    ):
+        with _mock_async_client(lambda request: httpx.Response(404)):
+            with pytest.raises(HTTPError) as excinfo:
+                asyncio.run(base_api_client._aget("some_path"))
+
+        # Assert the error looks like the one raised by the requests client
+        assert excinfo.value.response.status_code == 404
+        assert str(excinfo.value) == (
+            f"404 Client Error: Not Found for url: {settings.BUDA_API_URL}/some_path"
+        )
+
+    def test_base_api_client_aget_request_fails_with_requests_connection_error(
+        self, base_api_client
+    ):
+        def _handler(request):
+            raise httpx.ConnectError("Connection refused")
+
+        with _mock_async_client(_handler):
+            with pytest.raises(ConnectionError):
+                asyncio.run(base_api_client._aget("some_path"))
+
+    def test_base_api_client_aget_records_latency_by_path_template(
+        self, base_api_client
+    ):
+        labels = ("markets/{market_id}/ticker", "503")
+        before = sum(upstream_request_duration.values().get(labels, [0, 0])[:-1])
+
+        with _mock_async_client(lambda request: httpx.Response(503)), _no_backoff():
+            with pytest.raises(HTTPError):
+                asyncio.run(base_api_client._aget("markets/btc-clp/ticker"))
 
-            # Assert that requests.get was called with the expected URL
-            mock_get.assert_called_once_with(
-                f"{settings.BUDA_API_URL}/some_path", auth=mock_buda_hmac_auth_instance
+        # Every attempt is recorded, the first one and each retry
+        after = sum(upstream_request_duration.values()[labels][:-1])
+        assert after == before + 1 + settings.BUDA_API_MAX_RETRIES
+
+    def test_base_api_client_coalesces_concurrent_aget_requests(self, base_api_client):
+        calls = []
+
+        async def _handler(request):
+            calls.append(request)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"key": "value"})
+
+        async def _run():
+            return await asyncio.gather(
+                *(base_api_client._aget("some_path") for _ in range(5))
             )
+
+        with _mock_async_client(_handler):
+            results = asyncio.run(_run())
+
+        assert len(calls) == 1
+        assert results == [{"key": "value"}] * 5
+        assert base_api_client.async_single_flight.stats() == {
+            "executed": 1,
+            "collapsed": 4,
+        }
+        assert base_api_client.single_flight_stats() == {
+            "executed": 1,
+            "collapsed": 4,
+        }
+
+    def test_base_api_client_aclose_releases_clients(self, base_api_client):
+        async def _run():
+            async_client = base_api_client.async_client
+            await base_api_client.aclose()
+            return async_client
+
+        with patch.object(requests.Session, "close") as mock_close:
+            async_client = asyncio.run(_run())
+
+        mock_close.assert_called_once()
+        assert async_client.is_closed
+
+    def test_base_api_client_async_client_refuses_another_event_loop(
+        self, base_api_client
+    ):
+        async def _get_async_client():
+            return base_api_client.async_client
+
+        async_client = asyncio.run(_get_async_client())
+
+        # Connections pooled by the first loop cannot be used by a new one
+        with pytest.raises(RuntimeError):
+            asyncio.run(_get_async_client())
+
+        async def _reopen():
+            await base_api_client.aclose()
+            return base_api_client.async_client
+
+        assert asyncio.run(_reopen()) is not async_client
+
+
+class TestBaseAPIClientResilience:
+    def test_aget_retries_transient_errors(self, base_api_client):
+        responses = [httpx.Response(502), httpx.Response(200, json={"key": "value"})]
+
+        with _mock_async_client(lambda request: responses.pop(0)), _no_backoff():
+            response = asyncio.run(base_api_client._aget("some_path"))
+
+        assert response == {"key": "value"}
+        assert responses == []
+        assert base_api_client.circuit_breaker.stats()["consecutive_failures"] == 0
+
+    def test_aget_retries_connection_errors(self, base_api_client):
+        calls = []
+
+        def _handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ConnectError("Connection reset")
+            return httpx.Response(200, json={"key": "value"})
+
+        with _mock_async_client(_handler), _no_backoff():
+            assert asyncio.run(base_api_client._aget("some_path")) == {"key": "value"}
+
+        assert len(calls) == 2
+
+    def test_aget_does_not_retry_client_errors(self, base_api_client):
+        calls = []
+
+        def _handler(request):
+            calls.append(request)
+            return httpx.Response(404)
+
+        with _mock_async_client(_handler), _no_backoff():
+            with pytest.raises(HTTPError):
+                asyncio.run(base_api_client._aget("some_path"))
+
+        # A 404 comes from a healthy upstream
+        assert len(calls) == 1
+        assert base_api_client.circuit_breaker.stats()["consecutive_failures"] == 0
+
+    def test_aget_waits_with_jittered_backoff(self, base_api_client):
+        with _mock_async_client(lambda request: httpx.Response(503)):
+            with patch(
+                "app.services.base_api_client.random.uniform", return_value=0
+            ) as mock_uniform:
+                with pytest.raises(HTTPError):
+                    asyncio.run(base_api_client._aget("some_path"))
+
+        # The backoff window doubles with every retry
+        assert [call.args for call in mock_uniform.call_args_list] == [
+            (0, settings.BUDA_API_RETRY_BACKOFF * 2**attempt)
+            for attempt in range(settings.BUDA_API_MAX_RETRIES)
+        ]
+
+    @pytest.mark.parametrize(
+        "status_code, retry_after, expected",
+        [
+            (429, "1", 1.0),
+            (503, "0.5", 0.5),
+            # Capped at the maximum backoff
+            (429, "120", settings.BUDA_API_RETRY_MAX_BACKOFF),
+            (429, "Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+        ],
+    )
+    def test_aget_waits_for_retry_after(
+        self, base_api_client, status_code, retry_after, expected
+    ):
+        responses = [
+            httpx.Response(status_code, headers={"Retry-After": retry_after}),
+            httpx.Response(200, json={"key": "value"}),
+        ]
+        delays = []
+
+        async def _sleep(delay):
+            delays.append(delay)
+
+        with _mock_async_client(lambda request: responses.pop(0)), patch(
+            "app.services.base_api_client.asyncio.sleep", side_effect=_sleep
+        ), _no_backoff() as mock_backoff:
+            assert asyncio.run(base_api_client._aget("some_path")) == {"key": "value"}
+
+        assert delays == [expected]
+        mock_backoff.assert_not_called()
+
+    def test_aget_ignores_retry_after_of_other_responses(self, base_api_client):
+        responses = [
+            httpx.Response(502, headers={"Retry-After": "1"}),
+            httpx.Response(200, json={"key": "value"}),
+        ]
+
+        with _mock_async_client(
+            lambda request: responses.pop(0)
+        ), _no_backoff() as mock_backoff:
+            asyncio.run(base_api_client._aget("some_path"))
+
+        mock_backoff.assert_called_once_with(0)
+
+    def test_aget_throttling_does_not_open_the_circuit(self, base_api_client):
+        async def _run():
+            for _ in range(settings.BUDA_API_BREAKER_FAILURE_THRESHOLD):
+                with pytest.raises(HTTPError):
+                    await base_api_client._aget("some_path")
+
+        base_api_client.max_retries = 0
+        with _mock_async_client(lambda request: httpx.Response(429)):
+            asyncio.run(_run())
+
+        assert base_api_client.circuit_breaker.state == "closed"
+        assert base_api_client.circuit_breaker.stats()["consecutive_failures"] == 0
+
+    def test_aget_fails_fast_while_the_circuit_is_open(self, base_api_client):
+        calls = []
+
+        def _handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        async def _run():
+            for _ in range(settings.BUDA_API_BREAKER_FAILURE_THRESHOLD):
+                with pytest.raises(RequestException):
+                    await base_api_client._aget("some_path")
+
+        base_api_client.max_retries = 0
+        with _mock_async_client(_handler):
+            asyncio.run(_run())
+            assert base_api_client.circuit_breaker.state == "open"
+            with pytest.raises(CircuitOpenError):
+                asyncio.run(base_api_client._aget("some_path"))
+
+        assert len(calls) == settings.BUDA_API_BREAKER_FAILURE_THRESHOLD
+
+    def test_aget_uses_the_read_timeout_of_the_path(self, base_api_client):
+        timeouts = []
+
+        def _handler(request):
+            timeouts.append(request.extensions["timeout"])
+            return httpx.Response(200, json={})
+
+        async def _run():
+            await base_api_client._aget("markets/btc-clp/ticker")
+            await base_api_client._aget("markets")
+
+        base_api_client.path_read_timeouts = {"markets/{market_id}/ticker": 1.5}
+        with _mock_async_client(_handler):
+            asyncio.run(_run())
+
+        ticker_timeout, markets_timeout = timeouts
+        assert ticker_timeout["read"] == 1.5
+        assert ticker_timeout["connect"] == settings.BUDA_API_CONNECT_TIMEOUT
+        assert markets_timeout["read"] == settings.BUDA_API_READ_TIMEOUT
+
+    @patch.object(requests.Session, "get")
+    def test_get_retries_transient_errors(self, mock_get, base_api_client):
+        mock_get.side_effect = [
+            requests.exceptions.Timeout("Read timed out"),
+            MagicMock(ok=True, json=MagicMock(return_value={"key": "value"})),
+        ]
+
+        with _no_backoff():
+            assert base_api_client._get("some_path") == {"key": "value"}
+
+        assert mock_get.call_count == 2
+
+    @patch.object(requests.Session, "get")
+    def test_get_waits_for_retry_after(self, mock_get, base_api_client):
+        throttled = requests.Response()
+        throttled.status_code = 429
+        throttled.headers["Retry-After"] = "1"
+        mock_get.side_effect = [
+            throttled,
+            MagicMock(ok=True, json=MagicMock(return_value={"key": "value"})),
+        ]
+
+        with patch("app.services.base_api_client.time.sleep") as mock_sleep:
+            assert base_api_client._get("some_path") == {"key": "value"}
+
+        mock_sleep.assert_called_once_with(1.0)
+
+    @patch.object(requests.Session, "get")
+    def test_get_gives_up_after_max_retries(self, mock_get, base_api_client):
+        mock_get.side_effect = ConnectionError("Connection refused")
+
+        with _no_backoff():
+            with pytest.raises(ConnectionError):
+                base_api_client._get("some_path")
+
+        assert mock_get.call_count == 1 + settings.BUDA_API_MAX_RETRIES
+
+    @patch.object(requests.Session, "get")
+    def test_get_uses_the_read_timeout_of_the_path(self, mock_get, base_api_client):
+        mock_get.return_value = MagicMock(ok=True, json=MagicMock(return_value={}))
+        base_api_client.path_read_timeouts = {"markets/{market_id}/ticker": 1.5}
+
+        base_api_client._get("markets/btc-clp/ticker")
+
+        mock_get.assert_called_once_with(
+            f"{settings.BUDA_API_URL}/markets/btc-clp/ticker",
+            timeout=(settings.BUDA_API_CONNECT_TIMEOUT, 1.5),
+        )
+
+    def test_clients_can_share_a_circuit_breaker(self):
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+
+        first = BaseAPIClient(circuit_breaker=circuit_breaker)
+        second = BaseAPIClient(circuit_breaker=circuit_breaker)
+
+        assert first.circuit_breaker is second.circuit_breaker
+
+
+class _RecordingBucket:
+    blocking = False
+
+    def __init__(self, waits=()):
+        self.reserves = []
+        self.waits = list(waits)
+
+    def try_take(self, reserve=0.0):
+        self.reserves.append(reserve)
+        return self.waits.pop(0) if self.waits else 0.0
+
+    def close(self):
+        pass
+
+
+class TestBaseAPIClientRateLimit:
+    def _client(self, bucket, max_wait=1.0):
+        rate_limiter = RateLimiter(
+            bucket, max_wait=max_wait, low_priority_reserve=5, sleep=lambda _: None
+        )
+        return BaseAPIClient(rate_limiter=rate_limiter)
+
+    def test_bulk_requests_leave_the_reserve_to_single_market_requests(self):
+        bucket = _RecordingBucket()
+        base_api_client = self._client(bucket)
+
+        async def _run():
+            await base_api_client._aget("tickers")
+            await base_api_client._aget("markets")
+            await base_api_client._aget("markets/btc-clp/ticker")
+
+        with _mock_async_client(lambda request: httpx.Response(200, json={})):
+            asyncio.run(_run())
+
+        assert bucket.reserves == [5, 5, 0]
+
+    @patch.object(requests.Session, "get")
+    def test_get_waits_for_the_budget(self, mock_get):
+        mock_get.return_value = MagicMock(ok=True, json=MagicMock(return_value={}))
+        bucket = _RecordingBucket(waits=[0.5])
+        base_api_client = self._client(bucket)
+
+        base_api_client._get("markets/btc-clp/ticker")
+
+        assert bucket.reserves == [0, 0]
+        mock_get.assert_called_once()
+
+    @patch.object(requests.Session, "get")
+    def test_get_fails_without_calling_the_upstream_when_the_budget_is_exhausted(
+        self, mock_get
+    ):
+        base_api_client = self._client(_RecordingBucket(waits=[5.0]), max_wait=1.0)
+
+        with pytest.raises(RateLimitExceeded) as excinfo:
+            base_api_client._get("markets/btc-clp/ticker")
+
+        # Running out of budget is not retried, nor an upstream failure
+        assert excinfo.value.retry_after == 5.0
+        mock_get.assert_not_called()
+        assert base_api_client.circuit_breaker.state == "closed"
+
+    def test_rate_limiter_can_be_disabled(self):
+        with patch.object(settings, "BUDA_API_RATE_LIMIT", 0):
+            assert BaseAPIClient().rate_limiter is None
+
+    def test_rate_limiter_can_be_shared_through_sqlite(self):
+        path = os.path.join(tempfile.mkdtemp(), "rate_limit.db")
+
+        with patch.object(settings, "BUDA_API_RATE_LIMIT_DB_PATH", path):
+            rate_limiter = BaseAPIClient().rate_limiter
+
+        assert isinstance(rate_limiter.bucket, SQLiteTokenBucket)
+        assert rate_limiter.bucket.path == path
@@ -0,0 +1,362 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.cache import StaleWhileRevalidateCache, TTLCache
+from app.services.metrics import cache_requests
+
+
+class _FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return _FakeClock()
+
+
+@pytest.fixture
+def ttl_cache(clock):
+    return TTLCache(ttl=10, clock=clock)
+
+
+@pytest.fixture
+def swr_cache(clock):
+    return StaleWhileRevalidateCache(fresh_for=1, stale_for=10, clock=clock)
+
+
+def _wait_for(condition, timeout=1.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.001)
+
+
+class TestTTLCache:
+    def test_get_or_load_caches_value(self, ttl_cache):
+        loader = MagicMock(return_value="value")
+
+        assert ttl_cache.get_or_load("key", loader) == "value"
+        assert ttl_cache.get_or_load("key", loader) == "value"
+
+        loader.assert_called_once()
+
+    def test_get_or_load_reloads_expired_value(self, clock, ttl_cache):
+        loader = MagicMock(side_effect=["old", "new"])
+
+        assert ttl_cache.get_or_load("key", loader) == "old"
+
+        # Move the clock past the time to live
+        clock.advance(11)
+        assert ttl_cache.get_or_load("key", loader) == "new"
+
+        assert loader.call_count == 2
+
+    def test_get_or_load_does_not_cache_errors(self, ttl_cache):
+        loader = MagicMock(side_effect=[ValueError("boom"), "value"])
+
+        with pytest.raises(ValueError):
+            ttl_cache.get_or_load("key", loader)
+
+        assert ttl_cache.get_or_load("key", loader) == "value"
+
+    def test_get_or_load_with_disabled_cache_always_loads(self):
+        ttl_cache = TTLCache(ttl=0)
+        loader = MagicMock(return_value="value")
+
+        ttl_cache.get_or_load("key", loader)
+        ttl_cache.get_or_load("key", loader)
+
+        assert loader.call_count == 2
+
+    def test_invalidate_one_key(self, ttl_cache):
+        loader = MagicMock(return_value="value")
+        ttl_cache.get_or_load("key", loader)
+        ttl_cache.get_or_load("other_key", loader)
+
+        ttl_cache.invalidate("key")
+        ttl_cache.get_or_load("key", loader)
+        ttl_cache.get_or_load("other_key", loader)
+
+        assert loader.call_count == 3
+
+    def test_invalidate_all_keys(self, ttl_cache):
+        loader = MagicMock(return_value="value")
+        ttl_cache.get_or_load("key", loader)
+        ttl_cache.get_or_load("other_key", loader)
+
+        ttl_cache.invalidate()
+        ttl_cache.get_or_load("key", loader)
+        ttl_cache.get_or_load("other_key", loader)
+
+        assert loader.call_count == 4
+
+    def test_get_or_load_deduplicates_concurrent_refreshes(self, ttl_cache):
+        calls = []
+
+        def _slow_loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    ttl_cache.get_or_load("key", _slow_loader)
+                )
+            )
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["value"] * 10
+
+
+class TestStaleWhileRevalidateCache:
+    def test_get_or_load_serves_fresh_value_from_memory(self, swr_cache):
+        loader = MagicMock(return_value="value")
+
+        assert swr_cache.get_or_load("key", loader) == "value"
+        assert swr_cache.get_or_load("key", loader) == "value"
+
+        loader.assert_called_once()
+
+    def test_get_or_load_serves_stale_value_while_refreshing_once(
+        self, clock, swr_cache
+    ):
+        release_refresh = threading.Event()
+        loader = MagicMock(return_value="old")
+        swr_cache.get_or_load("key", loader)
+
+        def _slow_loader():
+            release_refresh.wait(1)
+            return "new"
+
+        slow_loader = MagicMock(side_effect=_slow_loader)
+        clock.advance(2)
+        # Every caller gets the stale value while one refresh is in flight
+        for _ in range(5):
+            assert swr_cache.get_or_load("key", slow_loader) == "old"
+        release_refresh.set()
+        _wait_for(lambda: swr_cache.get_or_load("key", slow_loader) == "new")
+
+        assert swr_cache.get_or_load("key", slow_loader) == "new"
+        slow_loader.assert_called_once()
+
+    def test_get_or_load_keeps_stale_value_when_refresh_fails(self, clock, swr_cache):
+        swr_cache.get_or_load("key", MagicMock(return_value="old"))
+        failing_loader = MagicMock(side_effect=ValueError("boom"))
+
+        clock.advance(2)
+        assert swr_cache.get_or_load("key", failing_loader) == "old"
+        _wait_for(lambda: not swr_cache._refreshing)
+
+        assert swr_cache.get_or_load("key", MagicMock()) == "old"
+
+    def test_get_or_load_blocks_on_too_old_value(self, clock, swr_cache):
+        swr_cache.get_or_load("key", MagicMock(return_value="old"))
+        loader = MagicMock(return_value="new")
+
+        # Move the clock past both the freshness and the staleness windows
+        clock.advance(20)
+        assert swr_cache.get_or_load("key", loader) == "new"
+
+        loader.assert_called_once()
+
+    def test_get_or_load_with_disabled_cache_always_loads(self):
+        swr_cache = StaleWhileRevalidateCache(fresh_for=0, stale_for=10)
+        loader = MagicMock(return_value="value")
+
+        swr_cache.get_or_load("key", loader)
+        swr_cache.get_or_load("key", loader)
+
+        assert loader.call_count == 2
+        assert swr_cache.age("key") is None
+
+    def test_age_reports_seconds_since_fetch(self, clock, swr_cache):
+        swr_cache.get_or_load("key", MagicMock(return_value="value"))
+
+        clock.advance(0.5)
+        assert swr_cache.age("key") == 0.5
+        assert swr_cache.age("other_key") is None
+
+    def test_get_or_load_with_age_reads_age_of_served_entry(self, clock, swr_cache):
+        swr_cache.get_or_load("key", MagicMock(return_value="old"))
+
+        clock.advance(0.5)
+        assert swr_cache.get_or_load_with_age("key", MagicMock()) == (
+            "old",
+            0.5,
+            False,
+        )
+
+        # Stale entries report their own age while the refresh runs
+        clock.advance(2)
+        refresh_loader = MagicMock(return_value="new")
+        assert swr_cache.get_or_load_with_age("key", refresh_loader) == (
+            "old",
+            2.5,
+            True,
+        )
+        _wait_for(lambda: not swr_cache._refreshing)
+        assert swr_cache.get_or_load_with_age("key", MagicMock()) == ("new", 0, False)
+
+    def test_lookups_are_counted_by_result(self, clock):
+        swr_cache = StaleWhileRevalidateCache(
+            fresh_for=1, stale_for=10, clock=clock, name="test_swr"
+        )
+        loader = MagicMock(return_value="value")
+
+        swr_cache.get_or_load("key", loader)
+        swr_cache.get_or_load("key", loader)
+        clock.advance(2)
+        swr_cache.get_or_load("key", loader)
+
+        counts = cache_requests.values()
+        assert counts[("test_swr", "miss")] == 1
+        assert counts[("test_swr", "hit")] == 1
+        assert counts[("test_swr", "stale")] == 1
+
+    def test_invalidate_all_keys(self, swr_cache):
+        loader = MagicMock(return_value="value")
+        swr_cache.get_or_load("key", loader)
+
+        swr_cache.invalidate()
+        swr_cache.get_or_load("key", loader)
+
+        assert loader.call_count == 2
+
+
+class TestStaleIfError:
+    def test_ttl_cache_serves_expired_value_when_reload_fails(self, clock):
+        ttl_cache = TTLCache(ttl=10, clock=clock, stale_if_error=60)
+        ttl_cache.get_or_load("key", MagicMock(return_value="old"))
+        failing_loader = MagicMock(side_effect=ValueError("boom"))
+
+        clock.advance(30)
+        assert ttl_cache.get_or_load("key", failing_loader) == "old"
+        failing_loader.assert_called_once()
+
+        # Past the stale-if-error window the error is raised
+        clock.advance(50)
+        with pytest.raises(ValueError):
+            ttl_cache.get_or_load("key", failing_loader)
+
+    def test_ttl_cache_without_stale_if_error_raises(self, clock, ttl_cache):
+        ttl_cache.get_or_load("key", MagicMock(return_value="old"))
+
+        clock.advance(11)
+        with pytest.raises(ValueError):
+            ttl_cache.get_or_load("key", MagicMock(side_effect=ValueError("boom")))
+
+    def test_ttl_cache_aget_or_load_serves_expired_value_when_reload_fails(self, clock):
+        ttl_cache = TTLCache(ttl=10, clock=clock, stale_if_error=60)
+        ttl_cache.get_or_load("key", MagicMock(return_value="old"))
+
+        clock.advance(30)
+        failing_loader = AsyncMock(side_effect=ValueError("boom"))
+        assert asyncio.run(ttl_cache.aget_or_load("key", failing_loader)) == "old"
+
+    def test_swr_cache_serves_too_old_value_as_stale_when_reload_fails(self, clock):
+        swr_cache = StaleWhileRevalidateCache(
+            fresh_for=1, stale_for=10, clock=clock, name="test_sie", stale_if_error=60
+        )
+        swr_cache.get_or_load("key", MagicMock(return_value="old"))
+        failing_loader = MagicMock(side_effect=ValueError("boom"))
+
+        clock.advance(20)
+        assert swr_cache.get_or_load_with_age("key", failing_loader) == (
+            "old",
+            20,
+            True,
+        )
+        assert cache_requests.values()[("test_sie", "stale_if_error")] == 1
+
+        clock.advance(60)
+        with pytest.raises(ValueError):
+            swr_cache.get_or_load("key", failing_loader)
+
+    def test_swr_cache_aget_or_load_serves_too_old_value_when_reload_fails(self, clock):
+        swr_cache = StaleWhileRevalidateCache(
+            fresh_for=1, stale_for=10, clock=clock, stale_if_error=60
+        )
+        swr_cache.get_or_load("key", MagicMock(return_value="old"))
+
+        clock.advance(20)
+        lookup = asyncio.run(
+            swr_cache.aget_or_load_with_age(
+                "key", AsyncMock(side_effect=ValueError("boom"))
+            )
+        )
+        assert lookup == ("old", 20, True)
+
+    def test_swr_cache_without_entry_raises(self, swr_cache):
+        with pytest.raises(ValueError):
+            swr_cache.get_or_load("key", MagicMock(side_effect=ValueError("boom")))
+
+
+class TestAsyncCacheLoading:
+    def test_ttl_cache_aget_or_load_deduplicates_concurrent_loads(self, ttl_cache):
+        calls = []
+
+        async def _slow_loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        async def _run():
+            results = await asyncio.gather(
+                *(ttl_cache.aget_or_load("key", _slow_loader) for _ in range(5))
+            )
+            return results + [await ttl_cache.aget_or_load("key", _slow_loader)]
+
+        assert asyncio.run(_run()) == ["value"] * 6
+        assert len(calls) == 1
+
+    def test_ttl_cache_aget_or_load_shares_values_with_get_or_load(self, ttl_cache):
+        loader = AsyncMock(return_value="value")
+
+        asyncio.run(ttl_cache.aget_or_load("key", loader))
+
+        assert ttl_cache.get_or_load("key", MagicMock()) == "value"
+        loader.assert_awaited_once()
+
+    def test_swr_cache_aget_or_load_serves_stale_value_while_refreshing(
+        self, clock, swr_cache
+    ):
+        async def _run():
+            await swr_cache.aget_or_load("key", AsyncMock(return_value="old"))
+            loader = AsyncMock(return_value="new")
+            clock.advance(2)
+            stale = await swr_cache.aget_or_load("key", loader)
+            # Let the background refresh complete
+            await asyncio.sleep(0.01)
+            fresh = await swr_cache.aget_or_load("key", loader)
+            return stale, fresh, loader
+
+        stale, fresh, loader = asyncio.run(_run())
+
+        assert (stale, fresh) == ("old", "new")
+        loader.assert_awaited_once()
+
+    def test_swr_cache_aget_or_load_blocks_on_too_old_value(self, clock, swr_cache):
+        async def _run():
+            await swr_cache.aget_or_load("key", AsyncMock(return_value="old"))
+            clock.advance(20)
+            return await swr_cache.aget_or_load("key", AsyncMock(return_value="new"))
+
+        assert asyncio.run(_run()) == "new"
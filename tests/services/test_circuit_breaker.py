@@ -0,0 +1,98 @@
+import pytest
+
+from app.services.circuit_breaker import CircuitBreaker
+
+
+class _FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return _FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+
+
+def _fail(breaker, times):
+    for _ in range(times):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+
+class TestCircuitBreaker:
+    def test_starts_closed(self, breaker):
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request()
+        assert breaker.retry_after() == 0.0
+
+    def test_opens_after_consecutive_failures(self, breaker):
+        _fail(breaker, 3)
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+        assert breaker.stats() == {
+            "state": "open",
+            "consecutive_failures": 3,
+            "rejected": 1,
+        }
+
+    def test_successes_reset_the_failure_count(self, breaker):
+        _fail(breaker, 2)
+        breaker.record_success()
+        _fail(breaker, 2)
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_lets_one_probe_through_after_the_reset_timeout(self, clock, breaker):
+        _fail(breaker, 3)
+
+        clock.advance(4)
+        assert breaker.retry_after() == 6
+        clock.advance(6)
+
+        # Only the first caller probes the upstream
+        assert breaker.allow_request()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker.allow_request()
+
+    def test_successful_probe_closes(self, clock, breaker):
+        _fail(breaker, 3)
+        clock.advance(10)
+        breaker.allow_request()
+
+        breaker.record_success()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request()
+
+    def test_failed_probe_opens_again(self, clock, breaker):
+        _fail(breaker, 3)
+        clock.advance(10)
+        breaker.allow_request()
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+        assert breaker.retry_after() == 10
+
+    def test_probe_without_outcome_is_retried_after_the_reset_timeout(
+        self, clock, breaker
+    ):
+        _fail(breaker, 3)
+        clock.advance(10)
+        assert breaker.allow_request()
+
+        clock.advance(10)
+        assert breaker.allow_request()
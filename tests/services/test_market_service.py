@@ -35,3 +35,32 @@ class TestMarketService:
 
         # Assert that the response data matches the expected data
         assert response == SAMPLE_MARKET_DATA_ID_1
+
+    @patch.object(MarketService, "_get", return_value=SAMPLE_MARKETS_DATA)
+    def test_market_service_get_all_is_cached(self, mock_get, market_service):
+        # Call the get_all method twice
+        market_service.get_all()
+        response = market_service.get_all()
+
+        # Assert that the BUDA API was only reached once
+        mock_get.assert_called_once_with("markets")
+        assert response == SAMPLE_MARKETS_DATA
+
+    @patch.object(MarketService, "_get", return_value=SAMPLE_MARKET_DATA_ID_1)
+    def test_market_service_get_one_by_id_is_cached(self, mock_get, market_service):
+        # Call the get_one_by_id method twice
+        market_service.get_one_by_id("market_1")
+        market_service.get_one_by_id("market_1")
+
+        # Assert that the BUDA API was only reached once
+        mock_get.assert_called_once_with("markets/market_1")
+
+    @patch.object(MarketService, "_get", return_value=SAMPLE_MARKETS_DATA)
+    def test_market_service_invalidate_cache(self, mock_get, market_service):
+        # Call the get_all method around a cache invalidation
+        market_service.get_all()
+        market_service.invalidate_cache()
+        market_service.get_all()
+
+        # Assert that the BUDA API was reached again after the invalidation
+        assert mock_get.call_count == 2
@@ -0,0 +1,119 @@
+import threading
+
+from app.services.metrics import (
+    CallbackCounter,
+    CallbackGauge,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+)
+
+
+class TestCounter:
+    def test_inc_adds_up_every_thread(self):
+        counter = Counter("requests_total", "Requests.", ("result",))
+
+        def _count():
+            for _ in range(1000):
+                counter.inc("hit")
+
+        threads = [threading.Thread(target=_count) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.inc("miss", amount=2)
+
+        assert counter.values() == {("hit",): 8000.0, ("miss",): 2.0}
+
+    def test_inc_spreads_threads_over_shards(self):
+        counter = Counter("requests_total", "Requests.", ("result",))
+        threads = [
+            threading.Thread(target=counter.inc, args=("hit",)) for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        used_shards = [shard for shard in counter._shards if shard.values]
+        assert len(used_shards) > 1
+
+    def test_render_uses_prometheus_text_format(self):
+        counter = Counter("requests_total", "Requests.", ("path",))
+        counter.inc('markets/"x"')
+
+        assert counter.render() == [
+            "# HELP requests_total Requests.",
+            "# TYPE requests_total counter",
+            'requests_total{path="markets/\\"x\\""} 1',
+        ]
+
+
+class TestGauge:
+    def test_dec_subtracts_from_gauge(self):
+        gauge = Gauge("in_flight", "In flight.", ())
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        assert gauge.render()[-1] == "in_flight 1"
+
+
+class TestHistogram:
+    def test_render_cumulates_buckets(self):
+        histogram = Histogram(
+            "latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)
+        )
+        for value in [0.05, 0.1, 0.5, 3.0]:
+            histogram.observe(value, "/spreads")
+
+        assert histogram.render()[2:] == [
+            'latency_seconds_bucket{route="/spreads",le="0.1"} 2',
+            'latency_seconds_bucket{route="/spreads",le="1"} 3',
+            'latency_seconds_bucket{route="/spreads",le="+Inf"} 4',
+            'latency_seconds_sum{route="/spreads"} 3.65',
+            'latency_seconds_count{route="/spreads"} 4',
+        ]
+
+
+class TestMetricsRegistry:
+    def test_render_includes_every_metric(self):
+        registry = MetricsRegistry()
+        counter = registry.register(Counter("a_total", "A.", ()))
+        registry.register(
+            CallbackCounter("b_total", "B.", ("result",), lambda: {("executed",): 3})
+        )
+        counter.inc()
+
+        assert registry.render() == (
+            "# HELP a_total A.\n"
+            "# TYPE a_total counter\n"
+            "a_total 1\n"
+            "# HELP b_total B.\n"
+            "# TYPE b_total counter\n"
+            'b_total{result="executed"} 3\n'
+        )
+
+
+class TestCallbackGauge:
+    def test_render_reads_values_at_collection_time(self):
+        state = {"value": "closed"}
+        gauge = CallbackGauge(
+            "breaker_state",
+            "Breaker state.",
+            ("state",),
+            lambda: {
+                (name,): float(name == state["value"]) for name in ("closed", "open")
+            },
+        )
+
+        state["value"] = "open"
+
+        assert gauge.render() == [
+            "# HELP breaker_state Breaker state.",
+            "# TYPE breaker_state gauge",
+            'breaker_state{state="closed"} 0',
+            'breaker_state{state="open"} 1',
+        ]
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.services.markets import MarketService
+from app.services.poller import MarketDataPoller
+from app.services.ticker_book import TickerBook
+from app.services.tickers import TickerService
+
+from config import SAMPLE_ALL_TICKERS_DATA, SAMPLE_MARKETS_DATA
+
+
+@pytest.fixture
+def poller():
+    return MarketDataPoller(
+        markets=MarketService(),
+        tickers=TickerService(),
+        ticker_book=TickerBook(max_age=10),
+        interval=0.01,
+    )
+
+
+class TestMarketDataPoller:
+    @patch.object(MarketService, "aget_all", return_value=SAMPLE_MARKETS_DATA)
+    @patch.object(TickerService, "aget_all", return_value=SAMPLE_ALL_TICKERS_DATA)
+    def test_poll_once_updates_ticker_book(
+        self, mock_get_all_tickers, mock_get_all_markets, poller
+    ):
+        asyncio.run(poller.poll_once())
+
+        # Assert the tickers were fetched fresh for every listed market
+        mock_get_all_tickers.assert_called_once_with(
+            market_ids=["market_1", "market_2", "market_3"], use_cache=False
+        )
+        assert poller.ticker_book.get_all() == SAMPLE_ALL_TICKERS_DATA["tickers"]
+
+    @patch.object(MarketService, "aget_all", return_value=SAMPLE_MARKETS_DATA)
+    @patch.object(TickerService, "aget_all", return_value=SAMPLE_ALL_TICKERS_DATA)
+    def test_poll_once_publishes_spreads(
+        self, mock_get_all_tickers, mock_get_all_markets, poller
+    ):
+        poller.spread_feed = MagicMock()
+
+        asyncio.run(poller.poll_once())
+
+        # Assert the spread of every market was published at once
+        spreads = poller.spread_feed.publish.call_args.args[0]
+        assert [spread["market_id"] for spread in spreads] == [
+            "market_1",
+            "market_2",
+            "market_3",
+        ]
+        assert spreads[0]["value"] == 100.0
+
+    @patch.object(MarketDataPoller, "poll_once")
+    def test_start_and_stop_poll_in_background(self, mock_poll_once, poller):
+        async def _run():
+            poller.start()
+            assert poller.is_running is True
+            await asyncio.sleep(0.05)
+            await poller.stop()
+
+        asyncio.run(_run())
+
+        assert poller.is_running is False
+        assert mock_poll_once.call_count > 1
+
+    @patch.object(MarketDataPoller, "poll_once")
+    def test_run_keeps_polling_after_a_failed_poll(self, mock_poll_once, poller):
+        mock_poll_once.side_effect = [ValueError("boom"), None, None]
+
+        async def _run():
+            poller.start()
+            await asyncio.sleep(0.05)
+            await poller.stop()
+
+        asyncio.run(_run())
+
+        assert mock_poll_once.call_count >= 2
+
+    @patch.object(MarketDataPoller, "poll_once")
+    def test_retain_polls_until_last_release(self, mock_poll_once, poller):
+        async def _run():
+            poller.retain()
+            poller.retain()
+            await asyncio.sleep(0.01)
+            assert poller.is_running is True
+            await poller.release()
+            assert poller.is_running is True
+            await poller.release()
+            assert poller.is_running is False
+
+        asyncio.run(_run())
+
+        mock_poll_once.assert_called()
+
+    @patch.object(MarketDataPoller, "poll_once")
+    def test_release_keeps_started_poller_running(self, mock_poll_once, poller):
+        async def _run():
+            poller.start()
+            poller.retain()
+            await poller.release()
+            is_running = poller.is_running
+            await poller.stop()
+            return is_running
+
+        assert asyncio.run(_run()) is True
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from app.services.rate_limiter import (
+    HIGH_PRIORITY,
+    LOW_PRIORITY,
+    RateLimitExceeded,
+    RateLimiter,
+    SQLiteTokenBucket,
+    TokenBucket,
+)
+
+
+class _FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return _FakeClock()
+
+
+@pytest.fixture
+def bucket(clock):
+    return TokenBucket(rate=2, capacity=4, clock=clock)
+
+
+def _database_path():
+    return os.path.join(tempfile.mkdtemp(), "rate_limit.db")
+
+
+class TestTokenBucket:
+    def test_allows_a_burst_up_to_the_capacity(self, bucket):
+        assert [bucket.try_take() for _ in range(5)] == [0, 0, 0, 0, 0.5]
+
+    def test_refills_at_the_rate(self, clock, bucket):
+        for _ in range(4):
+            bucket.try_take()
+
+        clock.advance(1)
+        assert [bucket.try_take() for _ in range(3)] == [0, 0, 0.5]
+
+    def test_never_holds_more_than_the_capacity(self, clock, bucket):
+        clock.advance(60)
+
+        assert [bucket.try_take() for _ in range(5)] == [0, 0, 0, 0, 0.5]
+
+    def test_reserve_is_left_in_the_bucket(self, bucket):
+        # Two of the four tokens are kept for callers without a reserve
+        assert [bucket.try_take(reserve=2) for _ in range(3)] == [0, 0, 0.5]
+        assert [bucket.try_take() for _ in range(3)] == [0, 0, 0.5]
+
+
+class TestSQLiteTokenBucket:
+    def test_processes_share_the_budget(self, clock):
+        path = _database_path()
+        first = SQLiteTokenBucket(path, rate=2, capacity=4, clock=clock)
+        second = SQLiteTokenBucket(path, rate=2, capacity=4, clock=clock)
+
+        assert [first.try_take(), second.try_take()] == [0, 0]
+        assert [first.try_take(), second.try_take()] == [0, 0]
+        assert second.try_take() == 0.5
+
+        clock.advance(0.5)
+        assert first.try_take() == 0
+
+        first.close()
+        second.close()
+
+    def test_separate_names_have_separate_budgets(self, clock):
+        path = _database_path()
+        first = SQLiteTokenBucket(path, rate=1, capacity=1, name="a", clock=clock)
+        second = SQLiteTokenBucket(path, rate=1, capacity=1, name="b", clock=clock)
+
+        assert [first.try_take(), second.try_take()] == [0, 0]
+        assert first.try_take() == 1
+
+    def test_reserve_is_left_in_the_bucket(self, clock):
+        bucket = SQLiteTokenBucket(_database_path(), rate=1, capacity=3, clock=clock)
+
+        assert [bucket.try_take(reserve=2), bucket.try_take(reserve=2)] == [0, 1]
+        assert [bucket.try_take(), bucket.try_take(), bucket.try_take()] == [0, 0, 1]
+
+
+class TestRateLimiter:
+    def _limiter(self, bucket, clock, **kwargs):
+        return RateLimiter(bucket, sleep=clock.advance, clock=clock, **kwargs)
+
+    def test_acquire_waits_for_a_token(self, clock, bucket):
+        rate_limiter = self._limiter(bucket, clock, max_wait=1)
+
+        waits = [rate_limiter.acquire() for _ in range(6)]
+
+        assert waits == [0, 0, 0, 0, 0.5, 0.5]
+
+    def test_acquire_fails_after_max_wait(self, clock, bucket):
+        rate_limiter = self._limiter(bucket, clock, max_wait=0.2)
+        for _ in range(4):
+            rate_limiter.acquire()
+
+        with pytest.raises(RateLimitExceeded) as excinfo:
+            rate_limiter.acquire()
+
+        assert excinfo.value.retry_after == 0.5
+
+    def test_low_priority_leaves_the_reserve(self, clock, bucket):
+        rate_limiter = self._limiter(bucket, clock, max_wait=0, low_priority_reserve=3)
+
+        rate_limiter.acquire(LOW_PRIORITY)
+        with pytest.raises(RateLimitExceeded):
+            rate_limiter.acquire(LOW_PRIORITY)
+
+        # Single-market requests still have three tokens
+        for _ in range(3):
+            assert rate_limiter.acquire(HIGH_PRIORITY) == 0
+
+    def test_aacquire_waits_without_blocking_the_event_loop(self):
+        rate_limiter = RateLimiter(TokenBucket(rate=50, capacity=1), max_wait=1)
+
+        async def _run():
+            return await asyncio.gather(
+                rate_limiter.aacquire(), rate_limiter.aacquire()
+            )
+
+        first, second = sorted(asyncio.run(_run()))
+        assert first == 0
+        assert second > 0
+
+    def test_aacquire_takes_shared_tokens_in_a_thread(self):
+        bucket = SQLiteTokenBucket(_database_path(), rate=1, capacity=2)
+        rate_limiter = RateLimiter(bucket, max_wait=0)
+
+        async def _run():
+            await rate_limiter.aacquire()
+            await rate_limiter.aacquire()
+            await rate_limiter.aacquire()
+
+        with pytest.raises(RateLimitExceeded):
+            asyncio.run(_run())
+        rate_limiter.close()
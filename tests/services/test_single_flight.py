@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.single_flight import AsyncSingleFlight, SingleFlight
+
+
+@pytest.fixture
+def single_flight():
+    return SingleFlight()
+
+
+def _run_concurrently(target, number_of_threads):
+    threads = [threading.Thread(target=target) for _ in range(number_of_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class TestSingleFlight:
+    def test_do_returns_function_result(self, single_flight):
+        assert single_flight.do("key", lambda: "value") == "value"
+        assert single_flight.stats() == {"executed": 1, "collapsed": 0}
+
+    def test_do_collapses_concurrent_calls_for_same_key(self, single_flight):
+        calls = []
+        results = []
+        started = threading.Barrier(10)
+
+        def _slow_call():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        def _caller():
+            started.wait()
+            results.append(single_flight.do("key", _slow_call))
+
+        _run_concurrently(_caller, 10)
+
+        assert len(calls) == 1
+        assert results == ["value"] * 10
+        assert single_flight.stats() == {"executed": 1, "collapsed": 9}
+
+    def test_do_shares_errors_with_every_caller(self, single_flight):
+        errors = []
+        started = threading.Barrier(5)
+
+        def _failing_call():
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        def _caller():
+            started.wait()
+            try:
+                single_flight.do("key", _failing_call)
+            except ValueError as err:
+                errors.append(err)
+
+        _run_concurrently(_caller, 5)
+
+        assert len(errors) == 5
+        assert single_flight.stats()["executed"] == 1
+
+    def test_do_runs_sequential_calls_again(self, single_flight):
+        single_flight.do("key", lambda: "first")
+
+        assert single_flight.do("key", lambda: "second") == "second"
+        assert single_flight.stats() == {"executed": 2, "collapsed": 0}
+
+    def test_do_does_not_collapse_different_keys(self, single_flight):
+        single_flight.do("key", lambda: "value")
+        single_flight.do("other_key", lambda: "value")
+
+        assert single_flight.stats() == {"executed": 2, "collapsed": 0}
+
+
+class TestAsyncSingleFlight:
+    def test_do_collapses_concurrent_calls_for_same_key(self):
+        single_flight = AsyncSingleFlight()
+        calls = []
+
+        async def _slow_call():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        async def _run():
+            return await asyncio.gather(
+                *(single_flight.do("key", _slow_call) for _ in range(10))
+            )
+
+        assert asyncio.run(_run()) == ["value"] * 10
+        assert len(calls) == 1
+        assert single_flight.stats() == {"executed": 1, "collapsed": 9}
+
+    def test_do_shares_errors_with_every_caller(self):
+        single_flight = AsyncSingleFlight()
+
+        async def _failing_call():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def _run():
+            return await asyncio.gather(
+                *(single_flight.do("key", _failing_call) for _ in range(3)),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(_run())
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert single_flight.stats()["executed"] == 1
+
+    def test_do_keeps_call_running_when_a_caller_is_cancelled(self):
+        single_flight = AsyncSingleFlight()
+
+        async def _slow_call():
+            await asyncio.sleep(0.02)
+            return "value"
+
+        async def _run():
+            cancelled_caller = asyncio.ensure_future(
+                single_flight.do("key", _slow_call)
+            )
+            other_caller = asyncio.ensure_future(single_flight.do("key", _slow_call))
+            await asyncio.sleep(0)
+            cancelled_caller.cancel()
+            return await other_caller
+
+        assert asyncio.run(_run()) == "value"
+
+    def test_do_runs_sequential_calls_again(self):
+        single_flight = AsyncSingleFlight()
+
+        async def _call():
+            return "value"
+
+        async def _run():
+            await single_flight.do("key", _call)
+            await asyncio.sleep(0)
+            return await single_flight.do("key", _call)
+
+        assert asyncio.run(_run()) == "value"
+        assert single_flight.stats() == {"executed": 2, "collapsed": 0}
@@ -0,0 +1,79 @@
+import pytest
+
+from app.services.spread_candles import Candle, SpreadCandles
+
+
+def _spread(market_id, value):
+    return {"market_id": market_id, "min_ask": value, "max_bid": 0.0, "value": value}
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 3600.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _FakeClock()
+
+
+@pytest.fixture
+def spread_candles(clock):
+    return SpreadCandles(max_candles=2, clock=clock)
+
+
+def _feed(spread_candles, clock, samples):
+    for timestamp, value in samples:
+        clock.now = timestamp
+        spread_candles.on_spreads([_spread("market_1", value)])
+
+
+class TestSpreadCandles:
+    def test_spreads_of_one_period_build_one_candle(self, spread_candles, clock):
+        _feed(
+            spread_candles, clock, [(3600, 5.0), (3610, 9.0), (3620, 1.0), (3659, 3.0)]
+        )
+
+        assert spread_candles.get_candles("MARKET_1", "1m") == [
+            Candle(
+                start=3600.0, open=5.0, high=9.0, low=1.0, close=3.0, mean=4.5, count=4
+            )
+        ]
+
+    def test_spread_of_later_period_closes_candle(self, spread_candles, clock):
+        _feed(spread_candles, clock, [(3600, 5.0), (3665, 7.0), (3790, 2.0)])
+
+        assert spread_candles.get_candles("market_1", "1m") == [
+            Candle(3600.0, 5.0, 5.0, 5.0, 5.0, 5.0, 1),
+            Candle(3660.0, 7.0, 7.0, 7.0, 7.0, 7.0, 1),
+            Candle(3780.0, 2.0, 2.0, 2.0, 2.0, 2.0, 1),
+        ]
+        assert spread_candles.get_candles("market_1", "5m") == [
+            Candle(3600.0, 5.0, 7.0, 2.0, 2.0, pytest.approx(14 / 3), 3)
+        ]
+
+    def test_only_latest_closed_candles_are_kept(self, spread_candles, clock):
+        _feed(
+            spread_candles, clock, [(3600 + 60 * minute, minute) for minute in range(5)]
+        )
+
+        candles = spread_candles.get_candles("market_1", "1m")
+        assert [candle.start for candle in candles] == [3720.0, 3780.0, 3840.0]
+        assert spread_candles.get_candles("market_1", "1m", limit=1) == candles[-1:]
+
+    def test_spread_of_closed_period_is_ignored(self, spread_candles, clock):
+        _feed(spread_candles, clock, [(3665, 7.0), (3600, 5.0)])
+
+        assert spread_candles.get_candles("market_1", "1m") == [
+            Candle(3660.0, 7.0, 7.0, 7.0, 7.0, 7.0, 1)
+        ]
+
+    def test_get_candles_of_unknown_market(self, spread_candles):
+        assert spread_candles.get_candles("market_1", "1h") == []
+
+    def test_get_candles_fails_with_unknown_interval(self, spread_candles):
+        with pytest.raises(KeyError):
+            spread_candles.get_candles("market_1", "1d")
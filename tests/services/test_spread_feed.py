@@ -0,0 +1,138 @@
+import pytest
+from unittest.mock import MagicMock
+
+from app.services.spread_feed import SpreadFeed, SpreadSampler
+
+
+@pytest.fixture
+def spread_feed():
+    return SpreadFeed()
+
+
+SAMPLE_SPREADS = [
+    {"market_id": "market_1", "min_ask": 1000.0, "max_bid": 900.0, "value": 100.0}
+]
+
+
+class TestSpreadFeed:
+    def test_publish_calls_every_listener(self, spread_feed):
+        listeners = [MagicMock(), MagicMock()]
+        for listener in listeners:
+            spread_feed.subscribe(listener)
+
+        spread_feed.publish(SAMPLE_SPREADS)
+
+        for listener in listeners:
+            listener.assert_called_once_with(SAMPLE_SPREADS)
+
+    def test_publish_isolates_failing_listeners(self, spread_feed):
+        failing_listener = MagicMock(side_effect=ValueError("boom"))
+        listener = MagicMock()
+        spread_feed.subscribe(failing_listener)
+        spread_feed.subscribe(listener)
+
+        spread_feed.publish(SAMPLE_SPREADS)
+
+        listener.assert_called_once_with(SAMPLE_SPREADS)
+
+    def test_publish_skips_empty_batches(self, spread_feed):
+        listener = MagicMock()
+        spread_feed.subscribe(listener)
+
+        spread_feed.publish([])
+
+        listener.assert_not_called()
+
+    def test_unsubscribe_stops_calls(self, spread_feed):
+        listener = MagicMock()
+        spread_feed.subscribe(listener)
+        spread_feed.unsubscribe(listener)
+
+        spread_feed.publish(SAMPLE_SPREADS)
+
+        listener.assert_not_called()
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _spread(min_ask, market_id="market_1"):
+    return {
+        "market_id": market_id,
+        "min_ask": min_ask,
+        "max_bid": 900.0,
+        "value": min_ask - 900.0,
+    }
+
+
+class TestSpreadSampler:
+    @pytest.fixture
+    def clock(self):
+        return _FakeClock()
+
+    @pytest.fixture
+    def samples(self, spread_feed, clock):
+        listener = MagicMock()
+        spread_feed.subscribe(listener)
+        sampler = SpreadSampler(spread_feed, min_interval=1.0, clock=clock)
+        return sampler, listener
+
+    def test_first_spread_of_a_market_is_sampled(self, samples):
+        sampler, listener = samples
+
+        sampler.on_spreads([_spread(1000.0)])
+
+        listener.assert_called_once_with([_spread(1000.0)])
+
+    def test_unchanged_spreads_are_not_sampled(self, samples, clock):
+        sampler, listener = samples
+
+        # The same cached ticker served by many requests
+        for _ in range(50):
+            sampler.on_spreads([_spread(1000.0)])
+            clock.now += 0.5
+
+        listener.assert_called_once()
+
+    def test_changes_are_sampled_at_most_once_per_interval(self, samples, clock):
+        sampler, listener = samples
+        sampler.on_spreads([_spread(1000.0)])
+
+        # A change within the interval is left for the next spread published
+        clock.now = 0.5
+        sampler.on_spreads([_spread(1001.0)])
+        clock.now = 1.0
+        sampler.on_spreads([_spread(1001.0)])
+
+        assert [call.args[0] for call in listener.call_args_list] == [
+            [_spread(1000.0)],
+            [_spread(1001.0)],
+        ]
+
+    def test_markets_are_sampled_independently(self, samples):
+        sampler, listener = samples
+        sampler.on_spreads([_spread(1000.0)])
+
+        sampler.on_spreads([_spread(1000.0), _spread(500.0, market_id="market_2")])
+
+        assert listener.call_args_list[-1].args[0] == [
+            _spread(500.0, market_id="market_2")
+        ]
+
+
+class TestSampledListeners:
+    def test_history_and_candles_skip_spreads_served_from_cache(self):
+        from app.services import spread_candles, spread_feed, spread_history
+
+        # The same cached ticker served by many requests
+        spread = _spread(1000.0, market_id="sampled_market")
+        for _ in range(50):
+            spread_feed.publish([spread])
+
+        assert len(spread_history.get_range("sampled_market").value) == 1
+        assert spread_candles.get_candles("sampled_market", "1m")[-1].count == 1
@@ -0,0 +1,84 @@
+import pytest
+
+from app.services.spread_history import SpreadHistory, SpreadRingBuffer
+
+
+def _spread(market_id, value):
+    return {
+        "market_id": market_id,
+        "min_ask": value + 10,
+        "max_bid": 10.0,
+        "value": value,
+    }
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSpreadRingBuffer:
+    def test_get_range_returns_samples_oldest_first(self):
+        buffer = SpreadRingBuffer(capacity=5)
+        for timestamp in range(3):
+            buffer.append(timestamp, 20.0, 10.0, float(timestamp))
+
+        samples = buffer.get_range()
+
+        assert samples.timestamp.tolist() == [0.0, 1.0, 2.0]
+        assert samples.value.tolist() == [0.0, 1.0, 2.0]
+        assert samples.min_ask.tolist() == [20.0] * 3
+
+    def test_full_buffer_overwrites_oldest_samples(self):
+        buffer = SpreadRingBuffer(capacity=3)
+        for timestamp in range(7):
+            buffer.append(timestamp, 20.0, 10.0, float(timestamp))
+
+        assert len(buffer) == 3
+        assert buffer.get_range().timestamp.tolist() == [4.0, 5.0, 6.0]
+
+    @pytest.mark.parametrize(
+        "start, end, expected",
+        [
+            (5, 7, [5.0, 6.0, 7.0]),
+            (None, 4, [3.0, 4.0]),
+            (6.5, None, [7.0, 8.0]),
+            (9, None, []),
+            (7, 5, []),
+        ],
+    )
+    def test_get_range_filters_wrapped_samples(self, start, end, expected):
+        buffer = SpreadRingBuffer(capacity=6)
+        for timestamp in range(9):
+            buffer.append(timestamp, 20.0, 10.0, float(timestamp))
+
+        samples = buffer.get_range(start, end)
+
+        assert samples.timestamp.tolist() == expected
+        assert samples.value.tolist() == expected
+
+    def test_get_range_of_empty_buffer(self):
+        assert SpreadRingBuffer(capacity=3).get_range().timestamp.tolist() == []
+
+
+class TestSpreadHistory:
+    def test_on_spreads_records_every_market(self):
+        clock = _FakeClock()
+        history = SpreadHistory(capacity=10, clock=clock)
+
+        history.on_spreads([_spread("market_1", 5.0), _spread("market_2", 7.0)])
+        clock.now += 1
+        history.on_spreads([_spread("MARKET_1", 6.0)])
+
+        samples = history.get_range("Market_1")
+        assert samples.timestamp.tolist() == [1000.0, 1001.0]
+        assert samples.value.tolist() == [5.0, 6.0]
+        assert samples.min_ask.tolist() == [15.0, 16.0]
+        assert samples.max_bid.tolist() == [10.0, 10.0]
+        assert history.get_range("market_2", start=1001.0).value.tolist() == []
+
+    def test_get_range_of_unknown_market(self):
+        assert SpreadHistory(capacity=10).get_range("market_1") is None
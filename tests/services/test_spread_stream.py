@@ -0,0 +1,95 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.spread_stream import SpreadBroadcaster
+
+
+def _spread(market_id, min_ask, max_bid):
+    return {
+        "market_id": market_id,
+        "min_ask": min_ask,
+        "max_bid": max_bid,
+        "value": min_ask - max_bid,
+    }
+
+
+@pytest.fixture
+def broadcaster():
+    return SpreadBroadcaster(max_subscribers=2)
+
+
+class TestSpreadBroadcaster:
+    def test_subscribe_seeds_latest_spreads(self, broadcaster):
+        broadcaster.publish([_spread("market_1", 10, 9), _spread("market_2", 5, 4)])
+
+        async def _run():
+            subscription = broadcaster.subscribe(market_ids={"MARKET_2"})
+            return await subscription.next_changes()
+
+        assert asyncio.run(_run()) == [_spread("market_2", 5, 4)]
+
+    def test_publish_forwards_only_changed_spreads(self, broadcaster):
+        async def _run():
+            subscription = broadcaster.subscribe()
+            broadcaster.publish([_spread("market_1", 10, 9)])
+            first = await subscription.next_changes()
+            broadcaster.publish([_spread("market_1", 10, 9), _spread("market_2", 5, 4)])
+            second = await subscription.next_changes()
+            return first, second
+
+        first, second = asyncio.run(_run())
+
+        assert first == [_spread("market_1", 10, 9)]
+        assert second == [_spread("market_2", 5, 4)]
+
+    def test_slow_subscriber_receives_conflated_latest_spread(self, broadcaster):
+        async def _run():
+            subscription = broadcaster.subscribe()
+            for min_ask in range(10, 20):
+                broadcaster.publish([_spread("market_1", min_ask, 9)])
+            await asyncio.sleep(0)
+            return subscription, await subscription.next_changes()
+
+        subscription, changes = asyncio.run(_run())
+
+        assert changes == [_spread("market_1", 19, 9)]
+        assert subscription.conflated == 9
+
+    def test_publish_from_another_thread(self, broadcaster):
+        async def _run():
+            subscription = broadcaster.subscribe()
+            thread = threading.Thread(
+                target=broadcaster.publish, args=([_spread("market_1", 10, 9)],)
+            )
+            thread.start()
+            changes = await asyncio.wait_for(subscription.next_changes(), timeout=1)
+            thread.join()
+            return changes
+
+        assert asyncio.run(_run()) == [_spread("market_1", 10, 9)]
+
+    def test_subscribe_fails_when_full(self, broadcaster):
+        async def _run():
+            broadcaster.subscribe()
+            broadcaster.subscribe()
+            with pytest.raises(OverflowError):
+                broadcaster.subscribe()
+
+        asyncio.run(_run())
+        assert broadcaster.subscriber_count == 2
+
+    def test_close_all_ends_subscriptions_after_draining(self, broadcaster):
+        async def _run():
+            subscription = broadcaster.subscribe()
+            broadcaster.publish([_spread("market_1", 10, 9)])
+            broadcaster.close_all()
+            await asyncio.sleep(0)
+            return [
+                await subscription.next_changes(),
+                await subscription.next_changes(),
+            ]
+
+        assert asyncio.run(_run()) == [[_spread("market_1", 10, 9)], None]
+        assert broadcaster.subscriber_count == 0
@@ -0,0 +1,45 @@
+import pytest
+from unittest.mock import patch
+
+from app.services.ticker_book import TickerBook
+
+from config import SAMPLE_ALL_TICKERS_DATA
+
+
+@pytest.fixture
+def ticker_book():
+    return TickerBook(max_age=10)
+
+
+class TestTickerBook:
+    def test_ticker_book_starts_empty(self, ticker_book):
+        assert ticker_book.is_ready is False
+        assert ticker_book.get_all() == []
+        assert ticker_book.get("market_1") is None
+        assert ticker_book.age() is None
+        assert ticker_book.version == 0
+
+    def test_ticker_book_update_replaces_snapshot(self, ticker_book):
+        ticker_book.update(SAMPLE_ALL_TICKERS_DATA["tickers"])
+
+        assert ticker_book.is_ready is True
+        assert ticker_book.get_all() == SAMPLE_ALL_TICKERS_DATA["tickers"]
+        assert ticker_book.version == 1
+
+    def test_ticker_book_get_ignores_market_id_case(self, ticker_book):
+        ticker_book.update(SAMPLE_ALL_TICKERS_DATA["tickers"])
+
+        assert ticker_book.get("MARKET_2") == SAMPLE_ALL_TICKERS_DATA["tickers"][1]
+        assert ticker_book.get("unknown_market") is None
+
+    @patch("app.services.ticker_book.time")
+    def test_ticker_book_is_not_ready_once_too_old(self, mock_time, ticker_book):
+        mock_time.monotonic.return_value = 100
+        ticker_book.update(SAMPLE_ALL_TICKERS_DATA["tickers"])
+
+        mock_time.monotonic.return_value = 109
+        assert ticker_book.is_ready is True
+        assert ticker_book.age() == 9
+
+        mock_time.monotonic.return_value = 111
+        assert ticker_book.is_ready is False
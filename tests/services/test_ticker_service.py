@@ -1,8 +1,19 @@
+import asyncio
+import threading
+import time
+
 import pytest
 from unittest.mock import MagicMock, patch
+from requests import HTTPError
+
 from app.services.tickers import TickerService
 
-from config import SAMPLE_TICKER_DATA_MARKET_1
+from config import settings
+from config import (
+    SAMPLE_ALL_TICKERS_DATA,
+    SAMPLE_TICKER_DATA_MARKET_1,
+    SAMPLE_TICKERS_DATA_SET,
+)
 
 
 @pytest.fixture
@@ -24,3 +35,255 @@ class TestTickerService:
 
         # Assert that the response data matches the expected data
         assert response == SAMPLE_TICKER_DATA_MARKET_1
+
+    @patch.object(TickerService, "_get", return_value=SAMPLE_TICKER_DATA_MARKET_1)
+    def test_ticker_service_get_one_by_market_id_is_cached(
+        self, mock_get, ticker_service
+    ):
+        # Call the get_one_by_market_id method twice
+        ticker_service.get_one_by_market_id("market_1")
+        response = ticker_service.get_one_by_market_id("market_1")
+
+        # Assert that the BUDA API was only reached once and the age is tracked
+        mock_get.assert_called_once_with("markets/market_1/ticker")
+        assert response == SAMPLE_TICKER_DATA_MARKET_1
+        lookup = ticker_service.get_one_with_age_by_market_id("market_1")
+        assert lookup.value == SAMPLE_TICKER_DATA_MARKET_1
+        assert lookup.age < 1
+        assert not lookup.is_stale
+        mock_get.assert_called_once()
+
+    @patch.object(TickerService, "get_one_by_market_id")
+    def test_ticker_service_get_many_by_market_ids_keeps_order(
+        self, mock_get_one_by_market_id, ticker_service
+    ):
+        # Answer the first markets last so completion order differs from request order
+        delays = {"market_1": 0.03, "market_2": 0.02, "market_3": 0.0}
+
+        def _get_one(market_id, use_cache=True):
+            time.sleep(delays[market_id])
+            return {"ticker": {"market_id": market_id}}
+
+        mock_get_one_by_market_id.side_effect = _get_one
+
+        # Call the get_many_by_market_ids method
+        response = ticker_service.get_many_by_market_ids(list(delays))
+
+        # Assert the tickers come back in the requested order
+        assert [ticker["ticker"]["market_id"] for ticker in response] == list(delays)
+        assert mock_get_one_by_market_id.call_count == len(delays)
+
+    @patch.object(settings, "TICKER_FETCH_MAX_WORKERS", 2)
+    @patch.object(TickerService, "get_one_by_market_id")
+    def test_ticker_service_get_many_by_market_ids_bounds_in_flight_requests(
+        self, mock_get_one_by_market_id, ticker_service
+    ):
+        in_flight = {"current": 0, "max": 0}
+        lock = threading.Lock()
+
+        def _get_one(market_id, use_cache=True):
+            with lock:
+                in_flight["current"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["current"])
+            time.sleep(0.01)
+            with lock:
+                in_flight["current"] -= 1
+            return {"ticker": {"market_id": market_id}}
+
+        mock_get_one_by_market_id.side_effect = _get_one
+
+        # Call the get_many_by_market_ids method with more markets than workers
+        ticker_service.get_many_by_market_ids([f"market_{i}" for i in range(6)])
+
+        # Assert the requests ran in parallel without exceeding the limit
+        assert in_flight["max"] == settings.TICKER_FETCH_MAX_WORKERS
+
+    @patch.object(TickerService, "get_one_by_market_id")
+    def test_ticker_service_get_many_by_market_ids_propagates_errors(
+        self, mock_get_one_by_market_id, ticker_service
+    ):
+        mock_get_one_by_market_id.side_effect = HTTPError("Market not found")
+
+        with pytest.raises(HTTPError):
+            ticker_service.get_many_by_market_ids(["market_1", "market_2"])
+
+    @patch.object(TickerService, "_get", return_value=SAMPLE_ALL_TICKERS_DATA)
+    def test_ticker_service_get_all(self, mock_get, ticker_service):
+        # Call the get_all method
+        response = ticker_service.get_all()
+
+        # Assert that the bulk tickers path was requested once
+        mock_get.assert_called_once_with("tickers")
+
+        # Assert that the response data matches the expected data
+        assert response == SAMPLE_ALL_TICKERS_DATA
+
+    @patch.object(TickerService, "get_one_by_market_id")
+    @patch.object(TickerService, "_get", return_value=SAMPLE_ALL_TICKERS_DATA)
+    def test_ticker_service_get_all_orders_tickers_by_market_ids(
+        self, mock_get, mock_get_one_by_market_id, ticker_service
+    ):
+        market_ids = ["market_3", "market_1"]
+
+        # Call the get_all method with a subset of markets
+        response = ticker_service.get_all(market_ids=market_ids)
+
+        # Assert the tickers follow the given order and no fallback was needed
+        assert [ticker["market_id"] for ticker in response["tickers"]] == market_ids
+        mock_get_one_by_market_id.assert_not_called()
+
+    @patch.object(TickerService, "get_one_by_market_id")
+    @patch.object(TickerService, "_get")
+    def test_ticker_service_get_all_falls_back_to_per_market_requests(
+        self, mock_get, mock_get_one_by_market_id, ticker_service
+    ):
+        mock_get.side_effect = HTTPError(
+            "Not Found", response=MagicMock(status_code=404)
+        )
+        mock_get_one_by_market_id.side_effect = (
+            lambda market_id, use_cache: SAMPLE_TICKERS_DATA_SET[market_id]
+        )
+        market_ids = list(SAMPLE_TICKERS_DATA_SET)
+
+        # Call the get_all method while the bulk endpoint is unavailable
+        response = ticker_service.get_all(market_ids=market_ids)
+
+        # Assert every market was fetched individually
+        assert mock_get_one_by_market_id.call_count == len(market_ids)
+        assert response == SAMPLE_ALL_TICKERS_DATA
+
+    @patch.object(TickerService, "_get")
+    def test_ticker_service_get_all_without_market_ids_fails_when_bulk_unavailable(
+        self, mock_get, ticker_service
+    ):
+        mock_get.side_effect = HTTPError(
+            "Not Found", response=MagicMock(status_code=404)
+        )
+
+        with pytest.raises(HTTPError):
+            ticker_service.get_all()
+
+
+class TestTickerServiceAsync:
+    @patch.object(TickerService, "_aget", return_value=SAMPLE_TICKER_DATA_MARKET_1)
+    def test_ticker_service_aget_one_by_market_id_is_cached(
+        self, mock_aget, ticker_service
+    ):
+        async def _run():
+            await ticker_service.aget_one_by_market_id("market_1")
+            return await ticker_service.aget_one_by_market_id("market_1")
+
+        assert asyncio.run(_run()) == SAMPLE_TICKER_DATA_MARKET_1
+        mock_aget.assert_awaited_once_with("markets/market_1/ticker")
+
+    @patch.object(TickerService, "_aget", return_value=SAMPLE_ALL_TICKERS_DATA)
+    def test_ticker_service_aget_all(self, mock_aget, ticker_service):
+        response = asyncio.run(ticker_service.aget_all())
+
+        mock_aget.assert_awaited_once_with("tickers")
+        assert response == SAMPLE_ALL_TICKERS_DATA
+
+    @patch.object(TickerService, "aget_one_by_market_id")
+    @patch.object(TickerService, "_aget")
+    def test_ticker_service_aget_all_fetches_partial_bulk_entries_per_market(
+        self, mock_aget, mock_aget_one_by_market_id, ticker_service
+    ):
+        tickers = SAMPLE_ALL_TICKERS_DATA["tickers"]
+        # A bulk entry with a last price but no order book prices
+        partial_ticker = {"market_id": "market_2", "last_price": ["525.0", "CLP"]}
+        mock_aget.return_value = {"tickers": [tickers[0], partial_ticker, tickers[2]]}
+        mock_aget_one_by_market_id.side_effect = (
+            lambda market_id, use_cache: SAMPLE_TICKERS_DATA_SET[market_id]
+        )
+        market_ids = list(SAMPLE_TICKERS_DATA_SET)
+
+        response = asyncio.run(ticker_service.aget_all(market_ids=market_ids))
+
+        # Only the partial entry was fetched individually
+        mock_aget_one_by_market_id.assert_called_once_with(
+            market_id="market_2", use_cache=True
+        )
+        assert response == SAMPLE_ALL_TICKERS_DATA
+
+    @patch.object(TickerService, "aget_one_by_market_id")
+    @patch.object(TickerService, "_aget")
+    def test_ticker_service_aget_all_falls_back_to_per_market_requests(
+        self, mock_aget, mock_aget_one_by_market_id, ticker_service
+    ):
+        mock_aget.side_effect = HTTPError(
+            "Not Found", response=MagicMock(status_code=404)
+        )
+        mock_aget_one_by_market_id.side_effect = (
+            lambda market_id, use_cache: SAMPLE_TICKERS_DATA_SET[market_id]
+        )
+        market_ids = list(SAMPLE_TICKERS_DATA_SET)
+
+        response = asyncio.run(ticker_service.aget_all(market_ids=market_ids))
+
+        assert mock_aget_one_by_market_id.await_count == len(market_ids)
+        assert response == SAMPLE_ALL_TICKERS_DATA
+
+    @patch.object(TickerService, "aget_one_by_market_id")
+    def test_ticker_service_aget_many_by_market_ids_bounds_in_flight_requests(
+        self, mock_aget_one_by_market_id, ticker_service
+    ):
+        in_flight = []
+        max_in_flight = []
+
+        async def _get_one(market_id, use_cache=True):
+            in_flight.append(market_id)
+            max_in_flight.append(len(in_flight))
+            await asyncio.sleep(0.001)
+            in_flight.remove(market_id)
+            return {"ticker": {"market_id": market_id}}
+
+        mock_aget_one_by_market_id.side_effect = _get_one
+        market_ids = [f"market_{i}" for i in range(30)]
+
+        response = asyncio.run(ticker_service.aget_many_by_market_ids(market_ids))
+
+        assert [ticker["ticker"]["market_id"] for ticker in response] == market_ids
+        assert max(max_in_flight) <= settings.TICKER_FETCH_MAX_WORKERS
+
+    @patch.object(TickerService, "_aget")
+    def test_ticker_service_aget_all_without_cache_bypasses_per_market_cache(
+        self, mock_aget, ticker_service
+    ):
+        # A ticker for the market is already cached
+        ticker_service.cache.get_or_load(
+            "markets/market_1/ticker", lambda: {"ticker": {"market_id": "cached"}}
+        )
+
+        async def _aget(path):
+            if path == "tickers":
+                raise HTTPError("Not Found", response=MagicMock(status_code=404))
+            return SAMPLE_TICKER_DATA_MARKET_1
+
+        mock_aget.side_effect = _aget
+
+        response = asyncio.run(
+            ticker_service.aget_all(market_ids=["market_1"], use_cache=False)
+        )
+
+        mock_aget.assert_any_await("markets/market_1/ticker")
+        assert response == {"tickers": [SAMPLE_TICKER_DATA_MARKET_1["ticker"]]}
+
+    @patch.object(TickerService, "_aget", return_value=SAMPLE_TICKER_DATA_MARKET_1)
+    def test_ticker_service_aget_one_with_age_by_market_id_reports_stale_entry(
+        self, mock_aget, ticker_service
+    ):
+        async def _run():
+            await ticker_service.aget_one_by_market_id("market_1")
+            # Age the cached entry into the staleness window
+            with patch.object(
+                ticker_service.cache,
+                "_clock",
+                return_value=time.monotonic() + settings.TICKER_CACHE_FRESH_SECONDS,
+            ):
+                return await ticker_service.aget_one_with_age_by_market_id("market_1")
+
+        lookup = asyncio.run(_run())
+
+        assert lookup.value == SAMPLE_TICKER_DATA_MARKET_1
+        assert lookup.age >= settings.TICKER_CACHE_FRESH_SECONDS
+        assert lookup.is_stale
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import socket
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.services.webhooks import (
+    SpreadAlertNotifier,
+    WebhookDispatcher,
+    WebhookURLNotAllowed,
+    check_webhook_url,
+)
+from config import settings
+
+WEBHOOK_URL = "http://hooks.test/alerts"
+
+
+@pytest.fixture(autouse=True)
+def allowed_hosts():
+    with patch.object(settings, "WEBHOOK_ALLOWED_HOSTS", ["hooks.test"]):
+        yield
+
+
+def _resolving_to(address):
+    family = socket.AF_INET6 if ":" in address else socket.AF_INET
+    return patch(
+        "app.services.webhooks.socket.getaddrinfo",
+        return_value=[(family, socket.SOCK_STREAM, 6, "", (address, 443))],
+    )
+
+
+class _WebhookStandIn:
+    """Answers webhook deliveries with scripted status codes and records them."""
+
+    def __init__(self, statuses=None):
+        self.statuses = list(statuses or [])
+        self.requests = []
+
+    def handler(self, request):
+        self.requests.append((str(request.url), json.loads(request.content)))
+        status_code = self.statuses.pop(0) if self.statuses else 200
+        return httpx.Response(status_code)
+
+    def create_client(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+def _dispatcher(stand_in, **kwargs):
+    options = dict(
+        max_pending=100,
+        workers=2,
+        batch_size=10,
+        max_attempts=3,
+        backoff=0.001,
+        max_dead_letters=10,
+        create_client=stand_in.create_client,
+    )
+    options.update(kwargs)
+    return WebhookDispatcher(**options)
+
+
+def _run(dispatcher, enqueue):
+    async def _deliver():
+        dispatcher.start()
+        enqueue()
+        for _ in range(200):
+            if dispatcher.pending_count == 0:
+                break
+            await asyncio.sleep(0.005)
+        await dispatcher.stop()
+
+    asyncio.run(_deliver())
+
+
+def _spread(market_id, value):
+    return {"market_id": market_id, "min_ask": value, "max_bid": 0.0, "value": value}
+
+
+class TestWebhookDispatcher:
+    def test_notifications_of_one_url_are_batched(self):
+        stand_in = _WebhookStandIn()
+        dispatcher = _dispatcher(stand_in, batch_size=2)
+
+        # Queued before start, so the first delivery already has a full batch
+        for index in range(3):
+            dispatcher.enqueue(WEBHOOK_URL, {"index": index})
+        _run(dispatcher, lambda: None)
+
+        assert [body for _, body in stand_in.requests] == [
+            {"notifications": [{"index": 0}, {"index": 1}]},
+            {"notifications": [{"index": 2}]},
+        ]
+        assert list(dispatcher.dead_letters) == []
+
+    def test_failed_delivery_is_retried(self):
+        stand_in = _WebhookStandIn(statuses=[503, 429, 200])
+        dispatcher = _dispatcher(stand_in)
+
+        _run(dispatcher, lambda: dispatcher.enqueue(WEBHOOK_URL, {"index": 0}))
+
+        assert len(stand_in.requests) == 3
+        assert list(dispatcher.dead_letters) == []
+
+    def test_delivery_is_dead_lettered_after_last_attempt(self):
+        stand_in = _WebhookStandIn(statuses=[500, 500, 500])
+        dispatcher = _dispatcher(stand_in)
+
+        _run(dispatcher, lambda: dispatcher.enqueue(WEBHOOK_URL, {"index": 0}))
+
+        assert len(stand_in.requests) == 3
+        dead_letter = dispatcher.dead_letters[0]
+        assert dead_letter.url == WEBHOOK_URL
+        assert dead_letter.payloads == [{"index": 0}]
+        assert dead_letter.error == "HTTP 500"
+        assert dead_letter.attempts == 3
+
+    def test_rejected_delivery_is_not_retried(self):
+        stand_in = _WebhookStandIn(statuses=[400])
+        dispatcher = _dispatcher(stand_in)
+
+        _run(dispatcher, lambda: dispatcher.enqueue(WEBHOOK_URL, {"index": 0}))
+
+        assert len(stand_in.requests) == 1
+        assert dispatcher.dead_letters[0].attempts == 1
+
+    def test_unreachable_webhook_is_dead_lettered(self):
+        def handler(request):
+            raise httpx.ConnectError("Connection refused", request=request)
+
+        dispatcher = _dispatcher(
+            _WebhookStandIn(),
+            max_attempts=2,
+            create_client=lambda: httpx.AsyncClient(
+                transport=httpx.MockTransport(handler)
+            ),
+        )
+
+        _run(dispatcher, lambda: dispatcher.enqueue(WEBHOOK_URL, {"index": 0}))
+
+        assert dispatcher.dead_letters[0].error == "ConnectError: Connection refused"
+
+    def test_enqueue_dead_letters_notifications_beyond_max_pending(self):
+        dispatcher = _dispatcher(_WebhookStandIn(), max_pending=1)
+
+        assert dispatcher.enqueue(WEBHOOK_URL, {"index": 0}) is True
+        assert dispatcher.enqueue(WEBHOOK_URL, {"index": 1}) is False
+
+        assert dispatcher.pending_count == 1
+        assert dispatcher.dead_letters[0].payloads == [{"index": 1}]
+        assert dispatcher.dead_letters[0].error == "Delivery queue is full"
+
+    def test_not_allowed_webhook_is_dead_lettered_without_delivery(self):
+        stand_in = _WebhookStandIn()
+        dispatcher = _dispatcher(stand_in)
+
+        with _resolving_to("10.0.0.1"):
+            _run(
+                dispatcher,
+                lambda: dispatcher.enqueue(
+                    "https://hooks.example/alerts", {"index": 0}
+                ),
+            )
+
+        assert stand_in.requests == []
+        assert dispatcher.dead_letters[0].attempts == 0
+        assert dispatcher.dead_letters[0].error == (
+            "Webhook host 'hooks.example' resolves to a non-public address"
+        )
+
+
+class TestCheckWebhookUrl:
+    def test_https_url_with_public_address_is_allowed(self):
+        with _resolving_to("93.184.216.34"):
+            check_webhook_url("https://hooks.example/alerts")
+
+    def test_allowed_host_skips_scheme_and_address_checks(self):
+        with _resolving_to("127.0.0.1") as getaddrinfo:
+            check_webhook_url("http://HOOKS.test:8080/alerts")
+
+        getaddrinfo.assert_not_called()
+
+    def test_http_url_is_not_allowed(self):
+        with pytest.raises(WebhookURLNotAllowed, match="must use https"):
+            check_webhook_url("http://hooks.example/alerts")
+
+    @pytest.mark.parametrize(
+        "address",
+        [
+            "127.0.0.1",
+            "10.1.2.3",
+            "192.168.0.10",
+            "169.254.169.254",
+            "::1",
+            "::ffff:127.0.0.1",
+        ],
+    )
+    def test_non_public_address_is_not_allowed(self, address):
+        with _resolving_to(address), pytest.raises(
+            WebhookURLNotAllowed, match="non-public address"
+        ):
+            check_webhook_url("https://hooks.example/alerts")
+
+    def test_unresolvable_host_is_not_allowed(self):
+        with patch(
+            "app.services.webhooks.socket.getaddrinfo",
+            side_effect=socket.gaierror("Name or service not known"),
+        ), pytest.raises(WebhookURLNotAllowed, match="could not be resolved"):
+            check_webhook_url("https://hooks.example/alerts")
+
+
+class TestSpreadAlertNotifier:
+    @pytest.fixture
+    def dispatcher(self):
+        return _dispatcher(_WebhookStandIn())
+
+    def test_crossing_of_alert_value_is_notified(self, dispatcher):
+        notifier = SpreadAlertNotifier(
+            spread_alert={"value": "100", "webhook_url": WEBHOOK_URL},
+            dispatcher=dispatcher,
+        )
+
+        notifier.on_spreads([_spread("market_1", 50.0)])
+        notifier.on_spreads([_spread("market_1", 60.0)])
+        notifier.on_spreads([_spread("market_1", 150.0)])
+
+        # Only the move to the other side of the alert value is queued
+        assert dispatcher.pending_count == 1
+        notification = dispatcher._pending[WEBHOOK_URL][0]
+        assert notification["market_id"] == "market_1"
+        assert notification["spread_value"] == "150.00"
+        assert notification["is_greater"] is True
+
+    def test_new_alert_value_resets_state(self, dispatcher):
+        spread_alert = {"value": "100", "webhook_url": WEBHOOK_URL}
+        notifier = SpreadAlertNotifier(spread_alert=spread_alert, dispatcher=dispatcher)
+
+        notifier.on_spreads([_spread("market_1", 50.0)])
+        spread_alert["value"] = "10"
+        notifier.on_spreads([_spread("market_1", 50.0)])
+
+        assert dispatcher.pending_count == 0
+
+    def test_alert_without_webhook_is_not_notified(self, dispatcher):
+        notifier = SpreadAlertNotifier(
+            spread_alert={"value": "100", "webhook_url": None},
+            dispatcher=dispatcher,
+        )
+
+        notifier.on_spreads([_spread("market_1", 50.0)])
+        notifier.on_spreads([_spread("market_1", 150.0)])
+
+        assert dispatcher.pending_count == 0
@@ -0,0 +1,47 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import BudaAPI
+from app.services.alert_store import AlertStore
+from app.services.poller import MarketDataPoller
+from config import settings
+
+
+class TestLifespan:
+    @patch.object(BudaAPI, "aclose")
+    def test_app_shutdown_closes_buda_api_clients(self, mock_aclose):
+        with TestClient(app):
+            mock_aclose.assert_not_called()
+
+        mock_aclose.assert_awaited_once()
+
+    @patch.object(MarketDataPoller, "start")
+    def test_app_startup_does_not_start_poller_by_default(self, mock_start):
+        with TestClient(app):
+            pass
+
+        mock_start.assert_not_called()
+
+    @patch.object(settings, "MARKET_DATA_POLLER_ENABLED", True)
+    @patch.object(MarketDataPoller, "stop")
+    @patch.object(MarketDataPoller, "start")
+    def test_app_lifespan_starts_and_stops_enabled_poller(self, mock_start, mock_stop):
+        with TestClient(app):
+            mock_start.assert_called_once()
+            mock_stop.assert_not_called()
+
+        mock_stop.assert_awaited_once()
+
+    @patch.object(AlertStore, "stop_sync")
+    @patch.object(AlertStore, "start_sync")
+    @patch.object(AlertStore, "load")
+    def test_app_lifespan_loads_and_syncs_alert_store(
+        self, mock_load, mock_start_sync, mock_stop_sync
+    ):
+        with TestClient(app):
+            mock_load.assert_called_once()
+            mock_start_sync.assert_called_once_with(settings.ALERT_STORE_SYNC_INTERVAL)
+
+        mock_stop_sync.assert_awaited_once()
@@ -1,5 +1,5 @@
 import pytest
-from app.utils import format_current_spread
+from app.utils import format_current_spread, format_server_sent_event
 
 
 class TestFormatCurrentSpread:
@@ -64,3 +64,9 @@ class TestFormatCurrentSpread:
         with pytest.raises(KeyError) as excinfo:
             format_current_spread(invalid_current_spread)
         assert "Error formatting spread for market market_3" in str(excinfo.value)
+
+
+class TestFormatServerSentEvent:
+    def test_format_server_sent_event_succeeds(self):
+        result = format_server_sent_event("spread", {"market_id": "market_1"})
+        assert result == 'event: spread\ndata: {"market_id": "market_1"}\n\n'
@@ -0,0 +1,69 @@
+from app.utils import (
+    build_cache_headers,
+    build_etag,
+    build_ticker_age_headers,
+    etag_matches,
+)
+
+TICKERS = [
+    {"market_id": "BTC-CLP", "min_ask": ["101.0", "CLP"], "max_bid": ["99.0", "CLP"]},
+    {"market_id": "ETH-CLP", "min_ask": ["51.0", "CLP"], "max_bid": ["49.0", "CLP"]},
+]
+
+
+class TestBuildTickerAgeHeaders:
+    def test_build_ticker_age_headers_for_fresh_ticker(self):
+        result = build_ticker_age_headers(0.4, is_stale=False)
+        assert result == {"X-Data-Age": "0", "X-Ticker-Stale": "false"}
+
+    def test_build_ticker_age_headers_for_stale_ticker(self):
+        result = build_ticker_age_headers(3.7, is_stale=True)
+        assert result == {"X-Data-Age": "3", "X-Ticker-Stale": "true"}
+
+    def test_build_ticker_age_headers_without_age(self):
+        assert build_ticker_age_headers(None, is_stale=False) == {}
+
+
+class TestBuildEtag:
+    def test_build_etag_is_a_quoted_strong_etag(self):
+        etag = build_etag(TICKERS)
+        assert etag.startswith('"') and etag.endswith('"')
+        assert not etag.startswith("W/")
+
+    def test_build_etag_is_stable_for_the_same_prices(self):
+        # Fields a spread does not depend on are left out of the ETag
+        tickers = [dict(ticker, volume=["1.0", "BTC"]) for ticker in TICKERS]
+        assert build_etag(tickers) == build_etag(TICKERS)
+
+    def test_build_etag_changes_with_the_prices(self):
+        tickers = [dict(TICKERS[0], min_ask=["102.0", "CLP"]), TICKERS[1]]
+        assert build_etag(tickers) != build_etag(TICKERS)
+
+    def test_build_etag_changes_with_the_extra_values(self):
+        assert build_etag(TICKERS, 10.0) != build_etag(TICKERS, 20.0)
+
+
+class TestEtagMatches:
+    def test_etag_matches_the_same_etag(self):
+        assert etag_matches('"abc"', '"abc"')
+
+    def test_etag_matches_any_etag_of_a_list(self):
+        assert etag_matches('"xyz", "abc"', '"abc"')
+
+    def test_etag_matches_a_weak_etag(self):
+        assert etag_matches('W/"abc"', '"abc"')
+
+    def test_etag_matches_a_wildcard(self):
+        assert etag_matches("*", '"abc"')
+
+    def test_etag_does_not_match_another_etag(self):
+        assert not etag_matches('"xyz"', '"abc"')
+
+    def test_etag_does_not_match_without_header(self):
+        assert not etag_matches(None, '"abc"')
+
+
+class TestBuildCacheHeaders:
+    def test_build_cache_headers(self):
+        result = build_cache_headers('"abc"', max_age=1)
+        assert result == {"ETag": '"abc"', "Cache-Control": "public, max-age=1"}
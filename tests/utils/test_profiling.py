@@ -0,0 +1,52 @@
+import asyncio
+
+from app.utils.profiling import (
+    profile_phase,
+    profile_request,
+    profiled,
+    record_phase,
+)
+
+
+@profiled("spread_math")
+def _add(a, b):
+    return a + b
+
+
+class TestProfiling:
+    def test_phases_are_recorded_while_profiling(self):
+        with profile_request() as profile:
+            with profile_phase("validation"):
+                pass
+            assert _add(1, 2) == 3
+            _add(3, 4)
+            record_phase("upstream", 0.5)
+
+        assert set(profile.phases) == {"validation", "spread_math", "upstream"}
+        assert profile.phases["spread_math"]["calls"] == 2
+        assert profile.phases["upstream"] == {"seconds": 0.5, "calls": 1}
+
+    def test_phases_are_ignored_without_profile(self):
+        with profile_request() as profile:
+            pass
+
+        # The profile is no longer current once the request ends
+        with profile_phase("validation"):
+            pass
+        assert _add(1, 2) == 3
+        record_phase("upstream", 0.5)
+
+        assert profile.phases == {}
+
+    def test_phases_of_started_tasks_are_recorded(self):
+        async def _upstream():
+            record_phase("upstream", 0.25)
+
+        async def _request():
+            with profile_request() as profile:
+                await asyncio.gather(_upstream(), _upstream())
+            return profile
+
+        profile = asyncio.run(_request())
+
+        assert profile.phases["upstream"] == {"seconds": 0.5, "calls": 2}
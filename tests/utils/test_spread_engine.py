@@ -0,0 +1,54 @@
+import math
+
+import pytest
+
+from app.utils import calculate_spread, calculate_spreads
+from config import SAMPLE_ALL_TICKERS_DATA
+
+
+class TestCalculateSpreads:
+    def test_calculate_spreads_succeeds(self):
+        result = calculate_spreads(SAMPLE_ALL_TICKERS_DATA["tickers"])
+
+        assert result.market_ids == ["market_1", "market_2", "market_3"]
+        assert result.min_ask.tolist() == [1000.0, 550.0, 200.0]
+        assert result.max_bid.tolist() == [900.0, 500.0, 50.0]
+        assert result.value.tolist() == [100.0, 50.0, 150.0]
+        assert result.mid.tolist() == [950.0, 525.0, 125.0]
+        assert result.spread_bps.tolist() == pytest.approx(
+            [1052.6315789, 952.3809524, 12000.0]
+        )
+
+    def test_calculate_spreads_matches_calculate_spread(self):
+        tickers = SAMPLE_ALL_TICKERS_DATA["tickers"]
+
+        result = calculate_spreads(tickers).to_spreads()
+
+        assert result == [calculate_spread(ticker) for ticker in tickers]
+
+    def test_calculate_spreads_with_zero_mid_price(self):
+        ticker = {"min_ask": ["0", "CLP"], "max_bid": ["0", "CLP"], "market_id": "m"}
+
+        result = calculate_spreads([ticker])
+
+        assert result.value.tolist() == [0.0]
+        assert math.isnan(result.spread_bps[0])
+
+    def test_calculate_spreads_with_no_tickers(self):
+        result = calculate_spreads([])
+
+        assert result.market_ids == []
+        assert result.to_spreads() == []
+
+    def test_calculate_spreads_with_invalid_value_fails(self):
+        tickers = SAMPLE_ALL_TICKERS_DATA["tickers"] + [
+            {
+                "min_ask": ["invalid", "ARS"],
+                "max_bid": ["10.0", "ARS"],
+                "market_id": "market_4",
+            }
+        ]
+
+        with pytest.raises(ValueError) as excinfo:
+            calculate_spreads(tickers)
+        assert "Error calculating spread for market market_4" in str(excinfo.value)